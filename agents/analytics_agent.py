@@ -1,13 +1,117 @@
-from utils.logger import logger
+from utils.logger import hot_logger, logger
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
+import threading
+
+
+def empty_totals() -> Dict:
+    return {
+        "tickets": 0,
+        "escalated": 0,
+        "response_time_sum": 0.0,
+        "response_time_count": 0,
+        "confidence_sum": 0.0,
+        "confidence_count": 0,
+        "tokens": 0,
+        "category": {},
+        "priority": {},
+    }
+
+
+def merge_totals(into: Dict, delta: Dict) -> Dict:
+    """Add a delta (same shape as the totals, possibly partial) in place"""
+    for key, value in delta.items():
+        if isinstance(value, dict):
+            counts = into.setdefault(key, {})
+            for name, count in value.items():
+                counts[name] = counts.get(name, 0) + count
+        else:
+            into[key] = into.get(key, 0) + value
+    return into
+
+
+def summarize_totals(totals: Dict) -> Dict:
+    """The `get_summary` view of a totals dict"""
+    total = totals["tickets"]
+    escalated = totals["escalated"]
+    if not total:
+        return {
+            "message": "No metrics yet",
+            "total_tickets": 0,
+            "escalated_tickets": 0,
+            "auto_resolved": 0,
+            "escalation_rate": "0.0%",
+            "avg_response_time": "0.00s",
+            "avg_confidence": "0.00",
+            "total_tokens": 0,
+            "avg_tokens_per_ticket": 0.0,
+        }
+
+    # Averages only over tickets that reported a value
+    avg_response_time = totals["response_time_sum"] / max(
+        totals["response_time_count"], 1
+    )
+    avg_confidence = totals["confidence_sum"] / max(totals["confidence_count"], 1)
+
+    return {
+        "total_tickets": total,
+        "escalated_tickets": escalated,
+        "auto_resolved": total - escalated,
+        "escalation_rate": f"{(escalated / total) * 100:.1f}%",
+        "avg_response_time": f"{avg_response_time:.2f}s",
+        "avg_confidence": f"{avg_confidence:.2f}",
+        "total_tokens": totals["tokens"],
+        "avg_tokens_per_ticket": round(totals["tokens"] / total, 1),
+    }
 
 
 class AnalyticsAgent:
+    """
+    Tracks per-ticket metrics and keeps running totals
+
+    The totals are updated as each ticket is tracked, so summaries don't
+    rescan every ticket. Listeners added with `subscribe` get each
+    ticket's delta (same shape as the totals) right after it is applied.
+    """
+
     def __init__(self):
         self.metrics: List[Dict] = []
+        self.totals = empty_totals()
+        self._listeners: List[Callable[[Dict], None]] = []
+        self._lock = threading.Lock()
         logger.info("Analytics Agent initialized")
 
+    @staticmethod
+    def _delta(metrics: Dict) -> Dict:
+        response_time = metrics.get("response_time")
+        confidence = metrics.get("confidence")
+        has_time = bool(response_time and response_time > 0)
+        has_confidence = bool(confidence and confidence > 0)
+        return {
+            "tickets": 1,
+            "escalated": int(bool(metrics.get("escalated"))),
+            "response_time_sum": response_time if has_time else 0.0,
+            "response_time_count": int(has_time),
+            "confidence_sum": confidence if has_confidence else 0.0,
+            "confidence_count": int(has_confidence),
+            "tokens": metrics.get("total_tokens", 0),
+            "category": {metrics.get("category") or "unknown": 1},
+            "priority": {metrics.get("priority") or "unknown": 1},
+        }
+
+    def subscribe(self, listener: Callable[[Dict], None]) -> Dict:
+        """
+        Call `listener(delta)` for every ticket tracked from now on
+
+        The listener runs on the tracking thread and must not block.
+
+        Returns:
+            A copy of the totals the first delta will apply on top of
+        """
+        with self._lock:
+            self._listeners.append(listener)
+            return merge_totals(empty_totals(), self.totals)
+
     def track_ticket(self, state: Dict) -> Dict:
         """
         Extract and track metrics from ticket processing
@@ -28,13 +132,19 @@ class AnalyticsAgent:
                 "confidence": state.get("confidence", 0.0),  # Default to 0.0
                 "escalated": state.get("escalate", False),
                 "escalation_reason": state.get("escalation_reason", None),
+                "total_tokens": state.get("total_tokens") or 0,
+                "token_usage": state.get("token_usage") or {},
             }
 
-            self.metrics.append(metrics)
+            delta = self._delta(metrics)
+            with self._lock:
+                self.metrics.append(metrics)
+                merge_totals(self.totals, delta)
+                # Under the lock so listeners see deltas in totals order
+                for listener in self._listeners:
+                    listener(delta)
 
-            logger.info(
-                f"📊 Tracked metrics for ticket {state.get('ticket_id', 'unknown')}"
-            )
+            hot_logger.info("📊 Tracked metrics for ticket {}", metrics["ticket_id"])
 
             return metrics
 
@@ -44,53 +154,8 @@ class AnalyticsAgent:
 
     def get_summary(self) -> Dict:
         """Get summary statistics with null-safe calculations"""
-
-        if not self.metrics:
-            return {
-                "message": "No metrics yet",
-                "total_tickets": 0,
-                "escalated_tickets": 0,
-                "auto_resolved": 0,
-                "escalation_rate": "0.0%",
-                "avg_response_time": "0.00s",
-                "avg_confidence": "0.00",
-            }
-
-        total = len(self.metrics)
-        escalated = sum(1 for m in self.metrics if m.get("escalated", False))
-
-        # Safe calculation for response time (filter out None/0 values)
-        valid_response_times = [
-            m["response_time"]
-            for m in self.metrics
-            if m.get("response_time") and m["response_time"] > 0
-        ]
-        avg_response_time = (
-            sum(valid_response_times) / len(valid_response_times)
-            if valid_response_times
-            else 0.0
-        )
-
-        # Safe calculation for confidence (filter out None/0 values)
-        valid_confidences = [
-            m["confidence"]
-            for m in self.metrics
-            if m.get("confidence") and m["confidence"] > 0
-        ]
-        avg_confidence = (
-            sum(valid_confidences) / len(valid_confidences)
-            if valid_confidences
-            else 0.0
-        )
-
-        return {
-            "total_tickets": total,
-            "escalated_tickets": escalated,
-            "auto_resolved": total - escalated,
-            "escalation_rate": f"{(escalated / total) * 100:.1f}%",
-            "avg_response_time": f"{avg_response_time:.2f}s",
-            "avg_confidence": f"{avg_confidence:.2f}",
-        }
+        with self._lock:
+            return summarize_totals(self.totals)
 
     def get_detailed_metrics(self) -> List[Dict]:
         """Get all tracked metrics"""
@@ -98,23 +163,54 @@ class AnalyticsAgent:
 
     def get_category_breakdown(self) -> Dict[str, int]:
         """Get ticket count by category"""
-        breakdown = {}
-        for m in self.metrics:
-            category = m.get("category", "unknown")
-            breakdown[category] = breakdown.get(category, 0) + 1
-        return breakdown
+        return dict(self.totals["category"])
 
     def get_priority_breakdown(self) -> Dict[str, int]:
         """Get ticket count by priority"""
-        breakdown = {}
+        return dict(self.totals["priority"])
+
+    def get_token_breakdown(self) -> Dict[str, Dict]:
+        """Token totals by category, priority and stage"""
+        breakdown = {"category": {}, "priority": {}, "stage": {}}
         for m in self.metrics:
-            priority = m.get("priority", "unknown")
-            breakdown[priority] = breakdown.get(priority, 0) + 1
+            tokens = m.get("total_tokens", 0)
+            for key in ("category", "priority"):
+                group = breakdown[key].setdefault(
+                    m.get(key) or "unknown", {"tickets": 0, "tokens": 0}
+                )
+                group["tickets"] += 1
+                group["tokens"] += tokens
+            for stage, usage in m.get("token_usage", {}).items():
+                group = breakdown["stage"].setdefault(
+                    stage, {"input": 0, "output": 0, "calls": 0}
+                )
+                for field in group:
+                    group[field] += usage.get(field, 0)
+
+        for key in ("category", "priority"):
+            for group in breakdown[key].values():
+                group["avg_tokens"] = round(group["tokens"] / group["tickets"], 1)
         return breakdown
 
+    def get_top_token_consumers(self, limit: int = 10) -> List[Dict]:
+        """Tickets that used the most tokens, with their per-stage usage"""
+        top = sorted(self.metrics, key=lambda m: m.get("total_tokens", 0), reverse=True)
+        return [
+            {
+                "ticket_id": m["ticket_id"],
+                "category": m["category"],
+                "priority": m["priority"],
+                "total_tokens": m.get("total_tokens", 0),
+                "token_usage": m.get("token_usage", {}),
+            }
+            for m in top[:limit]
+        ]
+
     def clear_metrics(self):
         """Clear all metrics (useful for testing)"""
-        self.metrics = []
+        with self._lock:
+            self.metrics = []
+            self.totals = empty_totals()
         logger.info("📊 Cleared all metrics")
 
 
@@ -0,0 +1,87 @@
+from langchain_core.messages import SystemMessage, HumanMessage
+from pydantic import BaseModel, field_validator
+from utils.model_router import ModelRouter
+from utils.structured_output import StructuredOutput
+from utils.prompts import DIGEST_SYSTEM_PROMPT
+from utils.logger import hot_logger, logger
+from utils.tokens import estimate_tokens
+from typing import List, Optional
+
+
+class DigestOutput(BaseModel):
+    key_steps: List[str] = []
+    facts: List[str] = []
+    links: List[str] = []
+
+    @field_validator("key_steps", "facts", "links", mode="before")
+    @classmethod
+    def _items(cls, value):
+        if isinstance(value, str):
+            lines = (line.strip("-• ").strip() for line in value.splitlines())
+            return [line for line in lines if line]
+        return value
+
+
+class DigestAgent:
+    """
+    Condenses a documentation chunk into key steps, facts and links
+
+    Runs offline (database/knowledge_digest.py), not per ticket. Calls go
+    through a ModelRouter on the "digest" route, so `llm` or `router` can
+    be a local stub.
+    """
+
+    _parse = StructuredOutput("digest", DigestOutput)
+
+    def __init__(self, llm=None, router=None):
+        self.router = router or ModelRouter(llm=llm)
+        self.temperature = 0.0
+        logger.info("Digest Agent initialized")
+
+    @staticmethod
+    def render(result: dict) -> str:
+        """The digest as it goes into the resolution prompt"""
+        lines = []
+        if result["key_steps"]:
+            lines.append("Steps:")
+            lines += [f"{i}. {step}" for i, step in enumerate(result["key_steps"], 1)]
+        if result["facts"]:
+            lines.append("Facts:")
+            lines += [f"- {fact}" for fact in result["facts"]]
+        if result["links"]:
+            lines.append("Links: " + " ".join(result["links"]))
+        return "\n".join(lines)
+
+    def digest(self, content: str) -> Optional[dict]:
+        """
+        Digest one document chunk
+
+        Returns:
+            dict with key_steps, facts, links, text (rendered), tokens and
+            model_calls, or None when no model produced a usable digest
+        """
+        hot_logger.info("Digesting document ({} chars)", len(content))
+        messages = [
+            SystemMessage(content=DIGEST_SYSTEM_PROMPT),
+            HumanMessage(content=f"Digest this documentation:\n\n{content}"),
+        ]
+        routed = self.router.invoke(
+            "digest",
+            messages,
+            parse=self._parse,
+            temperature=self.temperature,
+            accept=lambda result: any(result.values()),
+        )
+        result = routed.result
+        if result is None or not any(result.values()):
+            logger.warning("Failed to digest document, keeping full text only")
+            return None
+
+        text = self.render(result)
+        return {
+            **result,
+            "text": text,
+            "tokens": estimate_tokens(text),
+            "model": routed.calls[-1]["model"],
+            "model_calls": routed.calls,
+        }
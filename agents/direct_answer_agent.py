@@ -0,0 +1,214 @@
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from utils.config import config
+from utils.logger import hot_logger, logger
+from typing import Dict, List, Optional
+import random
+import re
+import threading
+import time
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+class _Slots(dict):
+    """Template slots; unknown placeholders are left in place"""
+
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+class DirectAnswerAgent:
+    """
+    Answers near-exact FAQ matches from a curated template, without the LLM
+
+    A retrieved document qualifies when its metadata has `answer_ready: true`
+    and an `answer` template, and its vector score is at least
+    DIRECT_ANSWER_MIN_SCORE. Templates may use {ticket_id}, {category},
+    {priority} and {email} (the first address in the ticket).
+
+    With DIRECT_ANSWER_SHADOW_RATE > 0, that fraction of direct answers is
+    also sent to the ResolutionAgent on a background thread, and the two
+    answers are compared. Near misses (an answer-ready top document below
+    the threshold) are compared against the LLM answer they got anyway.
+    Both feed the per-score-band summary used to tune the threshold.
+    """
+
+    def __init__(self, resolution_agent=None):
+        self.min_score = config.DIRECT_ANSWER_MIN_SCORE
+        self.shadow_rate = config.DIRECT_ANSWER_SHADOW_RATE
+        self.resolution_agent = resolution_agent
+
+        self._lock = threading.Lock()
+        self._executor = None
+        if self.shadow_rate > 0 and resolution_agent is not None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="direct-answer-shadow"
+            )
+
+        self.stats = {"considered": 0, "direct": 0, "direct_ms_total": 0.0}
+        self.shadow_results: deque = deque(maxlen=config.DIRECT_ANSWER_SHADOW_KEEP)
+        logger.info("Direct Answer Agent initialized")
+
+    @staticmethod
+    def vector_score(doc: dict) -> float:
+        # After re-ranking `score` is the cross-encoder's; keep the cosine one
+        return doc.get("vector_score", doc["score"])
+
+    @staticmethod
+    def candidate(docs: Optional[List[dict]]) -> Optional[dict]:
+        """Top document if it has a curated answer, whatever its score"""
+        if not docs:
+            return None
+        metadata = docs[0].get("metadata") or {}
+        if metadata.get("answer_ready") and metadata.get("answer"):
+            return docs[0]
+        return None
+
+    def match(self, docs: Optional[List[dict]]) -> Optional[dict]:
+        """Top document if it qualifies for a direct answer, else None"""
+        with self._lock:
+            self.stats["considered"] += 1
+        top = self.candidate(docs)
+        if top is not None and self.vector_score(top) >= self.min_score:
+            return top
+        return None
+
+    @staticmethod
+    def fill(doc: dict, state: dict) -> str:
+        email = _EMAIL_RE.search(state["ticket_content"])
+        slots = _Slots(
+            ticket_id=state["ticket_id"],
+            category=state.get("category") or "general",
+            priority=state.get("priority") or "medium",
+            email=email.group(0) if email else "your account email",
+        )
+        return doc["metadata"]["answer"].format_map(slots)
+
+    def answer(self, doc: dict, state: dict) -> Dict:
+        """
+        Fill the document's answer template for this ticket
+
+        Args:
+            doc: Document returned by `match`
+            state: Current graph state
+
+        Returns:
+            dict with response, confidence and a direct_answer record
+        """
+        start = time.perf_counter()
+        response = self.fill(doc, state)
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self.stats["direct"] += 1
+            self.stats["direct_ms_total"] += latency_ms
+
+        score = self.vector_score(doc)
+        record = {"doc_id": doc["id"], "score": round(score, 4)}
+        hot_logger.success("Direct answer from {} (score: {:.3f})", doc["id"], score)
+
+        if self._executor and random.random() < self.shadow_rate:
+            self._executor.submit(self._shadow, dict(state), doc, response)
+
+        return {"response": response, "confidence": score, "direct_answer": record}
+
+    @staticmethod
+    def similarity(a: str, b: str) -> float:
+        """Word-set Jaccard similarity, cheap enough for every shadow pair"""
+        words_a = set(_WORD_RE.findall(a.lower()))
+        words_b = set(_WORD_RE.findall(b.lower()))
+        if not words_a or not words_b:
+            return 0.0
+        return len(words_a & words_b) / len(words_a | words_b)
+
+    def compare(
+        self,
+        doc: dict,
+        state: dict,
+        llm_result: dict,
+        llm_ms: float,
+        mode: str,
+        template_response: Optional[str] = None,
+    ):
+        """Record how a curated answer compares with the LLM's for one ticket"""
+        template_response = template_response or self.fill(doc, state)
+        self.shadow_results.append(
+            {
+                "mode": mode,
+                "ticket_id": state["ticket_id"],
+                "doc_id": doc["id"],
+                "score": round(self.vector_score(doc), 4),
+                "similarity": round(
+                    self.similarity(template_response, llm_result["response"]), 4
+                ),
+                "llm_confidence": llm_result["confidence"],
+                "llm_ms": round(llm_ms, 1),
+            }
+        )
+
+    def _shadow(self, state: dict, doc: dict, direct_response: str):
+        try:
+            start = time.perf_counter()
+            result = self.resolution_agent.generate_response(
+                state.get("ticket_text") or state["ticket_content"],
+                self.resolution_agent.format_context(
+                    self.resolution_agent.prompt_documents(
+                        state.get("retrieved_docs") or []
+                    )
+                ),
+                state.get("category"),
+                state.get("priority"),
+            )
+            llm_ms = (time.perf_counter() - start) * 1000
+            self.compare(doc, state, result, llm_ms, "shadow", direct_response)
+        except Exception as e:
+            logger.warning(f"Direct answer shadow failed: {e}")
+
+    def get_summary(self) -> Dict:
+        """Direct-answer share and latency, plus shadow agreement by score band"""
+        with self._lock:
+            stats = dict(self.stats)
+        shadows = list(self.shadow_results)
+
+        bands: Dict[str, list] = {}
+        for shadow in shadows:
+            band = f"{int(shadow['score'] * 20) / 20:.2f}"
+            bands.setdefault(band, []).append(shadow)
+
+        considered = stats["considered"]
+        return {
+            "min_score": self.min_score,
+            "considered": considered,
+            "direct": stats["direct"],
+            "direct_share": (
+                round(stats["direct"] / considered, 4) if considered else 0.0
+            ),
+            "avg_direct_ms": (
+                round(stats["direct_ms_total"] / stats["direct"], 3)
+                if stats["direct"]
+                else 0.0
+            ),
+            "shadow": {
+                band: {
+                    "count": len(items),
+                    "direct": sum(1 for s in items if s["mode"] == "shadow"),
+                    "avg_similarity": round(
+                        sum(s["similarity"] for s in items) / len(items), 4
+                    ),
+                    "avg_llm_confidence": round(
+                        sum(s["llm_confidence"] for s in items) / len(items), 4
+                    ),
+                    "avg_llm_ms": round(
+                        sum(s["llm_ms"] for s in items) / len(items), 1
+                    ),
+                }
+                for band, items in sorted(bands.items())
+            },
+        }
+
+    def drain(self):
+        """Wait for queued shadow comparisons (benchmarks and shutdown)"""
+        if self._executor:
+            self._executor.submit(lambda: None).result()
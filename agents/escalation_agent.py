@@ -1,23 +1,37 @@
-from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
+from pydantic import BaseModel
 from utils.config import config
+from utils.model_router import ModelRouter
+from utils.structured_output import StructuredOutput
+from utils.rule_engine import RuleEngine
 from utils.prompts import ESCALATION_SYSTEM_PROMPT
-from utils.logger import logger
-import json
+from utils.logger import hot_logger, logger
+
+
+class EscalationOutput(BaseModel):
+    escalate: bool
+    reason: str
 
 
 class EscalationAgent:
-    def __init__(self):
-        self.llm = ChatGroq(
-            api_key=config.GROQ_API_KEY,
-            model=config.GROQ_MODEL,
-            temperature=0,  # Deterministic for escalation decisions
+    _parse = StructuredOutput("escalation", EscalationOutput)
+
+    def __init__(self, llm=None, router=None, rules=None):
+        self.router = router or ModelRouter(llm=llm)
+        self.temperature = 0  # Deterministic for escalation decisions
+        # Local rules decide most tickets; the LLM only sees the rest
+        self.rules = rules or RuleEngine(
+            config.ESCALATION_RULES_PATH, config.ESCALATION_RULES_RELOAD_SECONDS
         )
-        self.escalation_threshold = 0.7
         logger.info("Escalation Agent initialized")
 
     def should_escalate(
-        self, ticket_content: str, category: str, confidence: float
+        self,
+        ticket_content: str,
+        category: str,
+        confidence: float,
+        priority: str = None,
+        use_llm: bool = True,
     ) -> dict:
         """
         Decide if ticket needs human intervention
@@ -26,24 +40,35 @@ class EscalationAgent:
             ticket_content: Original ticket
             category: Ticket category
             confidence: Resolution confidence score
+            priority: Ticket priority
+            use_llm: False when the ticket is out of token budget; tickets
+                no rule decides are then escalated without asking the LLM
 
         Returns:
             dict with escalation decision and reason
         """
+        routed = None
         try:
-            logger.info(f"Evaluating escalation (confidence: {confidence})")
-
-            # Auto-escalate rules
-            if confidence < self.escalation_threshold:
-                return {
-                    "escalate": True,
-                    "reason": f"Low confidence ({confidence:.2f} < {self.escalation_threshold})",
-                }
-
-            if category == "billing":
+            hot_logger.info("Evaluating escalation (confidence: {})", confidence)
+
+            decision = self.rules.decide(
+                ticket_content,
+                category=category,
+                priority=priority,
+                confidence=confidence,
+            )
+            if decision is not None:
+                hot_logger.info(
+                    "Rule {} decided: {}", decision["rule"], decision["reason"]
+                )
+                return decision
+
+            if not use_llm:
+                # Same fail-safe as an LLM error: a human takes a look
+                hot_logger.info("Token budget nearly spent, skipping LLM check")
                 return {
                     "escalate": True,
-                    "reason": "Billing issues require human review",
+                    "reason": "Token budget exhausted before escalation review",
                 }
 
             # LLM decision for edge cases
@@ -70,18 +95,31 @@ Output format (JSON):
                 HumanMessage(content=prompt),
             ]
 
-            response = self.llm.invoke(messages)
-            result = json.loads(response.content)
+            routed = self.router.invoke(
+                "escalation",
+                messages,
+                parse=self._parse,
+                temperature=self.temperature,
+            )
+            result = routed.result
+            if result is None:
+                self._parse.record("fallback")
+                raise ValueError("Unparseable escalation response")
+            result["model_calls"] = routed.calls
 
             status = "ESCALATED" if result["escalate"] else "AUTO-RESOLVED"
-            logger.info(f"Decision: {status} - {result['reason']}")
+            hot_logger.info("Decision: {} - {}", status, result["reason"])
 
             return result
 
         except Exception as e:
             logger.error(f"Escalation agent error: {str(e)}")
-            # Fail safe: escalate on error
-            return {"escalate": True, "reason": f"Error in escalation logic: {str(e)}"}
+            # Fail safe: escalate on error, still counting the calls made
+            return {
+                "escalate": True,
+                "reason": f"Error in escalation logic: {str(e)}",
+                "model_calls": routed.calls if routed else [],
+            }
 
 
 # Test
@@ -0,0 +1,275 @@
+from collections import deque
+from utils.config import config
+from utils.logger import hot_logger, logger
+from typing import Dict, List, Optional
+import threading
+import time
+import uuid
+
+import numpy as np
+
+
+class Cluster:
+    """Tickets about one problem: a running-mean centroid and recent arrivals"""
+
+    __slots__ = (
+        "id",
+        "slot",
+        "centroid",
+        "count",
+        "first_seen",
+        "last_seen",
+        "arrivals",
+        "ticket_ids",
+        "status",
+        "detected_at",
+        "outcome",
+        "shared",
+        "reused",
+    )
+
+    def __init__(self, slot: int, vector: np.ndarray, now: float, min_tickets: int):
+        self.id = f"INC-{str(uuid.uuid4())[:8].upper()}"
+        self.slot = slot
+        self.centroid = vector.copy()
+        self.count = 0
+        self.first_seen = now
+        self.last_seen = now
+        self.arrivals = deque(maxlen=min_tickets)
+        self.ticket_ids = deque(maxlen=20)
+        # "forming" -> "incident" (burst detected) -> "confirmed" -> "resolved"
+        self.status = "forming"
+        self.detected_at = None
+        # Best fully processed member: a candidate for review
+        self.outcome: Optional[dict] = None
+        # Resolution given to tickets joining once confirmed
+        self.shared: Optional[dict] = None
+        self.reused = 0
+
+    def summary(self) -> dict:
+        return {
+            "incident_id": self.id,
+            "status": self.status,
+            "tickets": self.count,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "detected_at": self.detected_at,
+            "recent_ticket_ids": list(self.ticket_ids),
+            "category": (self.outcome or {}).get("category"),
+            "sample_response": (self.shared or self.outcome or {}).get("response"),
+            "reused_resolutions": self.reused,
+        }
+
+
+class IncidentAgent:
+    """
+    Online clustering of incoming tickets to spot outages as they start
+
+    Leader clustering over ticket embeddings: a ticket joins the most
+    similar cluster when the cosine similarity to its centroid is at
+    least INCIDENT_SIMILARITY, and otherwise starts a new one. Centroids
+    live in one preallocated matrix, so assignment is one matrix-vector
+    product, and at most INCIDENT_MAX_CLUSTERS are kept (the least
+    recently joined is dropped to make room).
+
+    A cluster that receives INCIDENT_MIN_TICKETS tickets within
+    INCIDENT_WINDOW_SECONDS becomes an incident. Once confirmed (by an
+    operator, or automatically with INCIDENT_AUTO_CONFIRM) and given a
+    response, tickets that join it get the incident's response and
+    escalation decision instead of running triage, retrieval, resolution
+    and escalation again. A member's answer is written for that customer,
+    so it is only shared once an operator has reviewed it (the incident's
+    sample_response); otherwise the operator supplies the response.
+    Direct answers are never offered: they are filled in per ticket.
+    """
+
+    def __init__(
+        self,
+        similarity: Optional[float] = None,
+        window_seconds: Optional[float] = None,
+        min_tickets: Optional[int] = None,
+        max_clusters: Optional[int] = None,
+        auto_confirm: Optional[bool] = None,
+    ):
+        self.similarity = similarity or config.INCIDENT_SIMILARITY
+        self.window = window_seconds or config.INCIDENT_WINDOW_SECONDS
+        self.min_tickets = min_tickets or config.INCIDENT_MIN_TICKETS
+        self.max_clusters = max_clusters or config.INCIDENT_MAX_CLUSTERS
+        self.auto_confirm = (
+            config.INCIDENT_AUTO_CONFIRM if auto_confirm is None else auto_confirm
+        )
+
+        self._matrix: Optional[np.ndarray] = None  # Normalized centroids by slot
+        # Last arrival per slot; -inf marks a free slot, so argmin finds a
+        # free slot first and otherwise the least recently joined cluster
+        self._seen = np.full(self.max_clusters, -np.inf)
+        self._slots: List[Optional[Cluster]] = [None] * self.max_clusters
+        self._by_id: Dict[str, Cluster] = {}
+        self._lock = threading.Lock()
+        self.counters = {"assigned": 0, "clusters_created": 0, "evicted": 0}
+        self.assign_seconds = 0.0
+        logger.info("Incident Agent initialized")
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def _free_slot(self) -> int:
+        slot = int(np.argmin(self._seen))
+        victim = self._slots[slot]
+        if victim is not None:
+            # Full: drop the cluster that has gone longest without a ticket
+            self._matrix[slot] = 0.0
+            del self._by_id[victim.id]
+            self.counters["evicted"] += 1
+        return slot
+
+    def assign(self, ticket_id: str, embedding, now: Optional[float] = None) -> dict:
+        """
+        Add a ticket to its cluster
+
+        Returns:
+            {"incident_id", "status", "similarity", "shared"}: shared is the
+            resolution to reuse, or None when the ticket must be processed
+        """
+        start = time.perf_counter()
+        now = time.time() if now is None else now
+        vector = self._normalize(embedding)
+
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_clusters, len(vector)), np.float32)
+
+            scores = self._matrix @ vector
+            slot = int(np.argmax(scores))
+            similarity = float(scores[slot])
+            cluster = self._slots[slot]
+            if cluster is None or similarity < self.similarity:
+                slot = self._free_slot()
+                cluster = Cluster(slot, vector, now, self.min_tickets)
+                self._slots[slot] = cluster
+                self._by_id[cluster.id] = cluster
+                self.counters["clusters_created"] += 1
+                similarity = 1.0
+
+            cluster.count += 1
+            cluster.centroid += (vector - cluster.centroid) / cluster.count
+            self._matrix[slot] = self._normalize(cluster.centroid)
+            cluster.last_seen = self._seen[slot] = now
+            cluster.arrivals.append(now)
+            cluster.ticket_ids.append(ticket_id)
+            self._check_burst(cluster, now)
+
+            shared = cluster.shared if cluster.status == "confirmed" else None
+            if shared is not None:
+                cluster.reused += 1
+            result = {
+                "incident_id": cluster.id,
+                "status": cluster.status,
+                "similarity": round(similarity, 4),
+                "shared": shared,
+            }
+            self.counters["assigned"] += 1
+            self.assign_seconds += time.perf_counter() - start
+        return result
+
+    def _check_burst(self, cluster: Cluster, now: float):
+        if cluster.status != "forming":
+            return
+        arrivals = cluster.arrivals
+        if len(arrivals) == self.min_tickets and now - arrivals[0] <= self.window:
+            cluster.status = "incident"
+            cluster.detected_at = now
+            logger.warning(
+                "🚨 Incident {}: {} similar tickets in {:.0f}s",
+                cluster.id,
+                cluster.count,
+                now - arrivals[0],
+            )
+            if self.auto_confirm:
+                self._confirm(cluster)
+
+    def record(self, incident_id: str, state: dict):
+        """Offer a member's full-pipeline outcome for review as the resolution"""
+        with self._lock:
+            cluster = self._by_id.get(incident_id)
+            if cluster is None or state.get("response") is None:
+                return
+            if state.get("direct_answer"):
+                # Filled in with that ticket's id and email address
+                return
+            confidence = state.get("confidence") or 0.0
+            if cluster.outcome is None or confidence > cluster.outcome["confidence"]:
+                cluster.outcome = {
+                    "category": state.get("category"),
+                    "priority": state.get("priority"),
+                    "response": state["response"],
+                    "confidence": confidence,
+                    "escalate": bool(state.get("escalate")),
+                    "escalation_reason": state.get("escalation_reason"),
+                }
+
+    def _confirm(
+        self, cluster: Cluster, resolution: Optional[dict] = None, reviewed=False
+    ):
+        cluster.status = "confirmed"
+        resolution = resolution or {}
+        if not resolution.get("response") and not (reviewed and cluster.outcome):
+            # Nothing an operator has written or checked: don't share yet
+            return
+        cluster.shared = {"escalate": False, **(cluster.outcome or {}), **resolution}
+        hot_logger.info("Incident {} resolution is now shared", cluster.id)
+
+    def confirm(
+        self,
+        incident_id: str,
+        resolution: Optional[dict] = None,
+        reviewed: bool = False,
+    ) -> dict:
+        """
+        Confirm an incident so joining tickets reuse its resolution
+
+        Args:
+            resolution: Overrides (response, escalate, escalation_reason,
+                ...) on top of the best member outcome
+            reviewed: The operator checked the incident's sample_response
+                and it may be sent as is; without it (or a response in
+                `resolution`) nothing is shared
+        """
+        with self._lock:
+            cluster = self._by_id.get(incident_id)
+            if cluster is None:
+                raise KeyError(incident_id)
+            self._confirm(cluster, resolution, reviewed)
+            return cluster.summary()
+
+    def resolve(self, incident_id: str) -> dict:
+        """Stop sharing the resolution; new tickets are processed normally"""
+        with self._lock:
+            cluster = self._by_id.get(incident_id)
+            if cluster is None:
+                raise KeyError(incident_id)
+            cluster.status = "resolved"
+            cluster.shared = None
+            return cluster.summary()
+
+    def incidents(self) -> List[dict]:
+        """Detected incidents, most recently active first"""
+        with self._lock:
+            found = [c.summary() for c in self._by_id.values() if c.status != "forming"]
+        return sorted(found, key=lambda c: c["last_seen"], reverse=True)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            assigned = self.counters["assigned"]
+            return {
+                "clusters": len(self._by_id),
+                "max_clusters": self.max_clusters,
+                **self.counters,
+                "reused_resolutions": sum(c.reused for c in self._by_id.values()),
+                "avg_assign_us": (
+                    round(self.assign_seconds / assigned * 1e6, 2) if assigned else 0.0
+                ),
+            }
@@ -1,34 +1,84 @@
 from database.qdrant_manager import QdrantManager
-from utils.logger import logger
-from typing import List
+from utils.config import config
+from utils.logger import hot_logger, logger
+from typing import List, Optional
 
 
 class KnowledgeAgent:
-    def __init__(self):
-        self.vector_db = QdrantManager()
+    def __init__(self, vector_db: Optional[QdrantManager] = None):
+        self.vector_db = vector_db or QdrantManager()
         logger.info("Knowledge Agent initialized")
 
-    def retrieve_context(self, keywords: List[str], top_k: int = 3) -> List[dict]:
+    def retrieve_context(
+        self,
+        keywords: List[str],
+        top_k: int = 3,
+        category: Optional[str] = None,
+        query_vector: Optional[List[float]] = None,
+    ) -> List[dict]:
         """
         Retrieve relevant documentation based on keywords
 
+        A precomputed `query_vector` (the ticket embedding) is searched with
+        directly; otherwise the keywords are embedded once, through the
+        shared embedding cache.
+
+        When the triage category maps to document categories, the search is
+        restricted to them first and falls back to the whole corpus if the
+        filtered search comes back thin.
+
         Args:
             keywords: List of search keywords from triage
             top_k: Number of results to return
+            category: Ticket category from triage
+            query_vector: Precomputed query embedding
 
         Returns:
             List of relevant documents
         """
         try:
-            # Combine keywords into search query
-            query = " ".join(keywords)
+            if query_vector is None:
+                # Combine keywords into search query
+                query = " ".join(keywords)
+                hot_logger.info("Retrieving context for: {}", query)
+                query_vector = self.vector_db.embed(query)
+            else:
+                hot_logger.info("Retrieving context for ticket embedding")
+
+            doc_categories = config.RETRIEVAL_CATEGORY_FILTERS.get(category)
+            results = []
+
+            if doc_categories:
+                results = self.vector_db.search(
+                    top_k=top_k, categories=doc_categories, query_vector=query_vector
+                )
 
-            logger.info(f"Retrieving context for: {query}")
+            if (
+                len(results) < min(config.RETRIEVAL_MIN_FILTERED_HITS, top_k)
+                or not results
+                or results[0]["score"] < config.RETRIEVAL_MIN_FILTERED_SCORE
+            ):
+                if doc_categories:
+                    hot_logger.info(
+                        "Filtered search for {} returned {} hits, "
+                        "falling back to full corpus",
+                        category,
+                        len(results),
+                    )
 
-            # Search vector database
-            results = self.vector_db.search(query, top_k=top_k)
+                # Search vector database, merging with any filtered hits
+                seen = {r["id"] for r in results}
+                results += [
+                    r
+                    for r in self.vector_db.search(
+                        top_k=top_k, query_vector=query_vector
+                    )
+                    if r["id"] not in seen
+                ]
+                results = sorted(results, key=lambda r: r["score"], reverse=True)
+                results = results[:top_k]
 
-            logger.success(f"Retrieved {len(results)} relevant documents")
+            hot_logger.success("Retrieved {} relevant documents", len(results))
 
             return results
 
@@ -0,0 +1,169 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from collections import OrderedDict
+from utils.config import config
+from utils.logger import hot_logger, logger
+from utils.tokens import estimate_tokens
+from typing import Dict, List, Optional, Tuple
+import threading
+import time
+
+
+def load_cross_encoder(model_name: str):
+    """Load a sentence-transformers CrossEncoder pinned to CPU"""
+    from sentence_transformers import CrossEncoder
+
+    return CrossEncoder(model_name, device="cpu", max_length=256)
+
+
+class RerankAgent:
+    def __init__(self, model=None):
+        # Loaded up front so the first ticket doesn't pay for it
+        self.model = model or load_cross_encoder(config.RERANK_MODEL)
+        self.top_n = config.RERANK_TOP_N
+        self.time_budget = config.RERANK_TIME_BUDGET_MS / 1000
+
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._cache_size = config.RERANK_CACHE_SIZE
+        self._lock = threading.Lock()
+
+        # One scoring thread: a CPU model gains nothing from parallel calls
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._seconds_per_pair: Optional[float] = None
+
+        self.stats = {"reranked": 0, "skipped": 0, "cache_hits": 0, "scored": 0}
+        logger.info("Rerank Agent initialized")
+
+    def _cache_get(self, key: Tuple[str, str]) -> Optional[float]:
+        with self._lock:
+            score = self._cache.get(key)
+            if score is not None:
+                self._cache.move_to_end(key)
+            return score
+
+    def _cache_put(self, pairs: List[Tuple[str, str]], scores):
+        with self._lock:
+            for key, score in zip(pairs, scores):
+                self._cache[key] = float(score)
+                self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def _score(self, query: str, documents: List[dict], keys: List[Tuple[str, str]]):
+        start = time.perf_counter()
+        scores = self.model.predict(
+            [(query, doc["content"]) for doc in documents], batch_size=len(documents)
+        )
+        per_pair = (time.perf_counter() - start) / len(documents)
+
+        # Moving average used to predict whether the next batch fits the budget
+        if self._seconds_per_pair is None:
+            self._seconds_per_pair = per_pair
+        else:
+            self._seconds_per_pair = 0.8 * self._seconds_per_pair + 0.2 * per_pair
+
+        self._cache_put(keys, scores)
+        return scores
+
+    def rerank(
+        self, query: str, documents: List[dict], top_n: Optional[int] = None
+    ) -> Tuple[List[dict], Dict]:
+        """
+        Re-order retrieved documents with the cross-encoder
+
+        If scoring can't finish within the time budget the vector-search
+        order is kept, so re-ranking never adds more than the budget.
+
+        Args:
+            query: Ticket text
+            documents: Candidates from vector search, best first
+            top_n: Number of documents to keep
+
+        Returns:
+            (kept documents, stats for this call)
+        """
+        top_n = top_n or self.top_n
+        start = time.perf_counter()
+        info = {"candidates": len(documents), "kept": min(top_n, len(documents))}
+
+        keys = [(query, str(doc.get("id") or doc["content"])) for doc in documents]
+        scores = [self._cache_get(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+        info["cache_hits"] = len(documents) - len(missing)
+        self.stats["cache_hits"] += info["cache_hits"]
+
+        skipped_reason = None
+        if missing:
+            expected = (self._seconds_per_pair or 0.0) * len(missing)
+            if expected > self.time_budget:
+                skipped_reason = "predicted_over_budget"
+            else:
+                future = self._executor.submit(
+                    self._score,
+                    query,
+                    [documents[i] for i in missing],
+                    [keys[i] for i in missing],
+                )
+                try:
+                    new_scores = future.result(timeout=self.time_budget)
+                    for i, score in zip(missing, new_scores):
+                        scores[i] = float(score)
+                    self.stats["scored"] += len(missing)
+                except FutureTimeout:
+                    # Scoring finishes in the background and still fills the cache
+                    skipped_reason = "timeout"
+
+        info["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+        if skipped_reason:
+            self.stats["skipped"] += 1
+            info["skipped"] = skipped_reason
+            logger.warning(f"Re-rank skipped ({skipped_reason}), keeping vector order")
+            return documents[:top_n], info
+
+        ranked = sorted(
+            (
+                {**doc, "vector_score": doc["score"], "score": score}
+                for doc, score in zip(documents, scores)
+            ),
+            key=lambda doc: doc["score"],
+            reverse=True,
+        )
+        self.stats["reranked"] += 1
+        info["skipped"] = None
+
+        hot_logger.info(
+            "Re-ranked {} candidates in {:.1f}ms", len(documents), info["latency_ms"]
+        )
+
+        return ranked[:top_n], info
+
+    @staticmethod
+    def context_tokens(documents: List[dict]) -> int:
+        return sum(estimate_tokens(doc["content"]) for doc in documents)
+
+
+# Test the agent
+if __name__ == "__main__":
+    agent = RerankAgent()
+
+    candidates = [
+        {
+            "id": "1",
+            "content": "Our office is closed on public holidays.",
+            "score": 0.41,
+        },
+        {
+            "id": "2",
+            "content": "If password reset emails don't arrive, check your spam folder.",
+            "score": 0.39,
+        },
+        {"id": "3", "content": "Invoices are sent on the 1st.", "score": 0.35},
+    ]
+
+    kept, info = agent.rerank("I didn't get the password reset email", candidates, 2)
+
+    print("\n" + "=" * 70)
+    for doc in kept:
+        print(f"[{doc['score']:.3f}] {doc['content']}")
+    print(info)
+    print("=" * 70)
@@ -1,39 +1,75 @@
-from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
+from pydantic import BaseModel, Field, field_validator
 from utils.config import config
+from utils.model_router import ModelRouter
+from utils.structured_output import StructuredOutput
 from utils.prompts import RESOLUTION_SYSTEM_PROMPT
-from utils.logger import logger
-import json
+from utils.logger import hot_logger, logger
+from utils.tokens import estimate_tokens
+
+
+class ResolutionOutput(BaseModel):
+    response: str
+    confidence: float = Field(ge=0.0, le=1.0)
+
+    @field_validator("confidence", mode="before")
+    @classmethod
+    def _percent(cls, value):
+        # "85%" or 85 for 0.85
+        if isinstance(value, str):
+            value = value.strip().rstrip("%")
+        value = float(value)
+        return value / 100 if 1.0 < value <= 100.0 else value
 
 
 class ResolutionAgent:
-    def __init__(self):
-        self.llm = ChatGroq(
-            api_key=config.GROQ_API_KEY,
-            model=config.GROQ_MODEL,
-            temperature=0.3,  # Slightly creative for natural responses
-        )
+    _parse = StructuredOutput("resolution", ResolutionOutput)
+
+    def __init__(self, llm=None, router=None):
+        self.router = router or ModelRouter(llm=llm)
+        self.temperature = 0.3  # Slightly creative for natural responses
         logger.info("Resolution Agent initialized")
 
-    def generate_response(
-        self, ticket_content: str, context: str, category: str, priority: str
-    ) -> dict:
-        """
-        Generate customer-ready response using retrieved context
+    @staticmethod
+    def _accept(result: dict) -> bool:
+        return result["confidence"] >= config.MODEL_MIN_CONFIDENCE
 
-        Args:
-            ticket_content: Original ticket
-            context: Retrieved documentation
-            category: Ticket category
-            priority: Ticket priority
+    @staticmethod
+    def prompt_documents(docs: list) -> list:
+        """
+        Retrieved documents as they go into the prompt
 
-        Returns:
-            dict with response and confidence score
+        The top RETRIEVAL_FULL_TEXT_TOP keep their full text; the others
+        are replaced by their stored digest when they have one that is
+        shorter (see database/knowledge_digest.py).
         """
-        try:
-            logger.info("Generating resolution response")
+        if not config.RETRIEVAL_USE_DIGESTS:
+            return docs
+        return [
+            (
+                {**doc, "content": doc["digest"], "digested": True}
+                if i >= config.RETRIEVAL_FULL_TEXT_TOP
+                and doc.get("digest")
+                and len(doc["digest"]) < len(doc["content"])
+                else doc
+            )
+            for i, doc in enumerate(docs)
+        ]
+
+    @staticmethod
+    def format_context(docs: list) -> str:
+        """Retrieved documents as the prompt's documentation section"""
+        return "\n\n".join(
+            f"[Doc {i + 1}, relevance: {d['score']:.2f}"
+            f"{', digest' if d.get('digested') else ''}]\n{d['content']}"
+            for i, d in enumerate(docs)
+        )
 
-            prompt = f"""CUSTOMER TICKET:
+    @staticmethod
+    def build_messages(
+        ticket_content: str, context: str, category: str, priority: str
+    ) -> list:
+        prompt = f"""CUSTOMER TICKET:
 {ticket_content}
 
 TICKET INFO:
@@ -53,32 +89,77 @@ Output format (JSON):
 }}
 """
 
-            messages = [
-                SystemMessage(content=RESOLUTION_SYSTEM_PROMPT),
-                HumanMessage(content=prompt),
-            ]
+        return [
+            SystemMessage(content=RESOLUTION_SYSTEM_PROMPT),
+            HumanMessage(content=prompt),
+        ]
 
-            response = self.llm.invoke(messages)
+    def prompt_tokens(
+        self, ticket_content: str, context: str, category: str, priority: str
+    ) -> int:
+        """Estimated input tokens of the resolution prompt"""
+        messages = self.build_messages(ticket_content, context, category, priority)
+        return estimate_tokens("\n".join(m.content for m in messages))
 
-            # Parse JSON response
-            result = json.loads(response.content)
+    def generate_response(
+        self,
+        ticket_content: str,
+        context: str,
+        category: str,
+        priority: str,
+        budget: bool = False,
+    ) -> dict:
+        """
+        Generate customer-ready response using retrieved context
+
+        Args:
+            ticket_content: Original ticket
+            context: Retrieved documentation
+            category: Ticket category
+            priority: Ticket priority
+            budget: Use the "resolution.budget" model route (ticket is
+                nearing its token budget)
 
-            logger.success(f"Resolution generated (confidence: {result['confidence']})")
+        Returns:
+            dict with response and confidence score
+        """
+        try:
+            hot_logger.info("Generating resolution response")
+
+            messages = self.build_messages(ticket_content, context, category, priority)
+
+            # Low-priority tickets can start on a smaller model
+            routed = self.router.invoke(
+                "resolution",
+                messages,
+                parse=self._parse,
+                temperature=self.temperature,
+                priority="budget" if budget else priority,
+                accept=self._accept,
+            )
+            result = routed.result
+
+            if result is None:
+                logger.warning("Failed to parse resolution response, using fallback")
+                self._parse.record("fallback")
+                return {
+                    "response": routed.response.content,
+                    "confidence": 0.5,
+                    "raw_response": routed.response.content,
+                    "error": "json_parse_failed",
+                    "model_calls": routed.calls,
+                }
+
+            hot_logger.success(
+                "Resolution generated (confidence: {})", result["confidence"]
+            )
 
             return {
-                "response": result["response"],
-                "confidence": result["confidence"],
-                "raw_response": response.content,
+                **result,
+                "raw_response": routed.response.content,
+                "model_calls": routed.calls,
             }
 
-        except json.JSONDecodeError:
-            logger.warning("Failed to parse resolution response, using fallback")
-            return {
-                "response": response.content,
-                "confidence": 0.5,
-                "raw_response": response.content,
-                "error": "json_parse_failed",
-            }
         except Exception as e:
             logger.error(f"Resolution agent error: {str(e)}")
             raise
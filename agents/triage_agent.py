@@ -1,20 +1,48 @@
-from langchain_groq import ChatGroq
 from langchain_core.messages import SystemMessage, HumanMessage
-from utils.config import config
+from pydantic import BaseModel, field_validator
+from utils.model_router import ModelRouter
+from utils.structured_output import StructuredOutput
 from utils.prompts import TRIAGE_SYSTEM_PROMPT
-from utils.logger import logger
+from utils.logger import hot_logger, logger
+from typing import List
 import json
 
+CATEGORIES = {"technical", "billing", "general", "feature_request"}
+PRIORITIES = {"low", "medium", "high", "urgent"}
+
+
+class TriageOutput(BaseModel):
+    category: str
+    priority: str
+    # Optional so a reply cut off inside the list still yields the labels
+    keywords: List[str] = []
+
+    @field_validator("category", "priority", mode="before")
+    @classmethod
+    def _label(cls, value):
+        return "_".join(str(value).lower().split())
+
+    @field_validator("keywords", mode="before")
+    @classmethod
+    def _keywords(cls, value):
+        if isinstance(value, str):
+            return [k.strip() for k in value.split(",") if k.strip()]
+        return value
+
 
 class TriageAgent:
-    def __init__(self):
-        self.llm = ChatGroq(
-            api_key=config.GROQ_API_KEY,
-            model=config.GROQ_MODEL,
-            temperature=0.1,  # Low temperature for consistent categorization
-        )
+    _parse = StructuredOutput("triage", TriageOutput)
+
+    def __init__(self, llm=None, router=None):
+        self.router = router or ModelRouter(llm=llm)
+        self.temperature = 0.1  # Low temperature for consistent categorization
         logger.info("Triage Agent initialized")
 
+    @staticmethod
+    def _accept(result: dict) -> bool:
+        # Labels outside the prompt's lists suggest the model didn't follow it
+        return result["category"] in CATEGORIES and result["priority"] in PRIORITIES
+
     def analyze_ticket(self, ticket_content: str) -> dict:
         """
         Analyze incoming ticket and extract category, priority, keywords
@@ -26,7 +54,7 @@ class TriageAgent:
             dict with category, priority, keywords
         """
         try:
-            logger.info(f"Analyzing ticket: {ticket_content[:50]}...")
+            hot_logger.info("Analyzing ticket: {}...", ticket_content[:50])
 
             messages = [
                 SystemMessage(content=TRIAGE_SYSTEM_PROMPT),
@@ -35,32 +63,38 @@ class TriageAgent:
                 ),
             ]
 
-            response = self.llm.invoke(messages)
+            routed = self.router.invoke(
+                "triage",
+                messages,
+                parse=self._parse,
+                temperature=self.temperature,
+                accept=self._accept,
+            )
+            result = routed.result
 
-            # Parse JSON response
-            result = json.loads(response.content)
+            if result is None:
+                logger.error("Failed to parse triage response as JSON")
+                self._parse.record("fallback")
+                # Fallback to safe defaults
+                return {
+                    "category": "general",
+                    "priority": "medium",
+                    "keywords": ["support", "help"],
+                    "raw_response": routed.response.content,
+                    "error": "json_parse_failed",
+                    "model_calls": routed.calls,
+                }
 
-            logger.success(
-                f"Triage complete: {result['category']} - {result['priority']}"
+            hot_logger.success(
+                "Triage complete: {} - {}", result["category"], result["priority"]
             )
 
             return {
-                "category": result["category"],
-                "priority": result["priority"],
-                "keywords": result["keywords"],
-                "raw_response": response.content,
+                **result,
+                "raw_response": routed.response.content,
+                "model_calls": routed.calls,
             }
 
-        except json.JSONDecodeError:
-            logger.error("Failed to parse triage response as JSON")
-            # Fallback to safe defaults
-            return {
-                "category": "general",
-                "priority": "medium",
-                "keywords": ["support", "help"],
-                "raw_response": response.content,
-                "error": "json_parse_failed",
-            }
         except Exception as e:
             logger.error(f"Triage agent error: {str(e)}")
             raise
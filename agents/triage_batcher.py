@@ -0,0 +1,276 @@
+from langchain_core.messages import SystemMessage, HumanMessage
+from pydantic import BaseModel, ValidationError, model_validator
+from agents.triage_agent import TriageAgent, TriageOutput
+from utils.config import config
+from utils.logger import hot_logger, logger
+from utils.prompts import TRIAGE_BATCH_SYSTEM_PROMPT, TRIAGE_SYSTEM_PROMPT
+from utils.structured_output import StructuredOutput
+from utils.tokens import estimate_tokens
+from typing import Any, Dict, List, Optional
+import threading
+import time
+
+
+class TriageBatchOutput(BaseModel):
+    # Items are validated one by one, so one bad item doesn't sink the batch
+    results: List[Dict[str, Any]]
+
+    @model_validator(mode="before")
+    @classmethod
+    def _wrap(cls, value):
+        if isinstance(value, list):
+            return {"results": value}
+        if isinstance(value, dict) and "results" not in value:
+            return {"results": value.get("tickets")}
+        return value
+
+
+class _Pending:
+    __slots__ = ("key", "text", "enqueued", "done", "result", "error", "retry")
+
+    def __init__(self, key: str, text: str):
+        self.key = key
+        self.text = text
+        self.enqueued = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.retry = False
+
+
+class TriageBatcher:
+    """
+    Triages concurrent tickets together in one LLM call during bursts
+
+    The first ticket to arrive opens a batch and waits for others; the
+    batch closes when it reaches `max_batch` tickets or the window ends,
+    and that first caller sends it as one prompt asking for a list of
+    results keyed by ticket id (inside a JSON object, for JSON mode). Each item is validated on its own; an
+    item that is missing or invalid is re-triaged individually by its own
+    caller (through the TriageAgent, so the usual model escalation applies).
+
+    The window adapts to load. Arrival gaps are tracked as a moving
+    average: when fewer than one more ticket is expected within
+    `max_wait_ms` the ticket is triaged alone immediately, so quiet
+    periods pay no queueing delay. Otherwise the window is the expected
+    time to fill a batch, capped at `max_wait_ms`.
+
+    Token usage of a batch call is split evenly over its tickets. Callers
+    are graph nodes running on worker threads, so everything here blocks.
+    """
+
+    def __init__(
+        self,
+        triage_agent: Optional[TriageAgent] = None,
+        max_batch: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        wait_timeout: Optional[float] = None,
+    ):
+        self.triage_agent = triage_agent or TriageAgent()
+        self.max_batch = max_batch or config.TRIAGE_BATCH_MAX_SIZE
+        self.max_wait = (max_wait_ms or config.TRIAGE_BATCH_MAX_WAIT_MS) / 1000
+        # Longest a caller waits for someone else's batch call
+        self.wait_timeout = wait_timeout or config.TRIAGE_BATCH_WAIT_TIMEOUT
+
+        self._cond = threading.Condition()
+        self._open: Optional[List[_Pending]] = None  # Batch still taking tickets
+        self._last_arrival = None
+        self._gap = float("inf")  # Moving average of seconds between arrivals
+        self.counters = {
+            "tickets": 0,
+            "solo": 0,
+            "batches": 0,
+            "batched_tickets": 0,
+            "retried": 0,
+            "timed_out": 0,
+            "calls_saved": 0,
+            "tokens_saved": 0,
+            "queue_ms_total": 0.0,
+            "queue_ms_max": 0.0,
+        }
+
+    def _observe(self, now: float):
+        if self._last_arrival is not None:
+            gap = min(now - self._last_arrival, 10.0)
+            self._gap = (
+                gap if self._gap == float("inf") else 0.8 * self._gap + 0.2 * gap
+            )
+        self._last_arrival = now
+
+    def window(self) -> float:
+        """Seconds a new batch stays open at the current load (0 = don't batch)"""
+        if self.max_batch < 2 or self.max_wait / self._gap < 1:
+            return 0.0
+        return min(self.max_wait, (self.max_batch - 1) * self._gap)
+
+    def analyze(self, ticket_id: str, ticket_content: str) -> dict:
+        """
+        Triage one ticket, batched with concurrent ones when load allows
+
+        Returns:
+            The TriageAgent.analyze_ticket result for this ticket
+        """
+        item = _Pending(ticket_id, ticket_content)
+        with self._cond:
+            self.counters["tickets"] += 1
+            self._observe(item.enqueued)
+            batch, leader = self._open, False
+            if batch is None:
+                window = self.window()
+                if window:
+                    batch = self._open = [item]
+                    leader = True
+            else:
+                batch.append(item)
+                if len(batch) >= self.max_batch:
+                    self._open = None
+                    self._cond.notify_all()
+
+        if batch is None:
+            with self._cond:
+                self.counters["solo"] += 1
+            return self.triage_agent.analyze_ticket(ticket_content)
+
+        if leader:
+            with self._cond:
+                self._cond.wait_for(lambda: self._open is not batch, timeout=window)
+                if self._open is batch:
+                    self._open = None
+                self._record_wait(batch)
+                alone = len(batch) == 1
+                if alone:
+                    self.counters["solo"] += 1
+            if alone:
+                # Nobody joined in time; no batch prompt for a single ticket
+                return self.triage_agent.analyze_ticket(ticket_content)
+            self._run(batch)
+        elif not item.done.wait(self.wait_timeout):
+            # The batch call is stuck; don't hold this worker thread forever
+            logger.warning(f"Batch triage timed out for {item.key}, triaging alone")
+            with self._cond:
+                self.counters["timed_out"] += 1
+            return self.triage_agent.analyze_ticket(ticket_content)
+
+        if item.error is not None:
+            raise item.error
+        if item.retry:
+            hot_logger.info("Re-triaging {} on its own", item.key)
+            return self.triage_agent.analyze_ticket(ticket_content)
+        return item.result
+
+    def _messages(self, keys: List[str], batch: List[_Pending]) -> list:
+        tickets = "\n\n".join(f"[{key}]\n{item.text}" for key, item in zip(keys, batch))
+        return [
+            SystemMessage(content=TRIAGE_BATCH_SYSTEM_PROMPT),
+            HumanMessage(content=f"Analyze these support tickets:\n\n{tickets}"),
+        ]
+
+    _parse = StructuredOutput("triage_batch", TriageBatchOutput)
+
+    @staticmethod
+    def _item(raw: Optional[dict]) -> Optional[dict]:
+        """A validated triage result, or None to re-triage the ticket alone"""
+        if raw is None:
+            return None
+        try:
+            result = TriageOutput.model_validate(raw).model_dump()
+        except ValidationError:
+            return None
+        return result if TriageAgent._accept(result) else None
+
+    def _record_wait(self, batch: List[_Pending]):
+        start = time.monotonic()
+        for item in batch:
+            waited = (start - item.enqueued) * 1000
+            self.counters["queue_ms_total"] += waited
+            self.counters["queue_ms_max"] = max(self.counters["queue_ms_max"], waited)
+
+    def _run(self, batch: List[_Pending]):
+        """Triage the batch; every waiting caller is released, whatever happens"""
+        try:
+            self._triage(batch)
+        except Exception as e:
+            logger.error(f"Batch triage error: {str(e)}")
+            for item in batch:
+                if item.result is None and not item.retry:
+                    item.error = e
+        finally:
+            for item in batch:
+                item.done.set()
+
+    def _triage(self, batch: List[_Pending]):
+        # Ticket ids key the results; positions stand in if ids repeat
+        keys = [item.key for item in batch]
+        if len(set(keys)) < len(keys):
+            keys = [str(i + 1) for i in range(len(batch))]
+
+        messages = self._messages(keys, batch)
+        routed = self.triage_agent.router.invoke(
+            "triage",
+            messages,
+            parse=self._parse,
+            temperature=self.triage_agent.temperature,
+        )
+
+        n = len(batch)
+        shares = [
+            {
+                **call,
+                "input_tokens": round((call.get("input_tokens") or 0) / n),
+                "output_tokens": round((call.get("output_tokens") or 0) / n),
+                "batch_size": n,
+            }
+            for call in routed.calls
+        ]
+        results = {
+            str(r["id"]): r
+            for r in (routed.result or {}).get("results", [])
+            if "id" in r
+        }
+        retried = 0
+        for key, item in zip(keys, batch):
+            result = self._item(results.get(key))
+            if result is None:
+                item.retry = True
+                retried += 1
+            else:
+                item.result = {
+                    **result,
+                    "raw_response": routed.response.content,
+                    "model_calls": shares,
+                }
+
+        # What the same tickets would have sent as individual prompts
+        solo_tokens = sum(
+            estimate_tokens(TRIAGE_SYSTEM_PROMPT)
+            + estimate_tokens(f"Analyze this support ticket:\n\n{item.text}")
+            for item in batch
+        )
+        batch_tokens = sum(call.get("input_tokens") or 0 for call in routed.calls)
+        with self._cond:
+            self.counters["batches"] += 1
+            self.counters["batched_tickets"] += n
+            self.counters["retried"] += retried
+            self.counters["calls_saved"] += n - len(routed.calls) - retried
+            self.counters["tokens_saved"] += solo_tokens - batch_tokens
+
+        hot_logger.info(
+            "Batch triaged {} tickets in one call ({} re-triaged alone)", n, retried
+        )
+
+    def stats(self) -> Dict:
+        with self._cond:
+            counters = dict(self.counters)
+            window = self.window()
+        # Averaged over every ticket, including those triaged without waiting
+        tickets = counters["tickets"]
+        counters["queue_ms_mean"] = round(
+            counters.pop("queue_ms_total") / tickets if tickets else 0.0, 3
+        )
+        counters["queue_ms_max"] = round(counters["queue_ms_max"], 3)
+        return {
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "window_ms": round(window * 1000, 3),
+            **counters,
+        }
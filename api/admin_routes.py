@@ -0,0 +1,126 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+from api.routes import admin_key_valid, profiler, workflow
+from database.knowledge_sync import KnowledgeSync
+from utils.config import config
+from utils.logger import logger
+from typing import List, Literal
+
+
+def verify_admin_key(x_admin_key: str | None = Header(default=None)):
+    """Require the admin key; the admin API is disabled when none is set"""
+    if not config.ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="Admin API disabled")
+
+    if not admin_key_valid(x_admin_key):
+        raise HTTPException(status_code=401, detail="Invalid admin key")
+
+
+router = APIRouter(dependencies=[Depends(verify_admin_key)])
+
+
+class KnowledgeDocument(BaseModel):
+    content: str
+    id: str | None = None
+    metadata: dict = {}
+
+
+class KnowledgeSyncRequest(BaseModel):
+    documents: List[KnowledgeDocument]
+    # Deleting documents missing from `documents` must be asked for
+    prune: bool = False
+    full: bool = False
+
+
+class ProfileSampling(BaseModel):
+    sample_rate: float = Field(ge=0.0, le=1.0)
+
+
+class IncidentConfirmation(BaseModel):
+    # Overrides on top of the best member answer; nothing is shared until
+    # there is a response or the sample_response was reviewed
+    response: str | None = None
+    escalate: bool | None = None
+    escalation_reason: str | None = None
+    reviewed: bool = False
+
+
+@router.post("/knowledge/sync")
+async def sync_knowledge(request: KnowledgeSyncRequest):
+    """Incrementally sync documents into the knowledge base"""
+    try:
+        sync = KnowledgeSync(workflow.knowledge_agent.vector_db)
+        documents = (doc.model_dump(exclude_none=True) for doc in request.documents)
+
+        # Embedding is CPU-bound, keep it off the event loop
+        report = await run_in_threadpool(
+            sync.sync, documents, prune=request.prune, full=request.full
+        )
+        return report
+
+    except Exception as e:
+        logger.error(f"API error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """Stored ticket profiles, newest first"""
+    return {"profiles": profiler.list(), **profiler.stats()}
+
+
+@router.put("/profiles/sampling")
+async def set_profile_sampling(request: ProfileSampling):
+    """Profile this fraction of tickets without the X-Profile header"""
+    profiler.sample_rate = request.sample_rate
+    logger.info(f"Profile sample rate set to {request.sample_rate}")
+    return profiler.stats()
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str, format: Literal["json", "collapsed", "speedscope"] = "json"
+):
+    """One profile: per-node timings, or the stacks for a flame graph viewer"""
+    profile = profiler.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "collapsed":
+        return PlainTextResponse(profile.to_collapsed())
+    if format == "speedscope":
+        return profile.to_speedscope()
+    return profile.to_dict()
+
+
+def _incidents():
+    if not workflow.incident_agent:
+        raise HTTPException(status_code=404, detail="Incident detection disabled")
+    return workflow.incident_agent
+
+
+@router.post("/incidents/{incident_id}/confirm")
+async def confirm_incident(
+    incident_id: str, request: IncidentConfirmation | None = None
+):
+    """Confirm an incident: new matching tickets reuse its resolution"""
+    overrides = request.model_dump(exclude_none=True) if request else {}
+    reviewed = overrides.pop("reviewed", False)
+    try:
+        incident = _incidents().confirm(incident_id, overrides or None, reviewed)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Incident not found")
+    logger.info(f"Incident {incident_id} confirmed")
+    return incident
+
+
+@router.post("/incidents/{incident_id}/resolve")
+async def resolve_incident(incident_id: str):
+    """Stop reusing the incident's resolution; tickets are processed normally"""
+    try:
+        incident = _incidents().resolve(incident_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Incident not found")
+    logger.info(f"Incident {incident_id} resolved")
+    return incident
@@ -0,0 +1,159 @@
+from collections import deque
+from fastapi.concurrency import run_in_threadpool
+from utils.config import config
+from utils.logger import hot_logger, logger
+from typing import Dict, Optional
+import asyncio
+import re
+import time
+
+
+class AdmissionController:
+    """
+    Bounded concurrency for the ticket pipeline with queue-time shedding
+
+    At most `max_in_flight` tickets run the full pipeline. Others wait in a
+    FIFO queue (urgent tickets in their own queue, served first); a ticket
+    that can't get a slot within `max_queue_wait_ms`, or arrives to a full
+    queue, is shed to the degraded path instead of being rejected.
+
+    All state is touched only from the event loop, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_queue_wait_ms: Optional[float] = None,
+        degraded_hold_seconds: Optional[float] = None,
+    ):
+        self.max_in_flight = max_in_flight or config.ADMISSION_MAX_IN_FLIGHT
+        self.max_queue = max_queue or config.ADMISSION_MAX_QUEUE
+        self.max_queue_wait = (
+            max_queue_wait_ms or config.ADMISSION_MAX_QUEUE_WAIT_MS
+        ) / 1000
+        self.degraded_hold = (
+            degraded_hold_seconds or config.ADMISSION_DEGRADED_HOLD_SECONDS
+        )
+        self.urgent_pattern = re.compile(config.ADMISSION_URGENT_PATTERN, re.I)
+
+        self.in_flight = 0
+        self._urgent: deque = deque()
+        self._normal: deque = deque()
+        self._last_shed = float("-inf")
+        self._queue_wait_ewma = 0.0
+        self.counters = {
+            "admitted": 0,
+            "admitted_urgent": 0,
+            "shed_queue_full": 0,
+            "shed_queue_timeout": 0,
+        }
+        logger.info(
+            f"Admission control: {self.max_in_flight} in flight, "
+            f"{self.max_queue} queued, {self.max_queue_wait * 1000:.0f} ms max wait"
+        )
+
+    def is_urgent(self, content: str) -> bool:
+        return self.urgent_pattern.search(content) is not None
+
+    @property
+    def queued(self) -> int:
+        return len(self._urgent) + len(self._normal)
+
+    @property
+    def degraded(self) -> bool:
+        return time.monotonic() - self._last_shed < self.degraded_hold
+
+    def _admitted(self, urgent: bool, waited: float):
+        self.counters["admitted"] += 1
+        if urgent:
+            self.counters["admitted_urgent"] += 1
+        self._queue_wait_ewma = 0.9 * self._queue_wait_ewma + 0.1 * waited
+
+    def _shed(self, reason: str):
+        self.counters[f"shed_{reason}"] += 1
+        self._last_shed = time.monotonic()
+
+    async def acquire(self, urgent: bool = False) -> bool:
+        """
+        Wait for a pipeline slot
+
+        Returns:
+            True when admitted (call `release` afterwards), False when shed
+        """
+        if self.in_flight < self.max_in_flight and not self.queued:
+            self.in_flight += 1
+            self._admitted(urgent, 0.0)
+            return True
+
+        if not urgent and self.queued >= self.max_queue:
+            self._shed("queue_full")
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue = self._urgent if urgent else self._normal
+        queue.append(waiter)
+        start = time.monotonic()
+
+        try:
+            await asyncio.wait_for(waiter, self.max_queue_wait)
+        except asyncio.TimeoutError:
+            if waiter in queue:
+                queue.remove(waiter)
+            self._shed("queue_timeout")
+            return False
+        except asyncio.CancelledError:
+            # Client went away; give back a slot handed over in the meantime
+            if waiter in queue:
+                queue.remove(waiter)
+            elif not waiter.cancelled():
+                self.release()
+            raise
+
+        # The slot was handed over by release(), in_flight already counts it
+        self._admitted(urgent, time.monotonic() - start)
+        return True
+
+    def release(self):
+        """Free a slot, handing it straight to the next waiter if any"""
+        for queue in (self._urgent, self._normal):
+            while queue:
+                waiter = queue.popleft()
+                if not waiter.done():
+                    waiter.set_result(True)
+                    return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict:
+        return {
+            "status": "degraded" if self.degraded else "ready",
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queued": self.queued,
+            "queued_urgent": len(self._urgent),
+            "max_queue": self.max_queue,
+            "queue_wait_ms_ewma": round(self._queue_wait_ewma * 1000, 1),
+            **self.counters,
+        }
+
+
+async def process_with_admission(
+    controller: AdmissionController, workflow, ticket_id: str, content: str
+) -> dict:
+    """
+    Run a ticket through the full pipeline, or the degraded one when shed
+
+    Both run in the threadpool so the event loop keeps accepting requests.
+    """
+    urgent = controller.is_urgent(content)
+
+    if not await controller.acquire(urgent):
+        hot_logger.info("Shedding {} to degraded mode", ticket_id)
+        return await run_in_threadpool(
+            workflow.process_degraded, ticket_id, content, urgent
+        )
+
+    try:
+        return await run_in_threadpool(workflow.process_ticket, ticket_id, content)
+    finally:
+        controller.release()
@@ -0,0 +1,156 @@
+from fastapi import WebSocket, WebSocketDisconnect
+from agents.analytics_agent import empty_totals, merge_totals, summarize_totals
+from utils.config import config
+from utils.logger import logger
+from typing import Dict, Optional, Set
+import asyncio
+import json
+import threading
+
+
+class _Subscriber:
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self, max_backlog: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_backlog)
+        self.dropped = False
+
+
+class AnalyticsFeed:
+    """
+    Pushes analytics to dashboards as a snapshot then coalesced deltas
+
+    Ticket deltas from `AnalyticsAgent.track_ticket` are merged into one
+    pending delta under a lock (the only work done on the ticket path).
+    A task on the event loop flushes it at most every `interval_ms`: the
+    message is serialized once and put on each subscriber's queue. A
+    subscriber whose queue is full is disconnected rather than slowing
+    the others; it can reconnect for a fresh snapshot.
+
+    Messages:
+        {"type": "snapshot", "seq": n, "totals": {...}, "summary": {...}}
+        {"type": "delta", "seq": n, "delta": {...}}
+
+    Deltas have the shape of the totals (see analytics_agent.empty_totals)
+    and apply on top of the message with seq - 1.
+    """
+
+    def __init__(
+        self,
+        analytics,
+        interval_ms: Optional[float] = None,
+        max_backlog: Optional[int] = None,
+    ):
+        self.analytics = analytics
+        self.interval = (interval_ms or config.ANALYTICS_FEED_INTERVAL_MS) / 1000
+        self.max_backlog = max_backlog or config.ANALYTICS_FEED_MAX_BACKLOG
+
+        self.seq = 0
+        self.published = empty_totals()  # Totals as of the last message
+        self._pending: Dict = {}
+        self._pending_lock = threading.Lock()
+        self._subscribers: Set[_Subscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.counters = {"messages": 0, "dropped_subscribers": 0}
+
+    def _on_ticket(self, delta: Dict):
+        # Runs on the tracking thread; merge only, never touch the loop
+        with self._pending_lock:
+            merge_totals(self._pending, delta)
+
+    def start(self):
+        """Subscribe to the analytics agent and start flushing (in the loop)"""
+        if self._task is None:
+            self.published = self.analytics.subscribe(self._on_ticket)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Analytics feed error: {str(e)}")
+
+    def flush(self) -> int:
+        """
+        Publish the pending delta, if any, to every subscriber
+
+        Returns:
+            Number of subscribers the message was queued for
+        """
+        with self._pending_lock:
+            delta, self._pending = self._pending, {}
+        if not delta:
+            return 0
+
+        merge_totals(self.published, delta)
+        self.seq += 1
+        message = json.dumps(
+            {"type": "delta", "seq": self.seq, "delta": delta}, separators=(",", ":")
+        )
+        self.counters["messages"] += 1
+
+        sent = 0
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+                sent += 1
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+        return sent
+
+    def _drop(self, subscriber: _Subscriber):
+        self._subscribers.discard(subscriber)
+        subscriber.dropped = True
+        self.counters["dropped_subscribers"] += 1
+        # Make room for the sentinel that wakes its sender
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+    def snapshot(self) -> str:
+        return json.dumps(
+            {
+                "type": "snapshot",
+                "seq": self.seq,
+                "totals": self.published,
+                "summary": summarize_totals(self.published),
+            },
+            separators=(",", ":"),
+        )
+
+    def add_subscriber(self) -> _Subscriber:
+        """Register a subscriber whose first message is the current snapshot"""
+        self.start()
+        subscriber = _Subscriber(self.max_backlog)
+        subscriber.queue.put_nowait(self.snapshot())
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def remove_subscriber(self, subscriber: _Subscriber):
+        self._subscribers.discard(subscriber)
+
+    async def serve(self, websocket: WebSocket):
+        """Stream the feed to one WebSocket until either side closes"""
+        await websocket.accept()
+        subscriber = self.add_subscriber()
+        try:
+            while True:
+                message = await subscriber.queue.get()
+                if message is None:
+                    await websocket.close(code=1013, reason="Too slow, reconnect")
+                    return
+                await websocket.send_text(message)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            self.remove_subscriber(subscriber)
+
+    def stats(self) -> Dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "seq": self.seq,
+            "interval_ms": self.interval * 1000,
+            **self.counters,
+        }
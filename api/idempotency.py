@@ -0,0 +1,166 @@
+from collections import OrderedDict
+from utils.config import config
+from utils.logger import hot_logger
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import re
+import time
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class IdempotencyConflictError(Exception):
+    """An Idempotency-Key was reused for a different ticket"""
+
+
+def content_fingerprint(content: str, ticket_id: Optional[str] = None) -> str:
+    """Hash of the ticket text, case and whitespace insensitive"""
+    normalized = _WHITESPACE_RE.sub(" ", content).strip().lower()
+    return hashlib.sha256(f"{ticket_id or ''}\0{normalized}".encode()).hexdigest()
+
+
+class _ExpiringCache:
+    """Insertion-ordered cache with one TTL, so the oldest entry expires first"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires, value)
+
+    def _evict(self, now: float):
+        while self._entries:
+            expires, _ = next(iter(self._entries.values()))
+            if expires > now and len(self._entries) <= self.max_entries:
+                return
+            self._entries.popitem(last=False)
+
+    def get(self, key: str):
+        self._evict(time.monotonic())
+        entry = self._entries.get(key)
+        return entry[1] if entry else None
+
+    def put(self, key: str, value):
+        now = time.monotonic()
+        self._entries.pop(key, None)
+        self._entries[key] = (now + self.ttl, value)
+        self._evict(now)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TicketDeduplicator:
+    """
+    Single-flight execution and result replay for duplicate submissions
+
+    A submission is identified by its Idempotency-Key header when sent,
+    otherwise by a fingerprint of its content. While one is running,
+    identical submissions await the same execution instead of starting
+    their own. Afterwards its result is replayed for `ttl_seconds` (keyed)
+    or `content_window_seconds` (fingerprinted; 0, the default, disables
+    fingerprinting, since content carries no client identity).
+    Failures are not stored, so a retry after an error runs again.
+
+    Both caches are bounded by `max_entries`. All state is touched only
+    from the event loop, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        content_window_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+    ):
+        ttl = ttl_seconds or config.IDEMPOTENCY_TTL_SECONDS
+        window = (
+            config.IDEMPOTENCY_CONTENT_WINDOW_SECONDS
+            if content_window_seconds is None
+            else content_window_seconds
+        )
+        max_entries = max_entries or config.IDEMPOTENCY_MAX_ENTRIES
+
+        self.fingerprinting = window > 0
+        # Both map key -> (fingerprint, result); the fingerprint catches reused keys
+        self._keyed = _ExpiringCache(ttl, max_entries)
+        self._content = _ExpiringCache(window, max_entries)
+        self._in_flight: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self.counters = {"executed": 0, "coalesced": 0, "replayed": 0, "conflicts": 0}
+
+    def _key(self, idempotency_key: Optional[str], fingerprint: str) -> Optional[str]:
+        if idempotency_key:
+            return f"key:{idempotency_key}"
+        if self.fingerprinting:
+            return f"content:{fingerprint}"
+        return None
+
+    def _check(self, stored_fingerprint: str, fingerprint: str):
+        if stored_fingerprint != fingerprint:
+            self.counters["conflicts"] += 1
+            raise IdempotencyConflictError(
+                "Idempotency-Key already used for a different ticket"
+            )
+
+    async def run(
+        self,
+        content: str,
+        execute: Callable[[], Awaitable],
+        idempotency_key: Optional[str] = None,
+        ticket_id: Optional[str] = None,
+    ) -> Tuple[object, bool]:
+        """
+        Run `execute` unless an identical submission already has
+
+        Returns:
+            (result, shared): shared is True when the result came from
+            another submission's execution, in flight or stored
+        """
+        fingerprint = content_fingerprint(content, ticket_id)
+        key = self._key(idempotency_key, fingerprint)
+        if key is None:
+            self.counters["executed"] += 1
+            return await execute(), False
+
+        cache = self._keyed if idempotency_key else self._content
+        stored = cache.get(key)
+        if stored is not None:
+            self._check(stored[0], fingerprint)
+            self.counters["replayed"] += 1
+            hot_logger.info("Replaying stored result for {}", key)
+            return stored[1], True
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self._check(in_flight[0], fingerprint)
+            self.counters["coalesced"] += 1
+            hot_logger.info("Coalescing duplicate submission {}", key)
+            # Shielded so a waiter disconnecting doesn't cancel the shared run
+            return await asyncio.shield(in_flight[1]), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = (fingerprint, future)
+        self.counters["executed"] += 1
+        try:
+            result = await execute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark it retrieved so it isn't reported as unhandled if nobody waits
+            future.exception()
+            raise
+        else:
+            cache.put(key, (fingerprint, result))
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict:
+        return {
+            "in_flight": len(self._in_flight),
+            "stored_keyed": len(self._keyed),
+            "stored_content": len(self._content),
+            **self.counters,
+        }
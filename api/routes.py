@@ -1,8 +1,25 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Response, WebSocket
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from graph.agent_graph import MultiAgentWorkflow
+from api.admission import AdmissionController, process_with_admission
+from api.analytics_feed import AnalyticsFeed
+from api.idempotency import IdempotencyConflictError, TicketDeduplicator
+from graph.agent_graph import (
+    MultiAgentWorkflow,
+    TicketConflictError,
+    TicketNotFoundError,
+)
+from graph.state import TicketResult
 from database.supabase_client import SupabaseManager
-from utils.logger import logger
+from utils.cassette import CassetteRecorder, enable_recording
+from utils.config import config
+from utils.embeddings import embedding_cache
+from utils.http_transport import http_transport
+from utils.logger import hot_logger, logger
+from utils.profiler import Profiler
+from utils.structured_output import output_stats
+from contextlib import nullcontext
+import secrets
 import uuid
 
 router = APIRouter()
@@ -10,11 +27,32 @@ router = APIRouter()
 # Initialize workflow and database
 workflow = MultiAgentWorkflow()
 db = SupabaseManager()
+admission = AdmissionController()
+profiler = Profiler()
+analytics_feed = AnalyticsFeed(workflow.analytics_agent)
+deduplicator = TicketDeduplicator()
+
+# Cassettes of real tickets for offline replay (benchmarks/replay_cassettes.py)
+recorder = None
+if config.CASSETTE_RECORD:
+    db = enable_recording(workflow, db)
+    recorder = CassetteRecorder(config.CASSETTE_DIR)
 
 
 # Request/Response models
 class TicketSubmit(BaseModel):
     content: str
+    # Resubmit with the ticket_id of a failed attempt to resume it; a
+    # failed submission reports it in the error detail and X-Ticket-Id
+    ticket_id: str | None = None
+
+
+class TicketProcessingError(Exception):
+    """Processing failed; resubmitting with `ticket_id` resumes from its checkpoint"""
+
+    def __init__(self, ticket_id: str, error: Exception):
+        super().__init__(str(error))
+        self.ticket_id = ticket_id
 
 
 class TicketResponse(BaseModel):
@@ -26,34 +64,165 @@ class TicketResponse(BaseModel):
     escalated: bool
     escalation_reason: str | None
     response_time: float
+    model_calls: list[dict] = []
+    total_tokens: int = 0
+    # Answered without the LLM stages because the service was overloaded
+    degraded: bool = False
+    # Incident the ticket was grouped into, once one has been detected
+    incident_id: str | None = None
+    # Set when the ticket was profiled; fetch via /api/admin/profiles/{id}
+    profile_id: str | None = None
+
+
+class MessageSubmit(BaseModel):
+    content: str
+
+
+class MessageResponse(TicketResponse):
+    # Topic drift, reuse of stored triage, tokens and latency of this turn
+    turn: dict
+
+
+def _ticket_response(result: TicketResult, response_model=TicketResponse, **extra):
+    return response_model(
+        ticket_id=result.ticket_id,
+        category=result.category,
+        priority=result.priority,
+        response=result.response,
+        confidence=result.confidence,
+        escalated=result.escalate,
+        escalation_reason=result.escalation_reason,
+        response_time=result.response_time,
+        model_calls=result.model_calls,
+        total_tokens=result.total_tokens,
+        degraded=result.degraded,
+        incident_id=result.incident_id,
+        **extra,
+    )
+
+
+def admin_key_valid(x_admin_key: str | None) -> bool:
+    """Whether the request carries the admin key (never, when none is set)"""
+    return bool(
+        config.ADMIN_API_KEY
+        and x_admin_key
+        and secrets.compare_digest(x_admin_key, config.ADMIN_API_KEY)
+    )
+
+
+def _profile_requested(x_profile: str | None, x_admin_key: str | None) -> bool:
+    # Sampling is expensive; an anonymous client may not switch it on
+    if x_profile in (None, "", "0", "false"):
+        return False
+    return config.PROFILE_HEADER_OPEN or admin_key_valid(x_admin_key)
+
+
+async def _process_submission(ticket: TicketSubmit, profile_requested: bool):
+    # Generate ticket ID
+    ticket_id = ticket.ticket_id or f"TICKET-{str(uuid.uuid4())[:8].upper()}"
+
+    hot_logger.info("API: Received ticket {}", ticket_id)
+
+    scope = recorder.scope(ticket_id, ticket.content) if recorder else nullcontext()
+    try:
+        with scope, profiler.scope(ticket_id, profile_requested) as profile:
+            # Process through workflow, or the degraded path when overloaded
+            state = await process_with_admission(
+                admission, workflow, ticket_id, ticket.content
+            )
+            # Only the compact result outlives this point, not the graph state
+            result = TicketResult.from_state(state)
+            del state
+
+            # Save to database
+            db.save_ticket(result)
+    except (TicketConflictError, HTTPException):
+        raise
+    except Exception as e:
+        raise TicketProcessingError(ticket_id, e) from e
+
+    return _ticket_response(result, profile_id=profile.id if profile else None)
 
 
 @router.post("/tickets", response_model=TicketResponse)
-async def submit_ticket(ticket: TicketSubmit):
-    """Submit a new support ticket"""
+async def submit_ticket(
+    ticket: TicketSubmit,
+    response: Response,
+    x_profile: str | None = Header(default=None),
+    x_admin_key: str | None = Header(default=None),
+    idempotency_key: str | None = Header(default=None),
+):
+    """
+    Submit a new support ticket; send `X-Profile: 1` with the admin key
+    (`X-Admin-Key`) to profile it. Without the key the header is ignored,
+    unless PROFILE_HEADER_OPEN is set.
+
+    Retries with the same Idempotency-Key share the first submission's
+    processing and result (marked with an `Idempotent-Replayed` header).
+    Submissions without a key are each processed: matching on content
+    alone would merge different customers reporting the same problem.
+    IDEMPOTENCY_CONTENT_WINDOW_SECONDS turns that matching on, for
+    deployments where every ticket comes from one trusted client.
+
+    When processing fails, the 500 response carries the ticket_id (in the
+    detail and the `X-Ticket-Id` header). Resubmit with that ticket_id
+    to resume from the last completed stage instead of starting over.
+    """
     try:
-        # Generate ticket ID
-        ticket_id = f"TICKET-{str(uuid.uuid4())[:8].upper()}"
+        requested = _profile_requested(x_profile, x_admin_key)
+        result, shared = await deduplicator.run(
+            ticket.content,
+            lambda: _process_submission(ticket, requested),
+            idempotency_key=idempotency_key,
+            ticket_id=ticket.ticket_id,
+        )
+        if shared:
+            response.headers["Idempotent-Replayed"] = "true"
+        return result
+
+    except (TicketConflictError, IdempotencyConflictError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except HTTPException:
+        raise
+    except TicketProcessingError as e:
+        logger.error(f"API error on {e.ticket_id}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={"error": str(e), "ticket_id": e.ticket_id},
+            headers={"X-Ticket-Id": e.ticket_id},
+        )
+    except Exception as e:
+        logger.error(f"API error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        logger.info(f"API: Received ticket {ticket_id}")
 
-        # Process through workflow
-        result = workflow.process_ticket(ticket_id, ticket.content)
+@router.post("/tickets/{ticket_id}/messages", response_model=MessageResponse)
+async def add_message(ticket_id: str, message: MessageSubmit):
+    """Add a customer follow-up to a ticket and answer it in context"""
+    try:
+        if not await admission.acquire(admission.is_urgent(message.content)):
+            raise HTTPException(
+                status_code=503,
+                detail="Overloaded, retry shortly",
+                headers={"Retry-After": "5"},
+            )
+        try:
+            state = await run_in_threadpool(
+                workflow.process_followup, ticket_id, message.content
+            )
+        finally:
+            admission.release()
 
-        # Save to database
+        result = TicketResult.from_state(state)
         db.save_ticket(result)
+        db.save_messages(ticket_id, state["new_messages"])
 
-        return TicketResponse(
-            ticket_id=result["ticket_id"],
-            category=result["category"],
-            priority=result["priority"],
-            response=result["response"],
-            confidence=result["confidence"],
-            escalated=result["escalate"],
-            escalation_reason=result["escalation_reason"],
-            response_time=result["response_time"],
-        )
+        return _ticket_response(result, MessageResponse, turn=result.turn)
 
+    except HTTPException:
+        raise
+    except TicketNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(f"API error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -90,7 +259,55 @@ async def get_analytics():
     """Get analytics summary"""
     try:
         summary = workflow.analytics_agent.get_summary()
+        if workflow.incident_agent:
+            summary["incidents"] = workflow.incident_agent.incidents()
         return summary
     except Exception as e:
         logger.error(f"API error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.websocket("/analytics/stream")
+async def stream_analytics(websocket: WebSocket):
+    """Analytics snapshot on connect, then coalesced deltas as tickets finish"""
+    await analytics_feed.serve(websocket)
+
+
+@router.get("/analytics/tokens")
+async def get_token_report(top: int = 10):
+    """Token usage by category, priority and stage, and the top consumers"""
+    try:
+        analytics = workflow.analytics_agent
+        return {
+            **analytics.get_token_breakdown(),
+            "top_consumers": analytics.get_top_token_consumers(top),
+        }
+    except Exception as e:
+        logger.error(f"API error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Runtime metrics for the processing pipeline"""
+    return {
+        "embedding_cache": embedding_cache.stats(),
+        "escalation_rules": workflow.escalation_agent.rules.stats(),
+        "admission": admission.stats(),
+        "deduplication": deduplicator.stats(),
+        "profiler": profiler.stats(),
+        "analytics_feed": analytics_feed.stats(),
+        "structured_output": output_stats(),
+        "http": http_transport.stats(),
+        "triage_batching": (
+            workflow.triage_batcher.stats() if workflow.triage_batcher else None
+        ),
+        "incidents": (
+            workflow.incident_agent.stats() if workflow.incident_agent else None
+        ),
+        "direct_answers": (
+            workflow.direct_answer_agent.get_summary()
+            if workflow.direct_answer_agent
+            else None
+        ),
+    }
@@ -1,13 +1,32 @@
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import router
+from fastapi.responses import JSONResponse
+from api.routes import admission, router
+from api.admin_routes import router as admin_router
+from utils.config import config
+from utils.http_transport import http_transport
 from utils.logger import logger
+from contextlib import asynccontextmanager
 import os
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Connect to Groq, Qdrant and Supabase before the first ticket arrives
+    if config.HTTP_PREWARM:
+        await run_in_threadpool(http_transport.prewarm)
+        await http_transport.aprewarm()
+    yield
+    http_transport.close()
+    await http_transport.aclose()
+
+
 app = FastAPI(
     title="Multi-Agent Customer Support API",
     description="Production-grade multi-agent system with RAG",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS
@@ -21,6 +40,7 @@ app.add_middleware(
 
 # Include routes
 app.include_router(router, prefix="/api", tags=["tickets"])
+app.include_router(admin_router, prefix="/api/admin", tags=["admin"])
 
 
 @app.get("/")
@@ -37,6 +57,15 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/health/ready")
+async def ready():
+    """Load state; 503 while the admission queue is full"""
+    stats = admission.stats()
+    if stats["queued"] >= stats["max_queue"]:
+        return JSONResponse(status_code=503, content={**stats, "status": "saturated"})
+    return stats
+
+
 if __name__ == "__main__":
     import uvicorn
 
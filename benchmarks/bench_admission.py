@@ -0,0 +1,132 @@
+"""
+Load test for admission control under overload
+
+The stubbed LLM backend serves `--backend-slots` calls at a time, like a
+provider concurrency limit. The service time of one ticket is measured
+first; tickets then arrive (Poisson) at `--overload` times the capacity
+that implies. Each run reports latency percentiles and how many tickets
+were answered in degraded mode:
+
+- unguarded: every request goes straight to the pipeline (the old route)
+- admission: the AdmissionController in front, degraded answers when shed
+
+    python -m benchmarks.bench_admission --seconds 10 --overload 5
+"""
+
+from api.admission import AdmissionController, process_with_admission
+from benchmarks.stubs import StubLLM, build_stub_workflow
+from fastapi.concurrency import run_in_threadpool
+from utils.config import config
+import argparse
+import asyncio
+import random
+import time
+
+# One in ten looks urgent
+TICKETS = [
+    "How do I reset my password? The email never arrives.",
+    "How do I export my data as CSV?",
+    "Login page keeps spinning after I enter my password",
+    "The password reset link says it has expired",
+    "Can I change the email address on my account?",
+    "I can't find the export button in settings",
+    "The mobile app logs me out every few minutes",
+    "How do I invite a teammate to my workspace?",
+    "Reset emails are landing in spam",
+    "URGENT: production export is failing for every customer",
+]
+
+
+def percentile(values: list, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def drive(handler, rate: float, seconds: float) -> tuple:
+    rng = random.Random(1)
+    latencies, urgent, degraded, tasks = [], [], 0, []
+
+    async def one(i: int):
+        nonlocal degraded
+        content = TICKETS[i % len(TICKETS)]
+        start = time.perf_counter()
+        result = await handler(f"TICKET-{i}", content)
+        elapsed = time.perf_counter() - start
+        latencies.append(elapsed)
+        if content.startswith("URGENT"):
+            urgent.append((elapsed, bool(result.get("degraded"))))
+        degraded += bool(result.get("degraded"))
+
+    end = time.perf_counter() + seconds
+    i = 0
+    while time.perf_counter() < end:
+        tasks.append(asyncio.create_task(one(i)))
+        i += 1
+        await asyncio.sleep(rng.expovariate(rate))
+    await asyncio.gather(*tasks)
+    return latencies, urgent, degraded
+
+
+def report(label: str, latencies: list, urgent: list, degraded: int, wall: float):
+    print(
+        f"{label:<10} n={len(latencies):<5} p50 {percentile(latencies, 0.5):6.2f}s "
+        f"p99 {percentile(latencies, 0.99):6.2f}s max {max(latencies):6.2f}s "
+        f"degraded {degraded / len(latencies):5.1%} (drained in {wall:.1f}s)"
+    )
+    urgent_degraded = sum(d for _, d in urgent)
+    print(
+        f"{'  urgent':<10} n={len(urgent):<5} "
+        f"p99 {percentile([t for t, _ in urgent], 0.99):6.2f}s "
+        f"degraded {urgent_degraded / len(urgent):5.1%}"
+    )
+
+
+async def main_async(args):
+    config.CHECKPOINT_ENABLED = False
+    llm = StubLLM(latency=args.llm_latency, capacity=args.backend_slots)
+    workflow = build_stub_workflow(llm, checkpoints=None)
+
+    # Service time of one ticket with the backend idle
+    start = time.perf_counter()
+    for i in range(10):
+        workflow.process_ticket(f"WARMUP-{i}", TICKETS[i % len(TICKETS)])
+    service = (time.perf_counter() - start) / 10
+    capacity = args.backend_slots / service
+    rate = capacity * args.overload
+    print(
+        f"service {service * 1000:.0f} ms/ticket, capacity ~{capacity:.0f} tickets/s, "
+        f"offering {rate:.0f}/s for {args.seconds:.0f}s\n"
+    )
+
+    async def unguarded(ticket_id, content):
+        return await run_in_threadpool(workflow.process_ticket, ticket_id, content)
+
+    controller = AdmissionController(
+        max_in_flight=args.backend_slots,
+        max_queue=args.backend_slots * 2,
+        max_queue_wait_ms=args.max_wait_ms,
+    )
+
+    async def guarded(ticket_id, content):
+        return await process_with_admission(controller, workflow, ticket_id, content)
+
+    for label, handler in (("unguarded", unguarded), ("admission", guarded)):
+        start = time.perf_counter()
+        latencies, urgent, degraded = await drive(handler, rate, args.seconds)
+        report(label, latencies, urgent, degraded, time.perf_counter() - start)
+
+    print(f"\nadmission stats: {controller.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--overload", type=float, default=5)
+    parser.add_argument("--backend-slots", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--max-wait-ms", type=float, default=250)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
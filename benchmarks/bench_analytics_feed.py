@@ -0,0 +1,153 @@
+"""
+Cost of pushing live analytics to many dashboards
+
+Connects `--subscribers` in-process dashboards to an AnalyticsFeed (each
+a task draining its queue like a WebSocket sender would), then tracks
+tickets from a worker thread at `--rate` per second. Reports:
+
+- track_ticket time on the ticket thread (what the pipeline pays)
+- time per flush, i.e. serializing one delta and queueing it for everyone
+- what one dashboard poll of GET /api/analytics costs now, and what the
+  old full rescan of every tracked ticket cost at the same history size
+
+    python -m benchmarks.bench_analytics_feed --subscribers 500 --seconds 5
+"""
+
+from agents.analytics_agent import AnalyticsAgent
+from api.analytics_feed import AnalyticsFeed
+import argparse
+import asyncio
+import random
+import statistics
+import threading
+import time
+
+CATEGORIES = ["technical", "billing", "general", "feature_request"]
+PRIORITIES = ["low", "medium", "high", "urgent"]
+
+
+def ticket(i: int, rng: random.Random) -> dict:
+    return {
+        "ticket_id": f"TICKET-{i}",
+        "category": rng.choice(CATEGORIES),
+        "priority": rng.choice(PRIORITIES),
+        "response_time": rng.uniform(0.5, 4.0),
+        "confidence": rng.uniform(0.4, 0.95),
+        "escalate": rng.random() < 0.3,
+        "total_tokens": rng.randint(400, 2500),
+    }
+
+
+def full_rescan(metrics: list) -> dict:
+    """The previous get_summary: a pass over every tracked ticket"""
+    total = len(metrics)
+    escalated = sum(1 for m in metrics if m.get("escalated", False))
+    times = [m["response_time"] for m in metrics if m.get("response_time")]
+    confidences = [m["confidence"] for m in metrics if m.get("confidence")]
+    return {
+        "total_tickets": total,
+        "escalated_tickets": escalated,
+        "avg_response_time": sum(times) / max(len(times), 1),
+        "avg_confidence": sum(confidences) / max(len(confidences), 1),
+    }
+
+
+def time_per_call(fn, repeat: int = 200) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+async def main_async(args):
+    analytics = AnalyticsAgent()
+    feed = AnalyticsFeed(analytics, interval_ms=args.interval_ms, max_backlog=64)
+    received = 0
+
+    async def dashboard():
+        nonlocal received
+        subscriber = feed.add_subscriber()
+        while True:
+            message = await subscriber.queue.get()
+            if message is None:
+                return
+            received += 1
+            await asyncio.sleep(0)  # Stand-in for websocket.send_text
+
+    clients = [asyncio.create_task(dashboard()) for _ in range(args.subscribers)]
+    await asyncio.sleep(0.1)
+
+    # Time flushes directly instead of through the feed's own timer task
+    feed._task.cancel()
+
+    track_times = []
+    stop = threading.Event()
+
+    def producer():
+        rng = random.Random(0)
+        i = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            analytics.track_ticket(ticket(i, rng))
+            track_times.append(time.perf_counter() - start)
+            i += 1
+            time.sleep(1 / args.rate)
+
+    thread = threading.Thread(target=producer, daemon=True)
+    thread.start()
+
+    flush_times = []
+    end = time.perf_counter() + args.seconds
+    while time.perf_counter() < end:
+        await asyncio.sleep(args.interval_ms / 1000)
+        start = time.perf_counter()
+        feed.flush()
+        flush_times.append(time.perf_counter() - start)
+    stop.set()
+    thread.join()
+    await asyncio.sleep(0.1)
+
+    for client in clients:
+        client.cancel()
+
+    tickets = len(track_times)
+    print(
+        f"{args.subscribers} dashboards, {tickets} tickets over {args.seconds:.0f}s, "
+        f"flush every {args.interval_ms:.0f} ms\n"
+    )
+    print(
+        f"track_ticket     mean {statistics.mean(track_times) * 1e6:8.1f} us  "
+        f"max {max(track_times) * 1e6:8.1f} us"
+    )
+    print(
+        f"flush/broadcast  mean {statistics.mean(flush_times) * 1e3:8.3f} ms  "
+        f"max {max(flush_times) * 1e3:8.3f} ms  "
+        f"({statistics.mean(flush_times) / args.subscribers * 1e6:.2f} us/dashboard)"
+    )
+    print(f"messages received {received}, stats {feed.stats()}")
+
+    # What polling would have cost with the same history
+    history = [ticket(i, random.Random(i)) for i in range(args.history)]
+    metrics = [{**m, "escalated": m["escalate"]} for m in history]
+    polled = AnalyticsAgent()
+    for state in history:
+        polled.track_ticket(state)
+    print(
+        f"\nGET /api/analytics over {args.history} tickets: "
+        f"full rescan {time_per_call(lambda: full_rescan(metrics)) * 1e6:8.1f} us, "
+        f"running totals {time_per_call(polled.get_summary) * 1e6:8.1f} us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subscribers", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--rate", type=float, default=200, help="tickets/s")
+    parser.add_argument("--interval-ms", type=float, default=500)
+    parser.add_argument("--history", type=int, default=50000)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
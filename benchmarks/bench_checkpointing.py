@@ -0,0 +1,77 @@
+"""
+Checkpoint resume benchmark
+
+1. Resolution fails past its node retries, then the client retries the
+   same ticket. Without checkpoints the retry re-runs triage; with the
+   SQLite checkpointer it resumes at resolution. Reports LLM calls per
+   ticket in both cases.
+2. Runs a batch of tickets with and without the checkpointer and reports
+   the added wall time per node.
+
+    python -m benchmarks.bench_checkpointing --tickets 200
+"""
+
+from benchmarks.stubs import StubLLM, build_stub_workflow
+from graph.checkpointing import TicketCheckpointStore
+from utils.config import config
+import argparse
+import os
+import tempfile
+import time
+
+NODES_PER_TICKET = 6  # embedding, triage, knowledge, resolution, escalation, analytics
+
+
+def failed_then_retried(checkpoints) -> dict:
+    llm = StubLLM()
+    workflow = build_stub_workflow(llm, checkpoints=checkpoints)
+
+    # Fail every in-graph attempt of the first request
+    llm.fail_next["resolution"] = config.NODE_RETRY_ATTEMPTS
+    try:
+        workflow.process_ticket("TICKET-RETRY", "I can't log in, no reset email")
+    except ConnectionError:
+        pass
+
+    workflow.process_ticket("TICKET-RETRY", "I can't log in, no reset email")
+    return dict(llm.calls)
+
+
+def batch_seconds(checkpoints, tickets: int) -> float:
+    workflow = build_stub_workflow(StubLLM(), checkpoints=checkpoints)
+    start = time.perf_counter()
+    for i in range(tickets):
+        workflow.process_ticket(f"TICKET-{i}", f"Password reset email #{i} missing")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=200)
+    args = parser.parse_args()
+
+    config.NODE_RETRY_INITIAL_INTERVAL = 0.001
+    config.CHECKPOINT_ENABLED = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        without = failed_then_retried(None)
+        with_ckpt = failed_then_retried(
+            TicketCheckpointStore(os.path.join(tmp, "retry.sqlite"))
+        )
+        print("LLM calls for a failed ticket + one client retry")
+        print(f"  without checkpoints: {without}")
+        print(f"  with checkpoints   : {with_ckpt}")
+        saved = sum(without.values()) - sum(with_ckpt.values())
+        print(f"  LLM calls avoided  : {saved}")
+
+        base = batch_seconds(None, args.tickets)
+        ckpt = batch_seconds(
+            TicketCheckpointStore(os.path.join(tmp, "batch.sqlite")), args.tickets
+        )
+        per_node_ms = (ckpt - base) / args.tickets / NODES_PER_TICKET * 1000
+        print(f"\n{args.tickets} tickets: {base:.2f}s plain, {ckpt:.2f}s checkpointed")
+        print(f"  checkpoint overhead: {per_node_ms:.3f} ms per node")
+
+
+if __name__ == "__main__":
+    main()
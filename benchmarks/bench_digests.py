@@ -0,0 +1,119 @@
+"""
+Document digests: resolution prompt tokens and latency with and without
+
+Seeds the in-memory knowledge base with long support articles, runs a
+set of tickets through the stubbed pipeline with full-text context,
+then runs the digest job (DigestAgent on StubLLM) and the same tickets
+again with digests for every hit but the top RETRIEVAL_FULL_TEXT_TOP.
+The stub model's latency grows with prompt tokens (--ms-per-1k-tokens),
+so shorter prompts show up as faster resolutions.
+
+    python -m benchmarks.bench_digests --tickets 100 --ms-per-1k-tokens 200
+"""
+
+from agents.digest_agent import DigestAgent
+from benchmarks.stubs import StubLLM, build_stub_workflow
+from database.knowledge_digest import KnowledgeDigest
+from utils.config import config
+import argparse
+import random
+import statistics
+
+TOPICS = {
+    "password": "reset your password from the login page",
+    "refund": "request a refund for a duplicate charge",
+    "export": "export your data as CSV",
+    "sso": "set up single sign-on with Google or Okta",
+    "webhook": "configure webhooks for order events",
+    "invoice": "download and update invoices",
+}
+
+FILLER = [
+    "Our team is always happy to help you get the most out of the product.",
+    "Many customers find this useful when they are getting started.",
+    "We are continually improving this part of the product based on feedback.",
+    "If anything here is unclear, the community forum is a great place to ask.",
+]
+
+
+def article(topic: str, task: str, rng: random.Random) -> dict:
+    sentences = [
+        f"This guide explains how to {task}.",
+        f"Open Settings and choose the {topic} section.",
+        "Follow the prompts and confirm the change.",
+        f"Changes to {topic} settings take up to {rng.randint(2, 15)} minutes.",
+        f"Accounts on the Team plan can manage {rng.randint(5, 50)} {topic} items.",
+        f"See https://docs.example.com/{topic} or write to support@example.com.",
+    ]
+    # Long articles: the useful sentences among plenty of boilerplate
+    body = sentences[:3] + rng.sample(FILLER * 6, 16) + sentences[3:]
+    return {
+        "content": " ".join(body),
+        "metadata": {"category": "technical", "topic": topic},
+    }
+
+
+def resolution_metrics(states) -> dict:
+    calls = [
+        call
+        for state in states
+        for call in state["model_calls"]
+        if call["agent"] == "resolution"
+    ]
+    return {
+        "prompt_tokens": statistics.mean(c["input_tokens"] for c in calls),
+        "latency_ms": statistics.median(c["latency_ms"] for c in calls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=100)
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config.CHECKPOINT_ENABLED = False
+    config.DIRECT_ANSWER_ENABLED = False
+    rng = random.Random(args.seed)
+    docs = [article(topic, task, rng) for topic, task in TOPICS.items()]
+    tickets = [
+        f"How do I {rng.choice(list(TOPICS.values()))}? It isn't working for me."
+        for _ in range(args.tickets)
+    ]
+
+    llm = StubLLM(input_token_latency=args.ms_per_1k_tokens / 1e6)
+    workflow = build_stub_workflow(llm, docs=docs, checkpoints=None)
+
+    def run(use_digests: bool) -> dict:
+        config.RETRIEVAL_USE_DIGESTS = use_digests
+        states = [
+            workflow.process_ticket(f"TICKET-{i}", text)
+            for i, text in enumerate(tickets)
+        ]
+        return resolution_metrics(states)
+
+    full = run(False)
+    job = KnowledgeDigest(
+        workflow.knowledge_agent.vector_db, DigestAgent(llm=StubLLM()), min_tokens=0
+    )
+    report = job.run()
+    digested = run(True)
+    rerun = job.run()
+
+    print(
+        f"Digest job: {report['digested']} chunks, "
+        f"{report['content_tokens']} -> {report['digest_tokens']} tokens, "
+        f"{report['input_tokens'] + report['output_tokens']} LLM tokens; "
+        f"rerun digested {rerun['digested']} ({rerun['current']} current)"
+    )
+    print(f"{args.tickets} tickets, top {config.RETRIEVAL_FULL_TEXT_TOP} in full")
+    print(f"{'':>10} {'prompt tokens':>14} {'resolution ms':>14}")
+    for name, r in (("full text", full), ("digests", digested)):
+        print(f"{name:>10} {r['prompt_tokens']:>14.0f} {r['latency_ms']:>14.1f}")
+    saved = 1 - digested["prompt_tokens"] / full["prompt_tokens"]
+    print(f"Resolution prompt tokens saved: {saved:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Direct-answer route: share, latency and shadow agreement by threshold
+
+Indexes a few curated FAQ entries (answer_ready, with answer templates)
+next to regular articles, then runs a ticket mix of FAQ paraphrases and
+other issues through the stubbed pipeline at several
+DIRECT_ANSWER_MIN_SCORE values, with every direct answer shadowed by the
+resolution stub. The stub LLM's answers are canned, so the similarity
+column shows the mechanics rather than real answer quality.
+
+    python -m benchmarks.bench_direct_answer --tickets 100
+"""
+
+from benchmarks.stubs import SAMPLE_DOCS, StubLLM, build_stub_workflow
+from utils.config import config
+import argparse
+import statistics
+
+FAQ_DOCS = [
+    {
+        "id": "faq-password-reset",
+        "content": "How do I reset my password?",
+        "metadata": {
+            "category": "authentication",
+            "answer_ready": True,
+            "answer": "To reset your password, click 'Forgot Password' on the "
+            "login page. We'll email a reset link to {email} within 5 minutes; "
+            "check your spam folder if it doesn't arrive. (Ref: {ticket_id})",
+        },
+    },
+    {
+        "id": "faq-export-csv",
+        "content": "How do I export my data as CSV?",
+        "metadata": {
+            "category": "technical",
+            "answer_ready": True,
+            "answer": "Go to Settings > Data > Export and choose CSV. "
+            "Large exports are emailed to {email} when ready.",
+        },
+    },
+]
+
+TICKETS = [
+    "How do I reset my password?",
+    "how do i reset my password, I'm jane@example.com",
+    "How can I export my data as a CSV file?",
+    "How do I export data to CSV?",
+    "The app crashes when I upload a large file",
+    "My password reset email never arrives",
+    "Can you add dark mode?",
+    "Login page keeps spinning after I enter my password",
+]
+
+
+def run(min_score: float, tickets: int, llm_latency: float) -> dict:
+    config.DIRECT_ANSWER_MIN_SCORE = min_score
+    workflow = build_stub_workflow(
+        StubLLM(latency=llm_latency),
+        docs=SAMPLE_DOCS + FAQ_DOCS,
+        checkpoints=None,
+    )
+    times = {"direct": [], "llm": []}
+    for i in range(tickets):
+        result = workflow.process_ticket(f"TICKET-{i}", TICKETS[i % len(TICKETS)])
+        path = "direct" if result.get("direct_answer") else "llm"
+        times[path].append(result["response_time"])
+
+    workflow.direct_answer_agent.drain()
+    summary = workflow.direct_answer_agent.get_summary()
+    shadows = list(workflow.direct_answer_agent.shadow_results)
+    summary["latency"] = {k: statistics.mean(v) if v else 0.0 for k, v in times.items()}
+    summary["similarity"] = {
+        mode: statistics.mean([s["similarity"] for s in shadows if s["mode"] == mode])
+        for mode in ("shadow", "near_miss")
+        if any(s["mode"] == mode for s in shadows)
+    }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=100)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    config.CHECKPOINT_ENABLED = False
+    config.DIRECT_ANSWER_SHADOW_RATE = 1.0
+
+    print(
+        f"{'min_score':>9} {'direct':>7} {'direct ms':>10} {'llm ms':>8} "
+        f"{'shadow sim':>11} {'near-miss sim':>14}"
+    )
+    for min_score in (0.95, 0.9, 0.8, 0.7, 0.6):
+        summary = run(min_score, args.tickets, args.llm_latency)
+        similarity = summary["similarity"]
+        print(
+            f"{min_score:>9.2f} {summary['direct_share']:>7.0%} "
+            f"{summary['latency']['direct'] * 1000:>10.1f} "
+            f"{summary['latency']['llm'] * 1000:>8.1f} "
+            f"{similarity.get('shadow', float('nan')):>11.2f} "
+            f"{similarity.get('near_miss', float('nan')):>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
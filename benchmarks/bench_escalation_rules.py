@@ -0,0 +1,80 @@
+"""
+Escalation rule engine: share of tickets decided locally and matching cost
+
+Generates a synthetic ticket mix (triage labels and resolution confidence
+drawn at random, plus phrases that ask for a human, need account access,
+etc.) and runs it through the rules in agents/escalation_rules.yaml.
+Compares against the two hard-coded rules the agent had before (low
+confidence, billing), where every other ticket went to the LLM.
+
+    python -m benchmarks.bench_escalation_rules --tickets 20000
+"""
+
+from utils.config import config
+from utils.rule_engine import RuleEngine
+import argparse
+import random
+import time
+
+BODIES = [
+    "How do I export my data as CSV from the dashboard?",
+    "The password reset email never arrives, I checked spam already.",
+    "App crashes when I upload a file larger than 10MB.",
+    "Can you add dark mode to the mobile app?",
+    "Where can I find the API rate limits for my plan?",
+]
+SUFFIXES = [
+    "",
+    "",
+    "",
+    " I want to speak to a human about this.",
+    " I think my account was hacked, someone else logged in.",
+    " Please delete my account after this.",
+    " Otherwise I'll file a chargeback.",
+    " This is an outage for all users in production!",
+]
+CATEGORIES = ["technical"] * 5 + ["general"] * 2 + ["feature_request", "billing"]
+PRIORITIES = ["low", "medium", "medium", "high", "urgent"]
+
+
+def make_tickets(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [
+        (
+            rng.choice(BODIES) + rng.choice(SUFFIXES),
+            rng.choice(CATEGORIES),
+            rng.choice(PRIORITIES),
+            round(rng.uniform(0.5, 0.98), 2),
+        )
+        for _ in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=20000)
+    args = parser.parse_args()
+
+    tickets = make_tickets(args.tickets)
+    engine = RuleEngine(config.ESCALATION_RULES_PATH)
+
+    start = time.perf_counter()
+    for text, category, priority, confidence in tickets:
+        engine.decide(text, category=category, priority=priority, confidence=confidence)
+    elapsed = time.perf_counter() - start
+
+    legacy = sum(1 for _, cat, _, conf in tickets if conf < 0.7 or cat == "billing")
+    stats = engine.stats()
+
+    print(f"{args.tickets} tickets, {len(engine.ruleset.rules)} rules")
+    print(
+        f"  decided locally: {stats['local_share']:.1%} (before: {legacy / args.tickets:.1%})"
+    )
+    print(f"  LLM calls      : {stats['undecided']} (before: {args.tickets - legacy})")
+    print(f"  cost per ticket: {elapsed / args.tickets * 1e6:.1f} µs")
+    for name, hits in sorted(stats["rules"].items(), key=lambda kv: -kv[1]):
+        print(f"    {name:<20} {hits}")
+
+
+if __name__ == "__main__":
+    main()
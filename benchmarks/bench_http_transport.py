@@ -0,0 +1,142 @@
+"""
+Shared HTTP transport: request latency with and without handshakes
+
+A local HTTP server stands in for Groq, Qdrant and Supabase. It sleeps
+`--handshake-ms` once per new connection, like a TCP + TLS handshake to
+a remote API, then answers every request after `--server-ms`. Requests
+arrive with `--idle` seconds between them, and each run reports latency
+percentiles and how many connections were opened:
+
+- per-request: a new client per call, so every request does a handshake
+- short keep-alive: pooled, but idle connections expire between requests
+  (httpx's default is 5s; scaled down here to fit the idle gap)
+- pooled: HttpTransport with HTTP_KEEPALIVE_EXPIRY and prewarming
+
+    python -m benchmarks.bench_http_transport --requests 200 --handshake-ms 40
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.config import config
+from utils.http_transport import HttpTransport
+import argparse
+import socket
+import statistics
+import threading
+import time
+
+import httpx
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+    handshake_seconds = 0.0
+    server_seconds = 0.0
+
+    def setup(self):
+        super().setup()
+        # Headers and body are written separately; don't let Nagle delay them
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        time.sleep(self.handshake_seconds)
+
+    def _reply(self, body: bytes = b'{"ok": true}'):
+        time.sleep(self.server_seconds)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        return body
+
+    def do_HEAD(self):
+        self._reply()
+
+    def do_GET(self):
+        self.wfile.write(self._reply())
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.wfile.write(self._reply())
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(handshake_ms: float = 0.0, server_ms: float = 0.0):
+    """A local stand-in backend; returns (server, base_url)"""
+    handler = type(
+        "Handler",
+        (StandInHandler,),
+        {"handshake_seconds": handshake_ms / 1000, "server_seconds": server_ms / 1000},
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def percentiles(latencies) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "p50": statistics.median(ordered) * 1000,
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+    }
+
+
+def run(send, requests: int, idle: float) -> list:
+    latencies = []
+    for _ in range(requests):
+        time.sleep(idle)
+        start = time.perf_counter()
+        send()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def per_request(url: str, requests: int, idle: float) -> dict:
+    def send():
+        with httpx.Client() as client:
+            client.post(f"{url}/v1/chat", json={"q": "hi"})
+
+    return {**percentiles(run(send, requests, idle)), "connections": requests}
+
+
+def pooled(url: str, requests: int, idle: float, keepalive_expiry: float) -> dict:
+    transport = HttpTransport(
+        base_urls={"groq": url}, keepalive_expiry=keepalive_expiry, http2=False
+    )
+    transport.prewarm()
+    client = transport.client("groq")
+    latencies = run(
+        lambda: client.post(f"{url}/v1/chat", json={"q": "hi"}), requests, idle
+    )
+    pool = transport.stats()["pools"]["groq"]
+    transport.close()
+    return {**percentiles(latencies), "connections": pool["connections_opened"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=40)
+    parser.add_argument("--server-ms", type=float, default=2)
+    parser.add_argument("--idle", type=float, default=0.02)
+    args = parser.parse_args()
+
+    server, url = start_server(args.handshake_ms, args.server_ms)
+    runs = {
+        "per-request": per_request(url, args.requests, args.idle),
+        "short keep-alive": pooled(url, args.requests, args.idle, args.idle / 4),
+        "pooled": pooled(url, args.requests, args.idle, config.HTTP_KEEPALIVE_EXPIRY),
+    }
+    server.shutdown()
+
+    print(
+        f"{args.requests} requests, {args.handshake_ms:.0f} ms handshake, "
+        f"{args.idle * 1000:.0f} ms idle between requests"
+    )
+    print(f"{'':>18} {'p50 ms':>7} {'p99 ms':>7} {'connections':>12}")
+    for name, r in runs.items():
+        print(f"{name:>18} {r['p50']:>7.1f} {r['p99']:>7.1f} {r['connections']:>12}")
+
+
+if __name__ == "__main__":
+    main()
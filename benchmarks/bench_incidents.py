@@ -0,0 +1,166 @@
+"""
+Incident detection: clustering cost and LLM calls avoided in an outage
+
+Runs a simulated outage through the stubbed pipeline: background tickets
+on assorted topics, then a burst of customers reporting the same failure
+in slightly different words. Compared with incident detection off, it
+reports the clustering time per ticket, how many tickets reused the
+incident's resolution, and the LLM calls and time saved. The operator
+is simulated: the incident is confirmed with a written response as soon
+as it is detected.
+
+The stub encoder hashes words, so paraphrases score lower than with the
+sentence-transformer model; lower --similarity to compensate.
+
+    python -m benchmarks.bench_incidents --outage 200 --similarity 0.6
+"""
+
+from agents.incident_agent import IncidentAgent
+from benchmarks.stubs import StubLLM, build_stub_workflow
+from utils.config import config
+import argparse
+import random
+import statistics
+import time
+
+import numpy as np
+
+BACKGROUND = [
+    "How do I reset my password?",
+    "I was charged twice this month",
+    "Can you add dark mode?",
+    "How do I export my data as CSV?",
+    "The mobile app crashes when I upload a photo",
+    "Please update the billing address on my invoice",
+    "I can't find the API key settings page",
+]
+
+OUTAGE = [
+    "The dashboard shows error 503 and won't load",
+    "Dashboard won't load, I get error 503",
+    "Getting a 503 error, the dashboard won't load at all",
+    "the dashboard won't load - error 503 since this morning",
+]
+
+OPERATOR_RESPONSE = (
+    "We're aware the dashboard is returning error 503 and are working on a fix."
+)
+
+
+DETAILS = [
+    "on my phone",
+    "for our team account",
+    "since the last update",
+    "in the new workspace",
+    "for invoice {n}",
+    "on order {n}",
+    "for user {n}",
+    "on Firefox",
+]
+
+
+def tickets(outage: int, background: int, seed: int):
+    rng = random.Random(seed)
+    # Everyday questions, each with its own details
+    mix = [
+        f"{rng.choice(BACKGROUND)} {rng.choice(DETAILS)} {rng.choice(DETAILS)}".format(
+            n=rng.randrange(10000)
+        )
+        for _ in range(background)
+    ]
+    burst = [rng.choice(OUTAGE) for _ in range(outage)]
+    # Background keeps trickling in while the outage reports arrive
+    for text in burst:
+        mix.insert(rng.randrange(background // 2, len(mix) + 1), text)
+    return mix
+
+
+def run(enabled: bool, texts, similarity: float, llm_latency: float) -> dict:
+    llm = StubLLM(latency=llm_latency)
+    workflow = build_stub_workflow(llm, checkpoints=None)
+    workflow.incident_agent = (
+        IncidentAgent(similarity=similarity, min_tickets=10) if enabled else None
+    )
+    workflow.graph = workflow._build_graph()
+
+    start = time.perf_counter()
+    reused = 0
+    for i, text in enumerate(texts):
+        result = workflow.process_ticket(f"TICKET-{i}", text)
+        incident = result.get("incident") or {}
+        reused += bool(incident.get("reused"))
+        if incident.get("status") == "incident":
+            workflow.incident_agent.confirm(
+                incident["incident_id"], {"response": OPERATOR_RESPONSE}
+            )
+    elapsed = time.perf_counter() - start
+
+    return {
+        "llm_calls": sum(llm.calls.values()),
+        "reused": reused,
+        "seconds": elapsed,
+        "stats": workflow.incident_agent.stats() if enabled else None,
+        "incidents": workflow.incident_agent.incidents() if enabled else [],
+    }
+
+
+def assign_cost(clusters: int, dim: int, join: bool, rounds: int = 2000) -> float:
+    """
+    Microseconds per assignment with `clusters` live clusters: joining one
+    of them, or starting a new cluster (which evicts the oldest)
+    """
+    agent = IncidentAgent(similarity=0.9, max_clusters=clusters)
+    rng = np.random.default_rng(0)
+    seeds = rng.normal(size=(clusters, dim))
+    for i, seed in enumerate(seeds):
+        agent.assign(f"seed-{i}", seed, now=float(i))
+    if join:
+        picks = seeds[rng.integers(clusters, size=rounds)]
+        vectors = list(picks + 0.1 * rng.normal(size=(rounds, dim)))
+    else:
+        vectors = list(rng.normal(size=(rounds, dim)))
+    start = time.perf_counter()
+    for i, v in enumerate(vectors):
+        agent.assign(f"T-{i}", v, now=float(clusters + i))
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--outage", type=int, default=200)
+    parser.add_argument("--background", type=int, default=100)
+    parser.add_argument("--similarity", type=float, default=0.6)
+    parser.add_argument("--llm-latency", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config.CHECKPOINT_ENABLED = False
+    texts = tickets(args.outage, args.background, args.seed)
+
+    off = run(False, texts, args.similarity, args.llm_latency)
+    on = run(True, texts, args.similarity, args.llm_latency)
+
+    print(f"{len(texts)} tickets ({args.outage} outage reports)")
+    print(f"{'':>12} {'LLM calls':>10} {'reused':>7} {'seconds':>8}")
+    for name, r in (("off", off), ("on", on)):
+        print(f"{name:>12} {r['llm_calls']:>10} {r['reused']:>7} {r['seconds']:>8.2f}")
+    saved = off["llm_calls"] - on["llm_calls"]
+    print(f"LLM calls avoided: {saved} ({saved / off['llm_calls']:.0%})")
+    print(f"Pipeline assignment: {on['stats']['avg_assign_us']:.1f} µs/ticket")
+    for incident in on["incidents"]:
+        print(
+            f"  {incident['incident_id']} {incident['status']}: "
+            f"{incident['tickets']} tickets, {incident['reused_resolutions']} reused"
+        )
+
+    print(f"\n{'clusters':>8} {'join µs':>8} {'new µs':>7}")
+    for clusters in (16, 256, 1024):
+        join, new = (
+            statistics.median(assign_cost(clusters, 384, join) for _ in range(3))
+            for join in (True, False)
+        )
+        print(f"{clusters:>8} {join:>8.1f} {new:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
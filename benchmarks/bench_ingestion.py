@@ -0,0 +1,125 @@
+"""
+Ingestion pipeline throughput and memory benchmark
+
+Generates a synthetic Markdown/HTML/text corpus and streams it through
+IngestionPipeline with the offline HashingEncoder. Upserts go to a sink
+that discards points so peak memory reflects the pipeline, not storage.
+
+    python -m benchmarks.bench_ingestion --docs 2000 --workers 4
+"""
+
+from types import SimpleNamespace
+from database.qdrant_manager import QdrantManager
+from database.ingestion_pipeline import IngestionPipeline
+from utils.embeddings import HashingEncoder
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+WORDS = (
+    "account password reset login email invoice refund charge subscription "
+    "plan upgrade downgrade billing card payment error timeout server api "
+    "token webhook sso google github admin settings profile export import "
+    "report dashboard latency outage support ticket team permission role"
+).split()
+
+
+class DiscardClient:
+    """Minimal Qdrant stand-in that counts upserted points"""
+
+    def __init__(self):
+        self.points = 0
+
+    def get_collections(self):
+        return SimpleNamespace(collections=[])
+
+    def create_collection(self, **kwargs):
+        pass
+
+    def upsert(self, collection_name, points, **kwargs):
+        self.points += len(points)
+
+    def delete(self, collection_name, points_selector, **kwargs):
+        pass
+
+
+def write_corpus(root: str, docs: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(docs):
+        category = ("billing", "technical", "account")[i % 3]
+        os.makedirs(os.path.join(root, category), exist_ok=True)
+        paragraphs = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120)))
+            for _ in range(rng.randint(5, 12))
+        ]
+        kind = i % 3
+        if kind == 0:
+            body = f"# Article {i}\n\n" + "\n\n".join(paragraphs)
+            name = f"article_{i}.md"
+        elif kind == 1:
+            body = (
+                f"<html><head><title>Article {i}</title></head><body>"
+                + "".join(f"<p>{p}</p>" for p in paragraphs)
+                + "</body></html>"
+            )
+            name = f"article_{i}.html"
+        else:
+            body = "\n\n".join(paragraphs)
+            name = f"article_{i}.txt"
+        with open(os.path.join(root, category, name), "w") as f:
+            f.write(body)
+
+
+def run_once(root: str, workers: int, batch_size: int) -> dict:
+    client = DiscardClient()
+    manager = QdrantManager(client=client, encoder=HashingEncoder())
+    with tempfile.TemporaryDirectory() as state_dir:
+        pipeline = IngestionPipeline(
+            manager,
+            workers=workers,
+            embed_batch_size=batch_size,
+            encoder_factory=HashingEncoder,
+            manifest_path=os.path.join(state_dir, "manifest.json"),
+        )
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        report = pipeline.run(root)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    report["peak_mib"] = round(peak / 2**20, 1)
+    report["wall_seconds"] = round(elapsed, 2)
+    report["points_written"] = client.points
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=1500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    print(
+        f"{'docs':>6} {'workers':>7} {'chunks':>7} {'docs/s':>8} "
+        f"{'chunks/s':>9} {'peak MiB':>9}"
+    )
+    for docs in (args.docs // 4, args.docs):
+        with tempfile.TemporaryDirectory() as root:
+            write_corpus(root, docs)
+            for workers in sorted({0, args.workers}):
+                r = run_once(root, workers, args.batch_size)
+                print(
+                    f"{docs:>6} {workers:>7} {r['chunks']:>7} "
+                    f"{r['docs_per_second']:>8} {r['chunks_per_second']:>9} "
+                    f"{r['peak_mib']:>9}"
+                )
+
+
+if __name__ == "__main__":
+    main()
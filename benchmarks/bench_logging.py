@@ -0,0 +1,99 @@
+"""
+Per-ticket logging cost by logging mode
+
+Replays the log calls one ticket makes through the pipeline (node banners,
+agent progress lines, final status) against a /dev/null sink and reports
+the time spent in the calling thread per ticket. With enqueue the write
+happens on the BackgroundWriter thread; "incl. drain" adds flushing it.
+/dev/null makes synchronous writes unrealistically cheap; against a real
+pipe or terminal the enqueued modes gain more.
+
+    python -m benchmarks.bench_logging --tickets 5000
+"""
+
+from utils.logger import configure_logging, hot_logger, logger, ticket_context
+import argparse
+import os
+import time
+
+STAGES = ["embedding", "triage", "knowledge", "resolution", "escalation", "analytics"]
+CONTENT = "I can't log into my account and the reset email never arrives " * 3
+
+
+def one_ticket(ticket_id: str):
+    with ticket_context(ticket_id):
+        hot_logger.info("🎫 Processing ticket")
+        for stage in STAGES:
+            with logger.contextualize(stage=stage):
+                hot_logger.info("Stage {}", stage)
+                hot_logger.info("Analyzing ticket: {}...", CONTENT[:50])
+                hot_logger.success("Done {} (confidence: {})", stage, 0.86)
+        logger.success("{} in {:.2f}s", "✅ AUTO-RESOLVED", 1.234)
+
+
+def legacy_ticket(ticket_id: str):
+    """The previous style: eager f-strings and a banner, no context"""
+    logger.info(f"\n{'=' * 70}")
+    logger.info(f"🎫 Processing Ticket: {ticket_id}")
+    logger.info(f"{'=' * 70}\n")
+    for stage in STAGES:
+        logger.info(f"Stage {stage}")
+        logger.info(f"Analyzing ticket: {CONTENT[:50]}...")
+        logger.success(f"Done {stage} (confidence: {0.86})")
+    logger.success(f"\n✅ AUTO-RESOLVED in {1.234:.2f}s\n")
+
+
+MODES = [
+    ("legacy text, sync", legacy_ticket, dict(json_output=False, enqueue=False)),
+    ("text, sync", one_ticket, dict(json_output=False, enqueue=False)),
+    ("text, enqueued", one_ticket, dict(json_output=False, enqueue=True)),
+    ("json, enqueued", one_ticket, dict(json_output=True, enqueue=True)),
+    (
+        "json, enqueued, 10% sampled",
+        one_ticket,
+        dict(json_output=True, enqueue=True, sample_rate=0.1),
+    ),
+    (
+        "level WARNING (hot path off)",
+        one_ticket,
+        dict(json_output=True, enqueue=True, level="WARNING"),
+    ),
+    (
+        "legacy at WARNING",
+        legacy_ticket,
+        dict(json_output=False, enqueue=False, level="WARNING"),
+    ),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=5000)
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as devnull:
+        results = []
+        for label, ticket, options in MODES:
+            writer = configure_logging(sink=devnull, **options)
+
+            start = time.perf_counter()
+            for i in range(args.tickets):
+                ticket(f"TICKET-{i}")
+            caller = time.perf_counter() - start
+
+            if writer:
+                writer.drain()
+            drained = time.perf_counter() - start
+            results.append((label, caller, drained))
+
+    configure_logging()
+    print(f"{'mode':<32} {'caller µs/ticket':>17} {'incl. drain':>12}")
+    for label, caller, drained in results:
+        print(
+            f"{label:<32} {caller / args.tickets * 1e6:>17.1f} "
+            f"{drained / args.tickets * 1e6:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Blended LLM latency with per-agent model routing
+
+Runs the same tickets twice through the stubbed pipeline: once with every
+agent on the large model, once with the default MODEL_ROUTES (small model
+first for triage, escalation and low-priority resolutions, escalating to
+the large model on malformed or low-confidence output). Stub latencies and
+failure rates approximate the small/large gap; adjust them with the flags.
+
+    python -m benchmarks.bench_model_routing --tickets 60
+"""
+
+from benchmarks.stubs import StubLLM, build_stub_workflow
+from collections import Counter, defaultdict
+from utils.config import config
+from utils.model_router import ModelRouter
+import argparse
+import statistics
+
+TICKETS = [
+    "How do I reset my password? The email never arrives.",
+    "URGENT: production export is failing for every customer",
+    "I was charged twice this month, please refund the duplicate",
+    "How do I export my data as CSV?",
+    "Login page keeps spinning after I enter my password",
+]
+
+
+def run(router: ModelRouter, tickets: int) -> list:
+    workflow = build_stub_workflow(router=router, checkpoints=None)
+    return [
+        workflow.process_ticket(f"TICKET-{i}", TICKETS[i % len(TICKETS)])["model_calls"]
+        for i in range(tickets)
+    ]
+
+
+def report(label: str, per_ticket: list):
+    latency = [sum(c["latency_ms"] for c in calls) for calls in per_ticket]
+    models = defaultdict(Counter)
+    escalated = Counter()
+    for calls in per_ticket:
+        for call in calls:
+            models[call["agent"]][call["model"]] += 1
+            if call["outcome"] != "ok":
+                escalated[call["agent"]] += 1
+
+    print(f"\n{label}")
+    print(
+        f"  LLM ms/ticket: mean {statistics.mean(latency):.1f}, "
+        f"p95 {sorted(latency)[int(len(latency) * 0.95) - 1]:.1f}"
+    )
+    for agent, counts in sorted(models.items()):
+        share = ", ".join(f"{model} x{n}" for model, n in counts.most_common())
+        print(f"  {agent:<11} {share}; escalated {escalated[agent]}")
+    return statistics.mean(latency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=60)
+    parser.add_argument("--small-latency", type=float, default=0.015)
+    parser.add_argument("--large-latency", type=float, default=0.09)
+    parser.add_argument("--small-malformed", type=float, default=0.05)
+    parser.add_argument("--small-low-confidence", type=float, default=0.2)
+    args = parser.parse_args()
+
+    config.CHECKPOINT_ENABLED = False
+    stubs = {
+        config.GROQ_SMALL_MODEL: StubLLM(
+            latency=args.small_latency,
+            model=config.GROQ_SMALL_MODEL,
+            malformed_rate=args.small_malformed,
+            low_confidence_rate=args.small_low_confidence,
+        ),
+        config.GROQ_MODEL: StubLLM(latency=args.large_latency, model=config.GROQ_MODEL),
+    }
+    factory = lambda model, temperature: stubs[model]
+
+    routes = config.MODEL_ROUTES
+    config.MODEL_ROUTES = {}  # Every agent falls back to GROQ_MODEL
+    large = report(
+        "large model only", run(ModelRouter(llm_factory=factory), args.tickets)
+    )
+
+    config.MODEL_ROUTES = routes
+    routed = report("routed", run(ModelRouter(llm_factory=factory), args.tickets))
+
+    print(f"\nBlended LLM latency: {routed / large:.0%} of large-only")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Token reduction and cost of ticket preprocessing on email-style tickets
+
+Builds a corpus of realistic email tickets (a short customer message
+wrapped in greetings, sign-offs, signatures, legal footers, quoted reply
+chains and, for some, HTML) and reports:
+
+- clean_ticket alone: tokens before/after and ms per ticket
+- the stub pipeline with PREPROCESS_ENABLED off and on: LLM tokens per
+  ticket (triage, resolution and escalation prompts all shrink)
+
+    python -m benchmarks.bench_preprocess --tickets 500
+"""
+
+from benchmarks.stubs import StubLLM, build_stub_workflow
+from graph.checkpointing import TicketCheckpointStore
+from utils.config import config
+from utils.logger import configure_logging
+from utils.preprocess import clean_ticket
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+ISSUES = [
+    "I was charged twice for my March invoice and need a refund for the duplicate.",
+    "The password reset email never arrives, I checked spam as well.",
+    "Since yesterday's update the mobile app crashes when I open settings.",
+    "Our API calls fail with error 429 even though we are under the rate limit.",
+    "I can't log in with SSO anymore, it says my account is not provisioned.",
+    "How do I export all my invoices as CSV for our accountants?",
+    "The dashboard shows no data after 2pm, is there an outage?",
+    "Please cancel my subscription at the end of the billing period.",
+]
+DETAILS = [
+    "It started after I changed my card details.",
+    "This is blocking our whole team.",
+    "I tried a different browser and it still doesn't work.",
+    "Our account ID is 48213 if that helps.",
+]
+SIGNATURES = [
+    "Thanks,\n{name}\n{title} | {company}\n+1 555 01{n:02d}\nwww.{domain}",
+    "Best regards,\n\n{name}\n{company}\nSent from my iPhone",
+    "--\n{name}\n{title}, {company}\nFollow us on LinkedIn and Twitter",
+    "Cheers\n{name}",
+]
+DISCLAIMER = (
+    "CONFIDENTIALITY NOTICE: This email and any attachments are confidential "
+    "and intended solely for the use of the addressee. If you have received "
+    "this message in error, please notify the sender and delete it. Please "
+    "consider the environment before printing this email."
+)
+QUOTE = (
+    "On Mon, Mar {day}, 2025 at 9:{n:02d} AM Support <support@example.com> wrote:\n"
+    "> Hi {first},\n>\n> Thanks for reaching out. Could you send us a screenshot\n"
+    "> of the error and the time it happened?\n>\n> Kind regards,\n> Support Team\n"
+    ">\n> On Sun, Mar {prev}, 2025, {name} wrote:\n>> {issue}\n"
+)
+OUTLOOK_QUOTE = (
+    "________________________________\nFrom: Support <support@example.com>\n"
+    "Sent: Monday, March {day}, 2025 9:{n:02d} AM\nTo: {name}\n"
+    "Subject: RE: Ticket update\n\nHi {first}, we are looking into this and will "
+    "get back to you within one business day.\n\n{disclaimer}\n"
+)
+NAMES = ["Dana Whitfield", "Ravi Menon", "Sofia Almeida", "Tom Becker"]
+
+
+def make_email(rng: random.Random, i: int) -> str:
+    name = rng.choice(NAMES)
+    fields = {
+        "name": name,
+        "first": name.split()[0],
+        "title": "Operations Lead",
+        "company": "Acme Corp",
+        "domain": "acme.example",
+        "n": i % 60,
+        "day": 3 + i % 20,
+        "prev": 2 + i % 20,
+        "disclaimer": DISCLAIMER,
+    }
+    issue = rng.choice(ISSUES)
+    parts = [f"Hi support,\n\n{issue} {rng.choice(DETAILS)}"]
+    parts.append(rng.choice(SIGNATURES).format(**fields))
+    if rng.random() < 0.6:
+        parts.append(DISCLAIMER)
+    if rng.random() < 0.5:
+        parts.append(QUOTE.format(issue=issue, **fields))
+    else:
+        parts.append(OUTLOOK_QUOTE.format(**fields))
+    text = "\n\n".join(parts)
+
+    if rng.random() < 0.3:
+        paragraphs = "".join(f"<p>{p}</p>" for p in text.split("\n\n"))
+        text = (
+            "<html><head><style>p{margin:0}</style></head>"
+            f"<body><div>{paragraphs.replace(chr(10), '<br>')}</div></body></html>"
+        )
+    return text
+
+
+def run_pipeline(tickets, enabled: bool, llm_latency: float) -> tuple:
+    config.PREPROCESS_ENABLED = enabled
+    with tempfile.TemporaryDirectory() as directory:
+        store = TicketCheckpointStore(path=os.path.join(directory, "cp.sqlite"))
+        workflow = build_stub_workflow(StubLLM(latency=llm_latency), checkpoints=store)
+        tokens, start = 0, time.perf_counter()
+        for i, ticket in enumerate(tickets):
+            tokens += workflow.process_ticket(f"TICKET-{i}", ticket)["total_tokens"]
+    return tokens / len(tickets), (time.perf_counter() - start) / len(tickets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=500)
+    parser.add_argument("--pipeline-tickets", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    configure_logging(level="WARNING", enqueue=False)
+
+    rng = random.Random(args.seed)
+    tickets = [make_email(rng, i) for i in range(args.tickets)]
+
+    before, after, timings = [], [], []
+    for ticket in tickets:
+        start = time.perf_counter()
+        _, info = clean_ticket(ticket)
+        timings.append((time.perf_counter() - start) * 1000)
+        before.append(info["original_tokens"])
+        after.append(info["tokens"])
+
+    reduction = 1 - sum(after) / sum(before)
+    timings.sort()
+    print(f"clean_ticket on {len(tickets)} email tickets")
+    print(
+        f"  tokens/ticket  {statistics.mean(before):7.1f} -> "
+        f"{statistics.mean(after):6.1f}  ({reduction:.0%} fewer)"
+    )
+    print(
+        f"  ms/ticket      mean {statistics.mean(timings):.3f}  "
+        f"p50 {timings[len(timings) // 2]:.3f}  "
+        f"p99 {timings[int(len(timings) * 0.99)]:.3f}"
+    )
+
+    sample = tickets[: args.pipeline_tickets]
+    print(f"\nstub pipeline on {len(sample)} tickets (LLM tokens are all stages)")
+    results = {}
+    for enabled in (False, True):
+        tokens, seconds = run_pipeline(sample, enabled, args.llm_latency)
+        results[enabled] = tokens
+        label = "preprocess on " if enabled else "preprocess off"
+        print(
+            f"  {label}  {tokens:7.1f} LLM tokens/ticket  "
+            f"{seconds * 1000:7.1f} ms/ticket"
+        )
+    print(f"  LLM token reduction {1 - results[True] / results[False]:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Re-rank stage latency and prompt-token benchmark
+
+Runs RerankAgent over synthetic tickets with over-fetched candidates.
+The cross-encoder is replaced by a CPU-bound lexical scorer with a
+configurable per-pair cost, so the numbers show the stage's overhead,
+cache behaviour and time-budget cutoff rather than model quality.
+
+    python -m benchmarks.bench_rerank --pair-ms 4 --budget-ms 150
+"""
+
+from agents.rerank_agent import RerankAgent
+from utils.config import config
+import argparse
+import random
+import statistics
+import time
+
+TOPICS = ["password", "invoice", "refund", "sso", "export", "webhook", "latency"]
+
+
+class LexicalScorer:
+    """CrossEncoder stand-in: word overlap plus a busy-wait per pair"""
+
+    def __init__(self, pair_ms: float):
+        self.pair_seconds = pair_ms / 1000
+
+    def predict(self, pairs, batch_size=32):
+        deadline = time.perf_counter() + self.pair_seconds * len(pairs)
+        scores = []
+        for query, doc in pairs:
+            q = set(query.lower().split())
+            scores.append(len(q & set(doc.lower().split())) / (len(q) or 1))
+        while time.perf_counter() < deadline:
+            pass
+        return scores
+
+
+def make_ticket(rng: random.Random):
+    topic = rng.choice(TOPICS)
+    query = f"my {topic} is not working since yesterday please help"
+    candidates = [
+        {
+            "id": f"{t}-{i}",
+            "content": f"How to fix {t} problems. "
+            + " ".join(rng.choice(TOPICS) for _ in range(120)),
+            "score": rng.uniform(0.3, 0.6),
+        }
+        for i, t in enumerate(rng.sample(TOPICS, len(TOPICS)) * 2)
+    ][: config.RERANK_CANDIDATES]
+    return query, candidates
+
+
+def run(agent: RerankAgent, tickets):
+    latencies, before, after = [], 0, 0
+    for query, candidates in tickets:
+        kept, info = agent.rerank(query, candidates)
+        latencies.append(info["latency_ms"])
+        before += agent.context_tokens(candidates)
+        after += agent.context_tokens(kept)
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        "token_reduction": f"{(1 - after / before) * 100:.1f}%",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=200)
+    parser.add_argument("--pair-ms", type=float, default=4.0)
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    args = parser.parse_args()
+
+    config.RERANK_TIME_BUDGET_MS = args.budget_ms
+    rng = random.Random(3)
+    tickets = [make_ticket(rng) for _ in range(args.tickets)]
+
+    agent = RerankAgent(model=LexicalScorer(args.pair_ms))
+    print(f"candidates={config.RERANK_CANDIDATES} keep={config.RERANK_TOP_N}")
+    print("cold cache :", run(agent, tickets))
+    print("warm cache :", run(agent, tickets))
+    print("stats      :", agent.stats)
+
+    slow = RerankAgent(model=LexicalScorer(args.budget_ms / 4))
+    print("over budget:", run(slow, tickets[:20]), slow.stats)
+
+
+if __name__ == "__main__":
+    main()
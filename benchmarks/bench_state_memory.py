@@ -0,0 +1,115 @@
+"""
+Memory held per in-flight ticket by the graph state and the API result
+
+Runs `--sample` tickets through the stub pipeline (knowledge base of
+chunk-sized documents, no checkpointer), then holds `--tickets` copies of
+their states, as many tickets waiting on a slow model or database would,
+and reports bytes per ticket (tracemalloc) for:
+
+- the full final state returned by process_ticket
+- the TicketResult the API and database layers keep
+
+plus the peak allocation while one ticket runs through the graph.
+
+    python -m benchmarks.bench_state_memory --tickets 10000
+"""
+
+from benchmarks.stubs import StubLLM, build_stub_workflow
+from graph.state import TicketResult
+from utils.config import config
+from utils.logger import configure_logging
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+
+TOPICS = ["password reset", "refunds", "CSV export", "SSO login", "invoices"]
+TICKETS = [
+    "I can't log in, the password reset email never arrives.",
+    "I was charged twice this month and want a refund.",
+    "How do I export my data as CSV?",
+    "Our SSO login fails with an error since this morning.",
+]
+
+
+def make_docs(count: int, rng: random.Random) -> list:
+    """Chunk-sized (~180 token) articles, like the ingestion pipeline writes"""
+    words = "account settings page email link billing export team admin".split()
+    docs = []
+    for i in range(count):
+        topic = TOPICS[i % len(TOPICS)]
+        body = " ".join(rng.choice(words) for _ in range(110))
+        docs.append(
+            {
+                "content": f"How to fix {topic} issues (article {i}). {body}",
+                "metadata": {"category": "technical", "topic": topic},
+            }
+        )
+    return docs
+
+
+def held_bytes(make) -> int:
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    held = make()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    del held
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=10000)
+    parser.add_argument("--sample", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    configure_logging(level="WARNING", enqueue=False)
+    config.CHECKPOINT_ENABLED = False
+
+    rng = random.Random(args.seed)
+    workflow = build_stub_workflow(StubLLM(), docs=make_docs(40, rng))
+    for i in range(5):  # Warm-up: model routes, caches
+        workflow.process_ticket(f"WARMUP-{i}", TICKETS[i % len(TICKETS)])
+
+    tracemalloc.start()
+    peaks, states = [], []
+    for i in range(args.sample):
+        gc.collect()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        states.append(workflow.process_ticket(f"TICKET-{i}", TICKETS[i % len(TICKETS)]))
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+
+    # Distinct copies down to the strings, as each real ticket's documents
+    # are deserialized anew
+    encoded = [json.dumps(state, default=str) for state in states]
+
+    def full_states():
+        return [json.loads(encoded[i % len(encoded)]) for i in range(args.tickets)]
+
+    def results():
+        return [
+            TicketResult.from_state(json.loads(encoded[i % len(encoded)]))
+            for i in range(args.tickets)
+        ]
+
+    state_bytes = held_bytes(full_states)
+    result_bytes = held_bytes(results)
+    tracemalloc.stop()
+
+    print(f"{args.tickets} in-flight tickets ({args.sample} distinct)")
+    print(
+        f"  final state     {state_bytes / 2**20:8.1f} MiB  "
+        f"{state_bytes / args.tickets:8.0f} B/ticket"
+    )
+    print(
+        f"  TicketResult    {result_bytes / 2**20:8.1f} MiB  "
+        f"{result_bytes / args.tickets:8.0f} B/ticket"
+    )
+    print(f"  graph run peak  {sum(peaks) / len(peaks) / 1024:8.1f} KiB/ticket (mean)")
+
+
+if __name__ == "__main__":
+    main()
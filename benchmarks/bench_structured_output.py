@@ -0,0 +1,126 @@
+"""
+Parse failures with strict json.loads vs the structured-output layer
+
+Builds a corpus of agent replies with the defects chat models produce
+(markdown fences, prose around the JSON, single quotes, Python literals,
+trailing commas, unquoted keys, replies cut off mid-field) in the given
+proportion, and reports per agent how many each parser reads and the
+parse cost. Strict failures are what used to fall back to
+general/medium triage, 0.5 resolution confidence or a forced escalation.
+Then runs the stub pipeline with fenced and truncated replies and prints
+the per-agent outcome counters served at /api/metrics.
+
+    python -m benchmarks.bench_structured_output --replies 3000 --defect-rate 0.2
+"""
+
+from agents.escalation_agent import EscalationAgent
+from agents.resolution_agent import ResolutionAgent
+from agents.triage_agent import TriageAgent
+from benchmarks.stubs import StubLLM, build_stub_workflow
+from graph.checkpointing import TicketCheckpointStore
+from utils.logger import configure_logging
+from utils.structured_output import StructuredOutput, output_stats
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+REPLIES = {
+    "triage": (
+        TriageAgent._parse,
+        {"category": "billing", "priority": "high", "keywords": ["refund", "charge"]},
+    ),
+    "resolution": (
+        ResolutionAgent._parse,
+        {"response": "Refunds take 5-7 business days.", "confidence": 0.86},
+    ),
+    "escalation": (
+        EscalationAgent._parse,
+        {"escalate": False, "reason": "Documented self-service fix"},
+    ),
+}
+
+
+def _python_repr(reply: dict) -> str:
+    return repr(reply)  # Single quotes, True/False
+
+
+DEFECTS = {
+    "fenced": lambda r: f"```json\n{json.dumps(r, indent=2)}\n```",
+    "prose": lambda r: f"Sure! Here is my answer:\n{json.dumps(r)}\nHope this helps.",
+    "python": _python_repr,
+    "trailing_comma": lambda r: json.dumps(r, indent=2)[:-2] + ",\n}",
+    "unquoted_keys": lambda r: "{"
+    + ", ".join(f"{k}: {json.dumps(v)}" for k, v in r.items())
+    + "}",
+    "cut_off": lambda r: json.dumps(r)[: int(len(json.dumps(r)) * 0.8)],
+}
+
+
+def strict(content: str) -> bool:
+    try:
+        json.loads(content)
+        return True
+    except ValueError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--replies", type=int, default=3000)
+    parser.add_argument("--defect-rate", type=float, default=0.2)
+    parser.add_argument("--tickets", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    configure_logging(level="ERROR", enqueue=False)
+    rng = random.Random(args.seed)
+
+    print(f"{args.replies} replies per agent, {args.defect_rate:.0%} with a defect")
+    print(
+        f"{'agent':<11} {'strict ok':>9} {'layer ok':>9} "
+        f"{'strict us':>9} {'layer us':>9}"
+    )
+    for agent, (agent_parse, reply) in REPLIES.items():
+        # Separate counters, so the pipeline's below are its own
+        parse = StructuredOutput(f"corpus.{agent}", agent_parse.schema)
+        corpus = []
+        for _ in range(args.replies):
+            if rng.random() < args.defect_rate:
+                corpus.append(rng.choice(list(DEFECTS.values()))(reply))
+            else:
+                corpus.append(json.dumps(reply))
+
+        start = time.perf_counter()
+        strict_ok = sum(strict(c) for c in corpus)
+        strict_us = (time.perf_counter() - start) / len(corpus) * 1e6
+
+        start, layer_ok = time.perf_counter(), 0
+        for content in corpus:
+            try:
+                parse(content)
+                layer_ok += 1
+            except ValueError:
+                pass
+        layer_us = (time.perf_counter() - start) / len(corpus) * 1e6
+        print(
+            f"{agent:<11} {strict_ok / len(corpus):>9.1%} "
+            f"{layer_ok / len(corpus):>9.1%} {strict_us:>9.1f} {layer_us:>9.1f}"
+        )
+
+    print(f"\nstub pipeline, {args.tickets} tickets (10% fenced, 5% cut off)")
+    with tempfile.TemporaryDirectory() as directory:
+        store = TicketCheckpointStore(path=os.path.join(directory, "cp.sqlite"))
+        llm = StubLLM(malformed_rate=0.05, fenced_rate=0.1, seed=args.seed)
+        workflow = build_stub_workflow(llm, checkpoints=store)
+        for i in range(args.tickets):
+            workflow.process_ticket(f"TICKET-{i}", "I was charged twice, please help")
+    for agent, stats in output_stats().items():
+        if agent.startswith("corpus.") or not stats["clean"] + stats["failed"]:
+            continue
+        print(f"  {agent:<11} {json.dumps(stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Per-turn cost of follow-up messages vs re-running the full pipeline
+
+One ticket gets `--turns` follow-ups. Each turn is answered three ways
+and its wall time and LLM tokens are reported:
+
+- fresh:      the follow-up as a brand-new ticket (the old behaviour;
+              context-free, so the answer loses the thread)
+- transcript: a brand-new ticket carrying the whole transcript (keeps
+              the thread, prompt grows every turn)
+- followup:   process_followup (stored triage and documents, bounded
+              conversation summary)
+
+The stub pipeline embeds with the lexical HashingEncoder, which scores
+paraphrases as further apart than the sentence-transformers model does;
+`--max-drift` (default 0.7) stands in for THREAD_TOPIC_DRIFT accordingly.
+
+    python -m benchmarks.bench_threads --turns 10 --llm-latency 0.05
+"""
+
+from benchmarks.stubs import StubLLM, build_stub_workflow
+from graph.checkpointing import TicketCheckpointStore
+from utils.config import config
+from utils.logger import configure_logging
+import argparse
+import os
+import tempfile
+import time
+
+TICKET = "How do I reset my password? The reset email never arrives."
+FOLLOWUPS = [
+    "Still not working, I checked spam and the reset email isn't there",
+    "I tried again and the password reset link says it expired",
+    "Now the reset page just spins after I enter a new password",
+    "Still can't log in after resetting my password",
+]
+
+
+def timed(fn, *args) -> tuple:
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--max-drift", type=float, default=0.7)
+    args = parser.parse_args()
+    config.THREAD_TOPIC_DRIFT = args.max_drift
+    configure_logging(level="WARNING", enqueue=False)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = TicketCheckpointStore(path=os.path.join(directory, "cp.sqlite"))
+        workflow = build_stub_workflow(
+            StubLLM(latency=args.llm_latency), checkpoints=store
+        )
+        workflow.process_ticket("TICKET-1", TICKET)
+        transcript = [TICKET]
+
+        print(
+            f"{'turn':>4} {'fresh ms':>9} {'tok':>6} {'transcript ms':>14} {'tok':>6} "
+            f"{'followup ms':>12} {'tok':>6} {'drift':>6} {'reused':>7}"
+        )
+        totals = {"fresh": [0, 0], "transcript": [0, 0], "followup": [0, 0]}
+        for turn in range(args.turns):
+            message = FOLLOWUPS[turn % len(FOLLOWUPS)]
+            transcript.append(message)
+
+            fresh, fresh_s = timed(workflow.process_ticket, f"FRESH-{turn}", message)
+            full, full_s = timed(
+                workflow.process_ticket, f"FULL-{turn}", "\n\n".join(transcript)
+            )
+            followup, followup_s = timed(workflow.process_followup, "TICKET-1", message)
+            transcript.append(followup["response"])
+
+            rows = (
+                ("fresh", fresh_s, fresh["total_tokens"]),
+                ("transcript", full_s, full["total_tokens"]),
+                ("followup", followup_s, followup["turn"]["total_tokens"]),
+            )
+            for name, seconds, tokens in rows:
+                totals[name][0] += seconds
+                totals[name][1] += tokens
+            print(
+                f"{turn + 2:>4} {fresh_s * 1000:>9.0f} {rows[0][2]:>6} "
+                f"{full_s * 1000:>14.0f} {rows[1][2]:>6} "
+                f"{followup_s * 1000:>12.0f} {rows[2][2]:>6} "
+                f"{followup['turn']['topic_drift']:>6.2f} "
+                f"{str(followup['turn']['reused_triage']):>7}"
+            )
+
+        print()
+        for name, (seconds, tokens) in totals.items():
+            print(
+                f"{name:<11} mean {seconds / args.turns * 1000:7.0f} ms/turn  "
+                f"{tokens / args.turns:7.0f} tokens/turn"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+LLM calls, tokens and latency of micro-batched triage during a burst
+
+Tickets arrive as a Poisson stream at `--rate` per second and are
+triaged on a pool of worker threads, once with one call per ticket and
+once through TriageBatcher. Reports LLM calls, triage input tokens, and
+per-ticket triage latency; for the batcher also the queueing it added
+(time spent waiting for a batch to close).
+
+    python -m benchmarks.bench_triage_batching --tickets 400 --rate 200
+    python -m benchmarks.bench_triage_batching --tickets 40 --rate 5    # quiet
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from agents.triage_agent import TriageAgent
+from agents.triage_batcher import TriageBatcher
+from benchmarks.stubs import StubLLM
+from utils.logger import configure_logging
+from utils.model_router import ModelRouter
+import argparse
+import random
+import statistics
+import time
+
+TICKETS = [
+    "I can't log into my account, the password reset email never arrives.",
+    "I was charged twice for my March invoice, please refund the duplicate.",
+    "URGENT: the dashboard has been down for everyone since 10am.",
+    "How do I export my data as CSV?",
+    "Please add dark mode to the mobile app.",
+    "Our API calls fail with error 503 since the last deploy.",
+]
+
+
+def run(args, batched: bool) -> dict:
+    llm = StubLLM(latency=args.llm_latency)
+    agent = TriageAgent(router=ModelRouter(llm=llm))
+    batcher = TriageBatcher(agent, args.max_batch, args.max_wait_ms)
+    rng = random.Random(args.seed)
+    latencies, tokens = [], [0]
+
+    def triage(i: int):
+        text = TICKETS[i % len(TICKETS)]
+        start = time.perf_counter()
+        if batched:
+            result = batcher.analyze(f"TICKET-{i}", text)
+        else:
+            result = agent.analyze_ticket(text)
+        latencies.append((time.perf_counter() - start) * 1000)
+        tokens[0] += sum(c["input_tokens"] for c in result["model_calls"])
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for i in range(args.tickets):
+            pool.submit(triage, i)
+            time.sleep(rng.expovariate(args.rate))
+
+    latencies.sort()
+    return {
+        "calls": sum(llm.calls.values()),
+        "tokens": tokens[0],
+        "mean_ms": statistics.mean(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95)],
+        "stats": batcher.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=400)
+    parser.add_argument("--rate", type=float, default=200, help="tickets/second")
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    configure_logging(level="WARNING", enqueue=False)
+
+    print(
+        f"{args.tickets} tickets at {args.rate:g}/s, LLM latency "
+        f"{args.llm_latency * 1000:.0f} ms, {args.workers} workers"
+    )
+    print(f"{'mode':<10} {'calls':>6} {'tokens':>8} {'mean ms':>8} {'p95 ms':>8}")
+    results = {}
+    for batched in (False, True):
+        name = "batched" if batched else "per-ticket"
+        r = results[name] = run(args, batched)
+        print(
+            f"{name:<10} {r['calls']:>6} {r['tokens']:>8} "
+            f"{r['mean_ms']:>8.1f} {r['p95_ms']:>8.1f}"
+        )
+
+    base, stats = results["per-ticket"], results["batched"]["stats"]
+    print(
+        f"\ncalls saved {base['calls'] - results['batched']['calls']} "
+        f"({stats['batches']} batches, {stats['batched_tickets']} tickets batched, "
+        f"{stats['solo']} alone, {stats['retried']} re-triaged)"
+    )
+    print(f"tokens saved {base['tokens'] - results['batched']['tokens']}")
+    print(
+        f"added queueing mean {stats['queue_ms_mean']:.1f} ms, "
+        f"max {stats['queue_ms_max']:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Replay recorded tickets offline and diff reports between revisions
+
+Cassettes are recorded by the API with CASSETTE_RECORD=true (see
+utils/cassette.py). `run` replays each one through the current code with
+recorded LLM, Qdrant and DB latencies (scaled by --latency-scale; 0 runs
+as fast as possible) and writes a report. Check out another revision, run
+again, then `diff` the two reports.
+
+    python -m benchmarks.replay_cassettes run data/cassettes --out before.json
+    python -m benchmarks.replay_cassettes run data/cassettes --out after.json
+    python -m benchmarks.replay_cassettes diff before.json after.json
+
+`record-stub` writes cassettes from the stubbed pipeline, for trying the
+harness without production traffic.
+"""
+
+from agents.analytics_agent import AnalyticsAgent
+from agents.escalation_agent import EscalationAgent
+from agents.knowledge_agent import KnowledgeAgent
+from agents.resolution_agent import ResolutionAgent
+from agents.triage_agent import TriageAgent
+from graph.agent_graph import MultiAgentWorkflow
+from utils.cassette import (
+    CassetteRecorder,
+    ReplayRouter,
+    ReplayVectorDB,
+    enable_recording,
+    iter_cassettes,
+    record_event,
+    replaying,
+    summarize,
+)
+from utils.config import config
+from utils.logger import logger
+import argparse
+import json
+import subprocess
+import time
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def build_replay_workflow(latency_scale: float) -> MultiAgentWorkflow:
+    config.CHECKPOINT_ENABLED = False
+    router = ReplayRouter(latency_scale)
+    return MultiAgentWorkflow(
+        triage_agent=TriageAgent(router=router),
+        knowledge_agent=KnowledgeAgent(vector_db=ReplayVectorDB(latency_scale)),
+        resolution_agent=ResolutionAgent(router=router),
+        escalation_agent=EscalationAgent(router=router),
+        analytics_agent=AnalyticsAgent(),
+        checkpoints=None,
+    )
+
+
+def run(directory: str, latency_scale: float) -> dict:
+    workflow = build_replay_workflow(latency_scale)
+    observed, misses, errors = [], 0, 0
+
+    for cassette in iter_cassettes(directory):
+        with replaying(cassette) as session:
+            try:
+                workflow.process_ticket(cassette.ticket_id, cassette.content)
+            except Exception as e:
+                logger.warning(f"Replay of {cassette.ticket_id} failed: {e}")
+                errors += 1
+            # The API saves the ticket after processing; replay that cost too
+            for event in session.queues["db"]:
+                time.sleep(event["latency_ms"] / 1000 * latency_scale)
+                record_event("db", op=event["op"], latency_ms=event["latency_ms"])
+            misses += session.misses
+            observed.append(session.recording)
+
+    report = summarize(observed)
+    report.update(
+        revision=git_revision(),
+        latency_scale=latency_scale,
+        misses=misses,
+        errors=errors,
+    )
+    return report
+
+
+def diff(before: dict, after: dict):
+    def pct(a, b):
+        return f"{(b - a) / a:+.1%}" if a else "n/a"
+
+    print(f"{'':<40} {before['revision']:>12} {after['revision']:>12} {'change':>9}")
+    for name in sorted(set(before["stages"]) | set(after["stages"])):
+        a = before["stages"].get(name, {}).get("mean_ms", 0.0)
+        b = after["stages"].get(name, {}).get("mean_ms", 0.0)
+        print(f"{name + ' (mean ms)':<40} {a:>12.2f} {b:>12.2f} {pct(a, b):>9}")
+
+    rows = [
+        ("LLM calls / ticket", "llm_calls_per_ticket"),
+        ("misses", "misses"),
+        ("errors", "errors"),
+    ]
+    for label, key in rows:
+        a, b = before[key], after[key]
+        print(f"{label:<40} {a:>12} {b:>12} {pct(a, b):>9}")
+    for kind in ("input", "output"):
+        a, b = before["tokens"][kind], after["tokens"][kind]
+        print(f"{kind + ' tokens':<40} {a:>12} {b:>12} {pct(a, b):>9}")
+    for name in sorted(set(before["llm_calls"]) | set(after["llm_calls"])):
+        a = before["llm_calls"].get(name, 0)
+        b = after["llm_calls"].get(name, 0)
+        print(f"  {name:<38} {a:>12} {b:>12}")
+
+
+def record_stub(directory: str, tickets: int):
+    from benchmarks.stubs import StubLLM, build_stub_workflow
+
+    config.CHECKPOINT_ENABLED = False
+    workflow = build_stub_workflow(StubLLM(latency=0.02), checkpoints=None)
+    enable_recording(workflow)
+    recorder = CassetteRecorder(directory)
+    contents = [
+        "How do I reset my password? Mail me at jane@example.com",
+        "I was charged twice this month, please refund",
+        "URGENT: export is failing for every customer",
+        "How do I export my data as CSV?",
+    ]
+    for i in range(tickets):
+        content = contents[i % len(contents)]
+        with recorder.scope(f"TICKET-{i}", content):
+            workflow.process_ticket(f"TICKET-{i}", content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Replay cassettes, write a report")
+    run_parser.add_argument("directory")
+    run_parser.add_argument("--out", required=True)
+    run_parser.add_argument("--latency-scale", type=float, default=1.0)
+
+    diff_parser = commands.add_parser("diff", help="Compare two reports")
+    diff_parser.add_argument("before")
+    diff_parser.add_argument("after")
+
+    stub_parser = commands.add_parser("record-stub", help="Record stub cassettes")
+    stub_parser.add_argument("directory")
+    stub_parser.add_argument("--tickets", type=int, default=20)
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run(args.directory, args.latency_scale)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(json.dumps(report, indent=2))
+    elif args.command == "diff":
+        with open(args.before) as a, open(args.after) as b:
+            diff(json.load(a), json.load(b))
+    else:
+        record_stub(args.directory, args.tickets)
+
+
+if __name__ == "__main__":
+    main()
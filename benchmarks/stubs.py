@@ -0,0 +1,216 @@
+"""
+Offline stand-ins for benchmarking the pipeline without Groq or Qdrant Cloud
+
+StubLLM answers each agent's prompt with canned JSON after a configurable
+latency and reports token usage like a real chat model response.
+build_stub_workflow wires the real agents and graph to StubLLM and a local
+in-memory Qdrant seeded with a few support articles.
+"""
+
+from collections import Counter
+from langchain_core.messages import AIMessage
+from qdrant_client import QdrantClient
+from agents.triage_agent import TriageAgent
+from agents.knowledge_agent import KnowledgeAgent
+from agents.resolution_agent import ResolutionAgent
+from agents.escalation_agent import EscalationAgent
+from agents.analytics_agent import AnalyticsAgent
+from database.qdrant_manager import QdrantManager
+from graph.agent_graph import MultiAgentWorkflow
+from utils.embeddings import HashingEncoder
+from utils.model_router import ModelRouter
+from utils.prompts import (
+    DIGEST_SYSTEM_PROMPT,
+    ESCALATION_SYSTEM_PROMPT,
+    RESOLUTION_SYSTEM_PROMPT,
+    TRIAGE_BATCH_SYSTEM_PROMPT,
+    TRIAGE_SYSTEM_PROMPT,
+)
+from utils.tokens import estimate_tokens
+import json
+import random
+import re
+import threading
+import time
+
+SAMPLE_DOCS = [
+    {
+        "content": "To reset your password, go to the login page and click "
+        "'Forgot Password'. You'll receive an email within 5 minutes.",
+        "metadata": {"category": "authentication", "topic": "password_reset"},
+    },
+    {
+        "content": "If you're not receiving password reset emails, check your spam "
+        "folder and make sure noreply@example.com is not blocked.",
+        "metadata": {"category": "authentication", "topic": "email_issues"},
+    },
+    {
+        "content": "Refunds are issued to the original payment method and take "
+        "5-7 business days to appear on your statement.",
+        "metadata": {"category": "billing", "topic": "refunds"},
+    },
+    {
+        "content": "You can export your data as CSV from Settings > Data > Export.",
+        "metadata": {"category": "technical", "topic": "export"},
+    },
+]
+
+STAGES = {
+    TRIAGE_SYSTEM_PROMPT: "triage",
+    TRIAGE_BATCH_SYSTEM_PROMPT: "triage_batch",
+    RESOLUTION_SYSTEM_PROMPT: "resolution",
+    ESCALATION_SYSTEM_PROMPT: "escalation",
+    DIGEST_SYSTEM_PROMPT: "digest",
+}
+
+
+class StubLLM:
+    """
+    Chat model stand-in with the `invoke` interface the agents use
+
+    Args:
+        latency: Seconds to sleep per call (or a dict of stage -> seconds)
+        model: Model name reported in response metadata
+        malformed_rate: Fraction of responses that are not valid JSON
+            (cut off half-way)
+        fenced_rate: Fraction of responses wrapped in a markdown fence
+            with a sentence before it
+        low_confidence_rate: Fraction of resolutions with confidence 0.55
+        seed: Seed for the rates above
+        capacity: Concurrent calls the backend serves; more wait (rate limit)
+        input_token_latency: Seconds per prompt token added to each call,
+            like a provider's prompt processing time
+    """
+
+    def __init__(
+        self,
+        latency=0.0,
+        model: str = "stub-model",
+        malformed_rate: float = 0.0,
+        fenced_rate: float = 0.0,
+        low_confidence_rate: float = 0.0,
+        seed: int = 0,
+        capacity: int = None,
+        input_token_latency: float = 0.0,
+    ):
+        self.latency = latency
+        self.model = model
+        self.malformed_rate = malformed_rate
+        self.fenced_rate = fenced_rate
+        self.low_confidence_rate = low_confidence_rate
+        self.input_token_latency = input_token_latency
+        self.calls = Counter()
+        self.fail_next = Counter()  # stage -> number of calls to fail
+        self._random = random.Random(seed)
+        self._slots = threading.Semaphore(capacity) if capacity else None
+
+    def bind(self, **kwargs):
+        return self
+
+    @staticmethod
+    def stage_of(messages) -> str:
+        return STAGES.get(messages[0].content, "unknown")
+
+    def respond(self, stage: str, prompt: str) -> dict:
+        if stage == "triage":
+            text = prompt.lower()
+            billing = any(w in text for w in ("charge", "refund", "invoice"))
+            priority = "medium"
+            if "urgent" in text:
+                priority = "high"
+            elif "how do i" in text:
+                priority = "low"
+            return {
+                "category": "billing" if billing else "technical",
+                "priority": priority,
+                "keywords": ["password", "reset", "email"],
+            }
+        if stage == "triage_batch":
+            # "[id]\nticket" blocks, as built by TriageBatcher
+            tickets = re.findall(r"^\[(.+?)\]\n(.*?)(?=\n\n\[|\Z)", prompt, re.M | re.S)
+            return {
+                "results": [
+                    {"id": key, **self.respond("triage", text)} for key, text in tickets
+                ]
+            }
+        if stage == "resolution":
+            low = self._random.random() < self.low_confidence_rate
+            return {
+                "response": "Please use 'Forgot Password' on the login page and "
+                "check your spam folder if the email doesn't arrive.",
+                "confidence": 0.55 if low else 0.86,
+            }
+        if stage == "digest":
+            # First words of the opening sentences, sentences with numbers
+            # and every link, like a model condensing the article
+            text = prompt.split("\n\n", 1)[-1]
+            sentences = [s for s in re.split(r"(?<=[.!?])\s+", text) if s]
+            return {
+                "key_steps": [" ".join(s.split()[:10]) for s in sentences[:3]],
+                "facts": [s for s in sentences[3:] if re.search(r"\d", s)][:2],
+                "links": [
+                    link.rstrip(".,")
+                    for link in re.findall(r"https?://\S+|[\w.]+@[\w.]+\w", text)
+                ],
+            }
+        return {"escalate": False, "reason": "Documented self-service fix"}
+
+    def invoke(self, messages, **kwargs) -> AIMessage:
+        stage = self.stage_of(messages)
+        self.calls[stage] += 1
+
+        prompt = "\n".join(m.content for m in messages)
+        input_tokens = estimate_tokens(prompt)
+
+        latency = self.latency
+        if isinstance(latency, dict):
+            latency = latency.get(stage, 0.0)
+        latency += input_tokens * self.input_token_latency
+        if self._slots:
+            with self._slots:
+                time.sleep(latency)
+        elif latency:
+            time.sleep(latency)
+
+        if self.fail_next[stage] > 0:
+            self.fail_next[stage] -= 1
+            raise ConnectionError(f"Stub {stage} outage")
+
+        # The ticket prompt; a re-ask appends messages after it
+        content = json.dumps(self.respond(stage, messages[1].content))
+        if self._random.random() < self.malformed_rate:
+            content = content[: len(content) // 2]  # Truncated JSON
+        if self._random.random() < self.fenced_rate:
+            content = f"Here is the analysis:\n```json\n{content}\n```"
+        output_tokens = estimate_tokens(content)
+
+        return AIMessage(
+            content=content,
+            response_metadata={"model_name": self.model},
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+
+
+def build_stub_vector_db(docs=None) -> QdrantManager:
+    manager = QdrantManager(client=QdrantClient(":memory:"), encoder=HashingEncoder())
+    manager.add_documents(docs or SAMPLE_DOCS)
+    return manager
+
+
+def build_stub_workflow(
+    llm: StubLLM = None, router: ModelRouter = None, docs=None, **kwargs
+) -> MultiAgentWorkflow:
+    """Pass `llm` to answer every model route with one stub, or a `router`"""
+    router = router or ModelRouter(llm=llm or StubLLM())
+    return MultiAgentWorkflow(
+        triage_agent=TriageAgent(router=router),
+        knowledge_agent=KnowledgeAgent(vector_db=build_stub_vector_db(docs)),
+        resolution_agent=ResolutionAgent(router=router),
+        escalation_agent=EscalationAgent(router=router),
+        analytics_agent=AnalyticsAgent(),
+        **kwargs,
+    )
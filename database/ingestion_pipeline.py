@@ -0,0 +1,319 @@
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from html.parser import HTMLParser
+from database.qdrant_manager import QdrantManager
+from database.knowledge_sync import KnowledgeSync
+from utils.config import config
+from utils.embeddings import load_encoder
+from utils.logger import logger
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import time
+
+SUPPORTED_EXTENSIONS = (".md", ".markdown", ".html", ".htm", ".txt")
+
+_TOKEN_RE = re.compile(r"\S+")
+_HEADING_RE = re.compile(r"^\s*#{1,6}\s+(.+?)\s*#*\s*$", re.MULTILINE)
+_BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+
+
+class _HTMLTextExtractor(HTMLParser):
+    """Collect visible text and the <title> from an HTML document"""
+
+    BLOCK_TAGS = {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6"}
+    SKIP_TAGS = {"script", "style", "head"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+        self.title = ""
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title":
+            self._in_title = True
+        elif tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag in self.SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth:
+            self.parts.append(data)
+
+
+def iter_source_files(root: str) -> Iterator[str]:
+    """Walk `root` in a stable order, yielding supported document paths"""
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield os.path.join(directory, name)
+
+
+def load_document(path: str) -> Tuple[str, str]:
+    """
+    Read a source file as plain text
+
+    Returns:
+        (title, text) - title falls back to the file name
+    """
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        raw = f.read()
+
+    title = ""
+    if path.lower().endswith((".html", ".htm")):
+        extractor = _HTMLTextExtractor()
+        extractor.feed(raw)
+        title = extractor.title.strip()
+        text = "".join(extractor.parts)
+    else:
+        text = raw
+        heading = _HEADING_RE.search(text)
+        if heading:
+            title = heading.group(1)
+
+    text = _BLANK_LINES_RE.sub("\n\n", text).strip()
+    return title or os.path.splitext(os.path.basename(path))[0], text
+
+
+def chunk_text(text: str, max_tokens: int, overlap: int) -> Iterator[str]:
+    """
+    Split text into overlapping windows of at most `max_tokens` tokens
+
+    Tokens are whitespace-delimited words, a conservative proxy for the
+    encoder's word pieces. Chunks are sliced from the original text so
+    formatting inside a chunk is preserved.
+    """
+    spans = [m.span() for m in _TOKEN_RE.finditer(text)]
+    if not spans:
+        return
+
+    step = max(1, max_tokens - overlap)
+    for start in range(0, len(spans), step):
+        window = spans[start : start + max_tokens]
+        yield text[window[0][0] : window[-1][1]]
+        if start + max_tokens >= len(spans):
+            break
+
+
+def iter_chunks(
+    root: str,
+    max_tokens: int,
+    overlap: int,
+    stats: Optional[Dict[str, int]] = None,
+) -> Iterator[dict]:
+    """
+    Stream chunk documents for every file under `root`
+
+    Only one file is held in memory at a time. The first directory below
+    `root` becomes the document category (docs/billing/refunds.md -> billing).
+    """
+    for path in iter_source_files(root):
+        relpath = os.path.relpath(path, root).replace(os.sep, "/")
+        title, text = load_document(path)
+        category = relpath.split("/")[0] if "/" in relpath else "general"
+
+        if stats is not None:
+            stats["documents"] += 1
+
+        for index, chunk in enumerate(chunk_text(text, max_tokens, overlap)):
+            if stats is not None:
+                stats["chunks"] += 1
+            yield {
+                "id": f"{relpath}#{index}",
+                "content": chunk,
+                "metadata": {
+                    "source": relpath,
+                    "chunk": index,
+                    "title": title,
+                    "category": category,
+                },
+            }
+
+
+# Per-process encoder, created once by the pool initializer
+_worker_encoder = None
+
+
+def _init_worker(encoder_factory: Callable):
+    global _worker_encoder
+    _worker_encoder = encoder_factory()
+
+
+def _embed_batch(texts: List[str], batch_size: int):
+    return _worker_encoder.encode(texts, batch_size=batch_size)
+
+
+class IngestionPipeline:
+    def __init__(
+        self,
+        vector_db: QdrantManager,
+        workers: Optional[int] = None,
+        embed_batch_size: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        overlap: Optional[int] = None,
+        encoder_factory: Optional[Callable] = None,
+        manifest_path: Optional[str] = None,
+    ):
+        self.vector_db = vector_db
+        self.workers = config.INGEST_WORKERS if workers is None else workers
+        self.embed_batch_size = embed_batch_size or config.INGEST_EMBED_BATCH_SIZE
+        self.max_tokens = max_tokens or config.INGEST_CHUNK_TOKENS
+        self.overlap = config.INGEST_CHUNK_OVERLAP if overlap is None else overlap
+        self.encoder_factory = encoder_factory
+        self.sync = KnowledgeSync(
+            vector_db, manifest_path=manifest_path, batch_size=self.embed_batch_size
+        )
+
+    def _write_pipelined(self, documents: Iterable[dict]) -> int:
+        """
+        Embed in a process pool and upsert from a background thread
+
+        At most `workers + 1` batches are being embedded and one batch is
+        being uploaded at any time, so memory stays flat regardless of
+        corpus size while encoding overlaps with network I/O.
+        """
+        doc_iter = iter(documents)
+        written = 0
+        in_flight: deque = deque()  # (batch, embedding future)
+        upload: Optional[Future] = None
+
+        if self.workers > 0:
+            pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.encoder_factory or load_encoder,),
+            )
+        else:
+            pool = None
+            encoder = (
+                self.encoder_factory()
+                if self.encoder_factory
+                else self.vector_db.encoder
+            )
+
+        def submit(texts: List[str]) -> Future:
+            if pool is not None:
+                return pool.submit(_embed_batch, texts, self.embed_batch_size)
+            future: Future = Future()
+            future.set_result(encoder.encode(texts, batch_size=self.embed_batch_size))
+            return future
+
+        uploader = ThreadPoolExecutor(max_workers=1)
+        try:
+            max_in_flight = max(1, self.workers) + 1
+            exhausted = False
+
+            while in_flight or not exhausted:
+                # Keep the pool fed without buffering the whole corpus
+                while not exhausted and len(in_flight) < max_in_flight:
+                    batch = list(islice(doc_iter, self.embed_batch_size))
+                    if not batch:
+                        exhausted = True
+                        break
+                    in_flight.append((batch, submit([doc["content"] for doc in batch])))
+
+                if not in_flight:
+                    break
+
+                batch, future = in_flight.popleft()
+                vectors = future.result()
+
+                # Wait for the previous upload before starting the next one
+                if upload is not None:
+                    written += len(upload.result())
+                upload = uploader.submit(self.vector_db.upsert_embedded, batch, vectors)
+
+            if upload is not None:
+                written += len(upload.result())
+
+        finally:
+            uploader.shutdown(wait=True)
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        return written
+
+    def run(self, root: str, prune: bool = True, full: bool = False) -> Dict:
+        """
+        Ingest every supported file under `root`
+
+        Returns:
+            Sync report plus document/chunk counts and throughput
+        """
+        start_time = time.time()
+        stats = {"documents": 0, "chunks": 0}
+
+        report = self.sync.sync(
+            iter_chunks(root, self.max_tokens, self.overlap, stats),
+            prune=prune,
+            full=full,
+            writer=self._write_pipelined,
+        )
+
+        elapsed = max(time.time() - start_time, 1e-9)
+        report.update(
+            {
+                "documents": stats["documents"],
+                "chunks": stats["chunks"],
+                "duration_seconds": round(elapsed, 3),
+                "docs_per_second": round(stats["documents"] / elapsed, 1),
+                "chunks_per_second": round(stats["chunks"] / elapsed, 1),
+            }
+        )
+
+        logger.success(
+            f"Ingested {stats['documents']} docs / {stats['chunks']} chunks "
+            f"({report['docs_per_second']} docs/s, "
+            f"{report['chunks_per_second']} chunks/s)"
+        )
+
+        return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Stream a directory of Markdown/HTML/text files into Qdrant"
+    )
+    parser.add_argument("root", help="Directory to ingest")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--max-tokens", type=int, default=None)
+    parser.add_argument("--overlap", type=int, default=None)
+    parser.add_argument("--manifest", default=None)
+    parser.add_argument("--full", action="store_true")
+    parser.add_argument("--no-prune", action="store_true")
+    args = parser.parse_args(argv)
+
+    pipeline = IngestionPipeline(
+        QdrantManager(),
+        workers=args.workers,
+        embed_batch_size=args.batch_size,
+        max_tokens=args.max_tokens,
+        overlap=args.overlap,
+        manifest_path=args.manifest,
+    )
+    report = pipeline.run(args.root, prune=not args.no_prune, full=args.full)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
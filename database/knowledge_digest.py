@@ -0,0 +1,130 @@
+from agents.digest_agent import DigestAgent
+from database.qdrant_manager import QdrantManager
+from utils.config import config
+from utils.logger import logger
+from utils.tokens import estimate_tokens
+from typing import Dict, List, Optional
+import argparse
+import json
+import time
+
+
+class KnowledgeDigest:
+    """
+    Offline job that stores a digest of each document chunk in Qdrant
+
+    The digest (key steps, facts, links) goes into the point's payload
+    next to `content`, tagged with the content hash it was made from and
+    the digest VERSION. A rerun only digests points whose digest is
+    missing, was made from other content, or is of an older version;
+    chunks under DIGEST_MIN_TOKENS are left to be used in full.
+    """
+
+    # Bump when the digest prompt or format changes, to redo every digest
+    VERSION = 1
+
+    def __init__(
+        self,
+        vector_db: QdrantManager,
+        digester: Optional[DigestAgent] = None,
+        batch_size: Optional[int] = None,
+        min_tokens: Optional[int] = None,
+    ):
+        self.vector_db = vector_db
+        self.digester = digester or DigestAgent()
+        self.batch_size = batch_size or config.QDRANT_UPSERT_BATCH_SIZE
+        self.min_tokens = config.DIGEST_MIN_TOKENS if min_tokens is None else min_tokens
+
+    def is_current(self, payload: dict, content_hash: str) -> bool:
+        digest = payload.get("digest") or {}
+        return (
+            digest.get("version") == self.VERSION
+            and digest.get("content_hash") == content_hash
+        )
+
+    def run(self, full: bool = False) -> Dict:
+        """
+        Digest every point that needs it
+
+        Args:
+            full: Redo every digest regardless of hash and version
+
+        Returns:
+            Report with point counts, digest LLM tokens, and the size of
+            the digested chunks before and after
+        """
+        start_time = time.time()
+        report = {
+            "scanned": 0,
+            "digested": 0,
+            "current": 0,
+            "short": 0,
+            "failed": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "content_tokens": 0,
+            "digest_tokens": 0,
+        }
+
+        for points in self.vector_db.iter_points(self.batch_size):
+            digests = {}
+            for point in points:
+                report["scanned"] += 1
+                payload = point.payload
+                content_hash = QdrantManager.content_hash(
+                    {
+                        "content": payload["content"],
+                        "metadata": payload.get("metadata", {}),
+                    }
+                )
+                if not full and self.is_current(payload, content_hash):
+                    report["current"] += 1
+                    continue
+                content_tokens = estimate_tokens(payload["content"])
+                if content_tokens < self.min_tokens:
+                    report["short"] += 1
+                    continue
+
+                digest = self.digester.digest(payload["content"])
+                if digest is None:
+                    report["failed"] += 1
+                    continue
+                for call in digest.pop("model_calls"):
+                    report["input_tokens"] += call["input_tokens"]
+                    report["output_tokens"] += call["output_tokens"]
+                report["content_tokens"] += content_tokens
+                report["digest_tokens"] += digest["tokens"]
+                digests[str(point.id)] = {
+                    **digest,
+                    "content_hash": content_hash,
+                    "version": self.VERSION,
+                }
+
+            self.vector_db.set_digests(digests)
+            report["digested"] += len(digests)
+
+        report["seconds"] = round(time.time() - start_time, 2)
+        logger.success(
+            f"Digested {report['digested']} chunks "
+            f"({report['current']} current, {report['short']} short, "
+            f"{report['failed']} failed)"
+        )
+        return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Store a digest of each knowledge base chunk in Qdrant"
+    )
+    parser.add_argument(
+        "--full", action="store_true", help="Redo every digest, not just stale ones"
+    )
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    job = KnowledgeDigest(QdrantManager(), batch_size=args.batch_size)
+    print(json.dumps(job.run(full=args.full), indent=2))
+
+
+if __name__ == "__main__":
+    main()
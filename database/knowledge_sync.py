@@ -0,0 +1,208 @@
+from database.qdrant_manager import QdrantManager
+from utils.config import config
+from utils.logger import logger
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+import argparse
+import json
+import os
+import time
+
+
+class IngestManifest:
+    """Local record of which document version is in the collection"""
+
+    VERSION = 1
+
+    def __init__(self, path: str, collection_name: str):
+        self.path = path
+        self.collection_name = collection_name
+        self.documents: Dict[str, str] = {}  # doc key -> content hash
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        # A manifest written for another collection says nothing about this one
+        if data.get("collection") != self.collection_name:
+            logger.warning(
+                f"Manifest {self.path} belongs to collection "
+                f"{data.get('collection')}, ignoring it"
+            )
+            return
+
+        self.documents = data.get("documents", {})
+
+    def save(self):
+        """Write atomically so an interrupted sync never corrupts the manifest"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": self.VERSION,
+                    "collection": self.collection_name,
+                    "documents": self.documents,
+                },
+                f,
+            )
+        os.replace(tmp_path, self.path)
+
+
+class KnowledgeSync:
+    def __init__(
+        self,
+        vector_db: QdrantManager,
+        manifest_path: Optional[str] = None,
+        batch_size: Optional[int] = None,
+    ):
+        self.vector_db = vector_db
+        self.manifest = IngestManifest(
+            manifest_path or config.KNOWLEDGE_MANIFEST_PATH,
+            vector_db.collection_name,
+        )
+        self.batch_size = batch_size or config.QDRANT_UPSERT_BATCH_SIZE
+
+    @staticmethod
+    def document_key(doc: dict, content_hash: str) -> str:
+        """Stable identity of a document across syncs"""
+        metadata = doc.get("metadata", {})
+        return str(doc.get("id") or metadata.get("source") or content_hash)
+
+    def sync(
+        self,
+        documents: Iterable[dict],
+        prune: bool = True,
+        full: bool = False,
+        writer: Optional[Callable[[Iterable[dict]], int]] = None,
+    ) -> Dict:
+        """
+        Bring the collection in line with `documents`
+
+        Only new or changed documents are embedded. Documents that were
+        ingested before but are missing from `documents` are deleted when
+        `prune` is set. `full` ignores the manifest and re-embeds everything.
+
+        Args:
+            documents: Iterable of dicts with 'content', optional 'id' and 'metadata'
+            prune: Delete previously ingested documents that are no longer present
+            full: Re-embed every document regardless of the manifest
+            writer: Embeds and upserts the changed documents, returning how
+                many were written. Defaults to batched `add_documents`.
+
+        Returns:
+            Report with counts of skipped, embedded and deleted documents
+        """
+        start_time = time.time()
+
+        previous = dict(self.manifest.documents)
+        current: Dict[str, str] = {}
+        stale_hashes: List[str] = []
+        counts = {"skipped": 0, "duplicates": 0}
+
+        def changed_documents() -> Iterator[dict]:
+            for doc in documents:
+                content_hash = QdrantManager.content_hash(doc)
+                key = self.document_key(doc, content_hash)
+
+                if key in current:
+                    counts["duplicates"] += 1
+                    continue
+                current[key] = content_hash
+
+                old_hash = previous.get(key)
+                if old_hash == content_hash and not full:
+                    counts["skipped"] += 1
+                    continue
+                if old_hash and old_hash != content_hash:
+                    stale_hashes.append(old_hash)
+
+                yield {**doc, "content_hash": content_hash}
+
+        if writer is None:
+            embedded = len(
+                self.vector_db.add_documents(changed_documents(), self.batch_size)
+            )
+        else:
+            embedded = writer(changed_documents())
+        skipped, duplicates = counts["skipped"], counts["duplicates"]
+
+        if prune:
+            stale_hashes.extend(
+                old_hash for key, old_hash in previous.items() if key not in current
+            )
+            kept = current
+        else:
+            kept = {**previous, **current}
+
+        # Content-addressed IDs can be shared, so only drop unreferenced points
+        referenced = set(kept.values())
+        stale_ids = sorted(
+            {QdrantManager.point_id(h) for h in stale_hashes if h not in referenced}
+        )
+        if stale_ids:
+            self.vector_db.delete_points(stale_ids, self.batch_size)
+
+        self.manifest.documents = kept
+        self.manifest.save()
+
+        report = {
+            "documents_seen": len(current) + duplicates,
+            "skipped": skipped,
+            "embedded": embedded,
+            "deleted": len(stale_ids),
+            "duplicates": duplicates,
+            "duration_seconds": round(time.time() - start_time, 3),
+        }
+
+        logger.success(
+            f"Knowledge sync: {embedded} embedded, {skipped} skipped, "
+            f"{len(stale_ids)} deleted in {report['duration_seconds']:.2f}s"
+        )
+
+        return report
+
+
+def iter_documents(path: str) -> Iterator[dict]:
+    """Stream documents from a .jsonl file (one per line) or a .json list"""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Incrementally sync a document file into the knowledge base"
+    )
+    parser.add_argument("path", help="Documents as .jsonl or .json list")
+    parser.add_argument(
+        "--full", action="store_true", help="Ignore the manifest, re-embed all"
+    )
+    parser.add_argument(
+        "--no-prune", action="store_true", help="Keep documents missing from input"
+    )
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--manifest", default=None)
+    args = parser.parse_args(argv)
+
+    sync = KnowledgeSync(
+        QdrantManager(), manifest_path=args.manifest, batch_size=args.batch_size
+    )
+    report = sync.sync(
+        iter_documents(args.path), prune=not args.no_prune, full=args.full
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
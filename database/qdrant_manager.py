@@ -1,22 +1,76 @@
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
-from sentence_transformers import SentenceTransformer
+from qdrant_client.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    HnswConfigDiff,
+    MatchAny,
+    PayloadSchemaType,
+    PointIdsList,
+    PointStruct,
+    QuantizationSearchParams,
+    SetPayload,
+    SetPayloadOperation,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
 from utils.config import config
-from utils.logger import logger
-from typing import List
+from utils.embeddings import EMBEDDING_DIM, embedding_cache, load_encoder
+from utils.http_transport import http_transport
+from utils.logger import hot_logger, logger
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+import hashlib
+import json
 import uuid
 
+# Namespace for content-addressed point IDs (uuid5 of the content hash)
+POINT_ID_NAMESPACE = uuid.UUID("6f1c1f2e-8d7a-5b8e-9a53-2c6f0b7d4e91")
+
+# Payload fields used in search filters
+INDEXED_PAYLOAD_FIELDS = {
+    "metadata.category": PayloadSchemaType.KEYWORD,
+    "metadata.topic": PayloadSchemaType.KEYWORD,
+    "metadata.source": PayloadSchemaType.KEYWORD,
+}
+
 
 class QdrantManager:
-    def __init__(self):
-        self.client = QdrantClient(
+    def __init__(
+        self,
+        client: Optional[QdrantClient] = None,
+        encoder=None,
+        collection_name: Optional[str] = None,
+    ):
+        # REST calls go through the shared pooled transport; the client's
+        # own timeout is the read timeout, the transport applies connect
+        self.client = client or QdrantClient(
             url=config.QDRANT_URL,
             api_key=config.QDRANT_API_KEY,
+            timeout=int(http_transport.timeout("qdrant").read),
+            transport=http_transport.transport("qdrant"),
         )
 
         # Use sentence-transformers for embeddings (free, local)
-        self.encoder = SentenceTransformer("all-MiniLM-L6-v2")  # 384 dimensions
-        self.collection_name = config.QDRANT_COLLECTION
+        self.encoder = encoder or load_encoder()  # 384 dimensions
+        self.collection_name = collection_name or config.QDRANT_COLLECTION
+
+        # Only send search params when tuned, the server defaults are fine otherwise
+        self._search_params = None
+        if config.QDRANT_HNSW_EF or config.QDRANT_QUANTIZATION:
+            self._search_params = SearchParams(
+                hnsw_ef=config.QDRANT_HNSW_EF,
+                quantization=(
+                    QuantizationSearchParams(
+                        rescore=True, oversampling=config.QDRANT_OVERSAMPLING
+                    )
+                    if config.QDRANT_QUANTIZATION
+                    else None
+                ),
+            )
 
         logger.info("Qdrant client initialized")
 
@@ -32,88 +86,257 @@ class QdrantManager:
             if self.collection_name not in collection_names:
                 logger.info(f"Creating collection: {self.collection_name}")
 
+                quantization = None
+                if config.QDRANT_QUANTIZATION:
+                    # int8 vectors kept in RAM; originals stay on disk for rescoring
+                    quantization = ScalarQuantization(
+                        scalar=ScalarQuantizationConfig(
+                            type=ScalarType.INT8, quantile=0.99, always_ram=True
+                        )
+                    )
+
                 self.client.create_collection(
                     collection_name=self.collection_name,
                     vectors_config=VectorParams(
-                        size=384,  # Dimension of all-MiniLM-L6-v2
+                        size=EMBEDDING_DIM,
                         distance=Distance.COSINE,
+                        on_disk=config.QDRANT_QUANTIZATION,
+                    ),
+                    hnsw_config=HnswConfigDiff(
+                        m=config.QDRANT_HNSW_M,
+                        ef_construct=config.QDRANT_HNSW_EF_CONSTRUCT,
                     ),
+                    quantization_config=quantization,
                 )
                 logger.success(f"Collection created: {self.collection_name}")
             else:
                 logger.info(f"Collection exists: {self.collection_name}")
 
+            # Idempotent, so existing collections pick up new indexes too
+            for field_name, schema in INDEXED_PAYLOAD_FIELDS.items():
+                self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=schema,
+                )
+
         except Exception as e:
             logger.error(f"Error ensuring collection: {str(e)}")
             raise
 
-    def add_documents(self, documents: List[dict]):
+    @staticmethod
+    def content_hash(doc: dict) -> str:
+        """Stable hash of a document's content and metadata"""
+        canonical = json.dumps(
+            {"content": doc["content"], "metadata": doc.get("metadata", {})},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def point_id(content_hash: str) -> str:
+        """Deterministic Qdrant point ID for a content hash"""
+        return str(uuid.uuid5(POINT_ID_NAMESPACE, content_hash))
+
+    def add_documents(
+        self, documents: Iterable[dict], batch_size: Optional[int] = None
+    ) -> List[str]:
         """
         Add documents to vector database
 
+        Point IDs are derived from the content hash, so re-adding the same
+        document overwrites its point instead of duplicating it. Documents
+        are embedded and upserted in batches to keep memory bounded.
+
         Args:
-            documents: List of dicts with 'content' and optional 'metadata'
+            documents: Iterable of dicts with 'content' and optional 'metadata'
+            batch_size: Documents per embed/upsert round trip
+
+        Returns:
+            List of point IDs written
         """
         try:
-            points = []
-
-            for doc in documents:
-                # Generate embedding
-                vector = self.encoder.encode(doc["content"]).tolist()
-
-                # Create point
-                point = PointStruct(
-                    id=str(uuid.uuid4()),
-                    vector=vector,
-                    payload={
-                        "content": doc["content"],
-                        "metadata": doc.get("metadata", {}),
-                    },
+            batch_size = batch_size or config.QDRANT_UPSERT_BATCH_SIZE
+            doc_iter = iter(documents)
+            point_ids = []
+
+            while True:
+                batch = list(islice(doc_iter, batch_size))
+                if not batch:
+                    break
+
+                # Generate embeddings for the whole batch in one call
+                vectors = self.encoder.encode(
+                    [doc["content"] for doc in batch], batch_size=batch_size
                 )
-                points.append(point)
 
-            # Upsert to Qdrant
-            self.client.upsert(collection_name=self.collection_name, points=points)
+                point_ids.extend(self.upsert_embedded(batch, vectors))
 
-            logger.success(f"Added {len(points)} documents to Qdrant")
+            logger.success(f"Added {len(point_ids)} documents to Qdrant")
+
+            return point_ids
 
         except Exception as e:
             logger.error(f"Error adding documents: {str(e)}")
             raise
 
-    def search(self, query: str, top_k: int = 3) -> List[dict]:
+    def upsert_embedded(self, documents: List[dict], vectors) -> List[str]:
+        """
+        Upsert documents whose embeddings were computed elsewhere
+
+        Args:
+            documents: Dicts with 'content', optional 'metadata' and 'content_hash'
+            vectors: One embedding per document, in the same order
+
+        Returns:
+            List of point IDs written
+        """
+        hashes = [
+            doc.get("content_hash") or self.content_hash(doc) for doc in documents
+        ]
+        ids = [self.point_id(content_hash) for content_hash in hashes]
+        # Upsert replaces the payload; carry over digests of unchanged content
+        digests = {
+            str(point.id): point.payload["digest"]
+            for point in self.client.retrieve(
+                collection_name=self.collection_name,
+                ids=ids,
+                with_payload=["digest"],
+                with_vectors=False,
+            )
+            if (point.payload or {}).get("digest")
+        }
+
+        points = []
+        for doc, vector, point_id, content_hash in zip(documents, vectors, ids, hashes):
+            payload = {"content": doc["content"], "metadata": doc.get("metadata", {})}
+            digest = digests.get(point_id)
+            if digest and digest.get("content_hash") == content_hash:
+                payload["digest"] = digest
+            points.append(
+                PointStruct(
+                    id=point_id,
+                    vector=(
+                        vector.tolist() if hasattr(vector, "tolist") else list(vector)
+                    ),
+                    payload=payload,
+                )
+            )
+
+        self.client.upsert(collection_name=self.collection_name, points=points)
+        return [point.id for point in points]
+
+    def delete_points(self, point_ids: List[str], batch_size: Optional[int] = None):
+        """Delete points by ID in batches"""
+        try:
+            batch_size = batch_size or config.QDRANT_UPSERT_BATCH_SIZE
+            for start in range(0, len(point_ids), batch_size):
+                self.client.delete(
+                    collection_name=self.collection_name,
+                    points_selector=PointIdsList(
+                        points=point_ids[start : start + batch_size]
+                    ),
+                )
+
+            logger.info(f"Deleted {len(point_ids)} points from Qdrant")
+
+        except Exception as e:
+            logger.error(f"Error deleting points: {str(e)}")
+            raise
+
+    def iter_points(self, batch_size: Optional[int] = None) -> Iterator[list]:
+        """Every point's ID and payload (no vectors), one scroll page at a time"""
+        batch_size = batch_size or config.QDRANT_UPSERT_BATCH_SIZE
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            if points:
+                yield points
+            if offset is None:
+                break
+
+    def set_digests(self, digests: Dict[str, dict]):
+        """Store digests in their points' payloads, in one request"""
+        if not digests:
+            return
+        self.client.batch_update_points(
+            collection_name=self.collection_name,
+            update_operations=[
+                SetPayloadOperation(
+                    set_payload=SetPayload(payload={"digest": digest}, points=[pid])
+                )
+                for pid, digest in digests.items()
+            ],
+        )
+
+    def embed(self, text: str) -> List[float]:
+        """Embed a single text through the process-wide embedding cache"""
+        return embedding_cache.get_or_compute(text, self.encoder).tolist()
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        top_k: int = 3,
+        categories: Optional[List[str]] = None,
+        query_vector: Optional[List[float]] = None,
+    ) -> List[dict]:
         """
         Search for similar documents
 
         Args:
-            query: Search query
+            query: Search query, embedded unless `query_vector` is given
             top_k: Number of results to return
+            categories: Only return documents whose metadata.category is one of these
+            query_vector: Precomputed query embedding
 
         Returns:
             List of matching documents with scores
         """
         try:
             # Generate query embedding
-            query_vector = self.encoder.encode(query).tolist()
+            if query_vector is None:
+                query_vector = self.embed(query)
+
+            query_filter = None
+            if categories:
+                query_filter = Filter(
+                    must=[
+                        FieldCondition(
+                            key="metadata.category", match=MatchAny(any=categories)
+                        )
+                    ]
+                )
 
             # Search
-            results = self.client.search(
+            results = self.client.query_points(
                 collection_name=self.collection_name,
-                query_vector=query_vector,
+                query=query_vector,
+                query_filter=query_filter,
+                search_params=self._search_params,
                 limit=top_k,
-            )
+            ).points
 
             # Format results
             formatted_results = [
                 {
+                    "id": str(hit.id),
                     "content": hit.payload["content"],
                     "metadata": hit.payload.get("metadata", {}),
+                    # Compact form for the resolution prompt, when digested
+                    "digest": (hit.payload.get("digest") or {}).get("text"),
                     "score": hit.score,
                 }
                 for hit in results
             ]
 
-            logger.info(f"Found {len(formatted_results)} results for query")
+            hot_logger.info("Found {} results for query", len(formatted_results))
 
             return formatted_results
 
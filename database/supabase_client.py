@@ -1,13 +1,19 @@
-from supabase import create_client, Client
+from supabase import ClientOptions, create_client, Client
+from graph.state import TicketResult
 from utils.config import config
-from utils.logger import logger
+from utils.http_transport import http_transport
+from utils.logger import hot_logger, logger
 from datetime import datetime
 from typing import Dict, List
 
 
 class SupabaseManager:
     def __init__(self):
-        self.client: Client = create_client(config.SUPABASE_URL, config.SUPABASE_KEY)
+        self.client: Client = create_client(
+            config.SUPABASE_URL,
+            config.SUPABASE_KEY,
+            options=ClientOptions(httpx_client=http_transport.client("supabase")),
+        )
         logger.info("Supabase client initialized")
         self._ensure_tables()
 
@@ -25,41 +31,81 @@ class SupabaseManager:
             escalated BOOLEAN,
             escalation_reason TEXT,
             response_time FLOAT,
+            total_tokens INTEGER,
+            token_usage JSONB,
             created_at TIMESTAMP DEFAULT NOW(),
             updated_at TIMESTAMP DEFAULT NOW()
         );
 
         CREATE INDEX IF NOT EXISTS idx_tickets_category ON tickets(category);
         CREATE INDEX IF NOT EXISTS idx_tickets_escalated ON tickets(escalated);
+
+        CREATE TABLE IF NOT EXISTS ticket_messages (
+            id BIGSERIAL PRIMARY KEY,
+            ticket_id TEXT NOT NULL REFERENCES tickets(id),
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT NOW()
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_ticket_messages_ticket
+            ON ticket_messages(ticket_id, id);
+
+        -- Existing deployments:
+        ALTER TABLE tickets ADD COLUMN IF NOT EXISTS total_tokens INTEGER;
+        ALTER TABLE tickets ADD COLUMN IF NOT EXISTS token_usage JSONB;
         """
         logger.info("Ensure tables exist in Supabase")
 
-    def save_ticket(self, ticket_data: Dict) -> Dict:
+    def save_ticket(self, ticket: TicketResult) -> Dict:
         """Save ticket to database"""
         try:
             data = {
-                "id": ticket_data["ticket_id"],
-                "content": ticket_data["ticket_content"],
-                "category": ticket_data.get("category"),
-                "priority": ticket_data.get("priority"),
-                "response": ticket_data.get("response"),
-                "confidence": ticket_data.get("confidence"),
-                "escalated": ticket_data.get("escalate", False),
-                "escalation_reason": ticket_data.get("escalation_reason"),
-                "response_time": ticket_data.get("response_time"),
-                "created_at": datetime.now().isoformat(),
+                "id": ticket.ticket_id,
+                "content": ticket.ticket_content,
+                "category": ticket.category,
+                "priority": ticket.priority,
+                "response": ticket.response,
+                "confidence": ticket.confidence,
+                "escalated": ticket.escalate,
+                "escalation_reason": ticket.escalation_reason,
+                "response_time": ticket.response_time,
+                "total_tokens": ticket.total_tokens,
+                "token_usage": ticket.token_usage,
                 "updated_at": datetime.now().isoformat(),
             }
 
-            result = self.client.table("tickets").insert(data).execute()
+            # Upsert so a resumed or resubmitted ticket doesn't hit the primary
+            # key; created_at is left to the column default on first insert
+            # so later saves (resumes, follow-ups) keep the original time
+            result = self.client.table("tickets").upsert(data).execute()
 
-            logger.success(f"Saved ticket {ticket_data['ticket_id']} to database")
+            hot_logger.success("Saved ticket {} to database", ticket.ticket_id)
             return result.data[0] if result.data else {}
 
         except Exception as e:
             logger.error(f"Error saving ticket: {str(e)}")
             raise
 
+    def save_messages(self, ticket_id: str, messages: List[Dict]) -> List[Dict]:
+        """Append conversation messages ({"role", "content"}) to a ticket"""
+        try:
+            rows = [
+                {
+                    "ticket_id": ticket_id,
+                    "role": m["role"],
+                    "content": m["content"],
+                    "created_at": datetime.now().isoformat(),
+                }
+                for m in messages
+            ]
+            result = self.client.table("ticket_messages").insert(rows).execute()
+            return result.data
+
+        except Exception as e:
+            logger.error(f"Error saving messages: {str(e)}")
+            raise
+
     def get_ticket(self, ticket_id: str) -> Dict:
         """Get ticket by ID"""
         try:
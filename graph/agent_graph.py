@@ -1,21 +1,77 @@
 from langgraph.graph import StateGraph, END
-from graph.state import AgentState
+from langgraph.types import RetryPolicy
+from graph.state import AgentState, apply_update
+from graph.checkpointing import TicketCheckpointStore
 from agents.triage_agent import TriageAgent
+from agents.triage_batcher import TriageBatcher
 from agents.knowledge_agent import KnowledgeAgent
 from agents.resolution_agent import ResolutionAgent
 from agents.escalation_agent import EscalationAgent
 from agents.analytics_agent import AnalyticsAgent
-from utils.logger import logger
+from agents.rerank_agent import RerankAgent
+from agents.direct_answer_agent import DirectAnswerAgent
+from agents.incident_agent import IncidentAgent
+from utils.cassette import record_event
+from utils.config import config
+from utils.logger import hot_logger, logger, ticket_context
+from utils.preprocess import clean_ticket
+from utils.profiler import profile_stage
+from utils.conversation import summarize_history, topic_drift
+from utils.prompts import (
+    DEGRADED_ANSWER_TEMPLATE,
+    DEGRADED_ESCALATION_MESSAGE,
+    FOLLOWUP_TICKET_TEMPLATE,
+)
+from utils.tokens import TokenBudget, add_usage, fit_documents, total_usage
+from typing import Optional
+import threading
 import time
+import zlib
+
+
+class TicketConflictError(Exception):
+    """A ticket_id was reused with different content"""
+
+
+class TicketNotFoundError(Exception):
+    """No completed ticket to add a message to"""
 
 
 class MultiAgentWorkflow:
-    def __init__(self):
-        self.triage_agent = TriageAgent()
-        self.knowledge_agent = KnowledgeAgent()
-        self.resolution_agent = ResolutionAgent()
-        self.escalation_agent = EscalationAgent()
-        self.analytics_agent = AnalyticsAgent()
+    def __init__(
+        self,
+        triage_agent: Optional[TriageAgent] = None,
+        knowledge_agent: Optional[KnowledgeAgent] = None,
+        resolution_agent: Optional[ResolutionAgent] = None,
+        escalation_agent: Optional[EscalationAgent] = None,
+        analytics_agent: Optional[AnalyticsAgent] = None,
+        checkpoints: Optional[TicketCheckpointStore] = None,
+        token_budget: Optional[TokenBudget] = None,
+    ):
+        self.triage_agent = triage_agent or TriageAgent()
+        self.knowledge_agent = knowledge_agent or KnowledgeAgent()
+        self.resolution_agent = resolution_agent or ResolutionAgent()
+        self.escalation_agent = escalation_agent or EscalationAgent()
+        self.analytics_agent = analytics_agent or AnalyticsAgent()
+        self.token_budget = token_budget or TokenBudget()
+        self.triage_batcher = (
+            TriageBatcher(self.triage_agent) if config.TRIAGE_BATCH_ENABLED else None
+        )
+        self.rerank_agent = RerankAgent() if config.RERANK_ENABLED else None
+        self.direct_answer_agent = (
+            DirectAnswerAgent(resolution_agent=self.resolution_agent)
+            if config.DIRECT_ANSWER_ENABLED
+            else None
+        )
+        self.incident_agent = IncidentAgent() if config.INCIDENT_ENABLED else None
+
+        # Completed nodes are persisted per ticket so retries resume, not restart
+        self.checkpoints = checkpoints
+        if self.checkpoints is None and config.CHECKPOINT_ENABLED:
+            self.checkpoints = TicketCheckpointStore()
+
+        # Follow-ups to one ticket are applied one at a time
+        self._thread_locks = [threading.Lock() for _ in range(64)]
 
         self.graph = self._build_graph()
         logger.info("✅ Multi-agent workflow with all 5 agents initialized")
@@ -24,107 +80,578 @@ class MultiAgentWorkflow:
         """Build complete 5-agent LangGraph workflow"""
         workflow = StateGraph(AgentState)
 
+        # Nodes that call Groq or Qdrant retry transient failures in place
+        retry = RetryPolicy(
+            max_attempts=config.NODE_RETRY_ATTEMPTS,
+            initial_interval=config.NODE_RETRY_INITIAL_INTERVAL,
+        )
+
         # Add all nodes
-        workflow.add_node("triage", self.triage_node)
-        workflow.add_node("knowledge", self.knowledge_node)
-        workflow.add_node("resolution", self.resolution_node)
-        workflow.add_node("escalation", self.escalation_node)
-        workflow.add_node("analytics", self.analytics_node)
+        nodes = [
+            ("embedding", self.embedding_node, None),
+            ("triage", self.triage_node, retry),
+            ("knowledge", self.knowledge_node, retry),
+            ("resolution", self.resolution_node, retry),
+            ("escalation", self.escalation_node, retry),
+            ("analytics", self.analytics_node, None),
+        ]
+        if config.PREPROCESS_ENABLED:
+            nodes.append(("preprocess", self.preprocess_node, None))
+        if self.rerank_agent:
+            nodes.append(("rerank", self.rerank_node, None))
+        if self.direct_answer_agent:
+            nodes.append(("direct_answer", self.direct_answer_node, None))
+        if self.incident_agent:
+            nodes.append(("incident", self.incident_node, None))
+
+        for name, node, retry_policy in nodes:
+            workflow.add_node(name, self._staged(name, node), retry_policy=retry_policy)
 
         # Define flow
-        workflow.set_entry_point("triage")
+        if config.PREPROCESS_ENABLED:
+            workflow.set_entry_point("preprocess")
+            workflow.add_edge("preprocess", "embedding")
+        else:
+            workflow.set_entry_point("embedding")
+        if self.incident_agent:
+            # Members of a confirmed incident reuse its resolution
+            workflow.add_edge("embedding", "incident")
+            workflow.add_conditional_edges(
+                "incident",
+                self.route_incident,
+                {"triage": "triage", "analytics": "analytics"},
+            )
+        else:
+            workflow.add_edge("embedding", "triage")
         workflow.add_edge("triage", "knowledge")
-        workflow.add_edge("knowledge", "resolution")
+        retrieval = "knowledge"
+        if self.rerank_agent:
+            workflow.add_edge("knowledge", "rerank")
+            retrieval = "rerank"
+        if self.direct_answer_agent:
+            # FAQ matches skip the resolution LLM but still go through escalation
+            workflow.add_conditional_edges(
+                retrieval,
+                self.route_answer,
+                {"direct_answer": "direct_answer", "resolution": "resolution"},
+            )
+            workflow.add_edge("direct_answer", "escalation")
+        else:
+            workflow.add_edge(retrieval, "resolution")
         workflow.add_edge("resolution", "escalation")
         workflow.add_edge("escalation", "analytics")
         workflow.add_edge("analytics", END)
 
-        return workflow.compile()
+        checkpointer = self.checkpoints.saver if self.checkpoints else None
+        return workflow.compile(checkpointer=checkpointer)
+
+    @staticmethod
+    def _staged(stage: str, node):
+        """Bind the stage name to log records; time the node for cassettes and profiles"""
+
+        def run(state: AgentState) -> AgentState:
+            start = time.perf_counter()
+            try:
+                with logger.contextualize(stage=stage), profile_stage(stage):
+                    return node(state)
+            finally:
+                elapsed_ms = round((time.perf_counter() - start) * 1000, 3)
+                record_event("stage", stage=stage, ms=elapsed_ms)
+
+        return run
+
+    def preprocess_node(self, state: AgentState) -> AgentState:
+        hot_logger.info("🧹 Preprocessing ticket")
+        text, info = clean_ticket(state["ticket_content"])
+        hot_logger.info(
+            "Ticket text {} -> {} tokens ({})",
+            info["original_tokens"],
+            info["tokens"],
+            ", ".join(info["removed"]) or "nothing removed",
+        )
+        return {"ticket_text": text, "preprocess": info}
+
+    def embedding_node(self, state: AgentState) -> AgentState:
+        hot_logger.info("🧬 Embedding ticket")
+        # Encoded once here; every later stage reads it from the state
+        vector = self.knowledge_agent.vector_db.embed(state["ticket_text"])
+        return {"ticket_embedding": vector}
+
+    def incident_node(self, state: AgentState) -> AgentState:
+        hot_logger.info("🚨 Incident check")
+        match = self.incident_agent.assign(
+            state["ticket_id"], state["ticket_embedding"]
+        )
+        shared = match.pop("shared")
+        match["reused"] = shared is not None
+        if shared is None:
+            return {"incident": match}
+
+        hot_logger.info("Reusing resolution of incident {}", match["incident_id"])
+        escalate = shared["escalate"]
+        reason = shared.get("escalation_reason")
+        # A rule about this ticket's own text still wins (no LLM here)
+        decision = self.escalation_agent.rules.decide(
+            state["ticket_text"],
+            category=shared.get("category"),
+            priority=shared.get("priority"),
+            confidence=shared.get("confidence"),
+        )
+        if decision is not None and decision["escalate"]:
+            escalate, reason = True, decision["reason"]
+        return {
+            "incident": match,
+            "category": shared.get("category"),
+            "priority": shared.get("priority"),
+            "response": shared["response"],
+            "confidence": shared.get("confidence"),
+            "escalate": escalate,
+            "escalation_reason": reason,
+        }
+
+    def route_incident(self, state: AgentState) -> str:
+        return "analytics" if state["incident"]["reused"] else "triage"
 
     def triage_node(self, state: AgentState) -> AgentState:
-        logger.info("🎯 Triage Agent")
-        result = self.triage_agent.analyze_ticket(state["ticket_content"])
+        hot_logger.info("🎯 Triage Agent")
+        if self.triage_batcher:
+            result = self.triage_batcher.analyze(
+                state["ticket_id"], state["ticket_text"]
+            )
+        else:
+            result = self.triage_agent.analyze_ticket(state["ticket_text"])
         return {
-            **state,
             "category": result["category"],
             "priority": result["priority"],
             "keywords": result["keywords"],
+            **self._accounted(result),
+        }
+
+    @staticmethod
+    def _accounted(result: dict) -> dict:
+        """State updates for an agent's model calls (added by the reducers)"""
+        calls = result.get("model_calls", [])
+        usage = add_usage({}, calls)
+        return {
+            "model_calls": calls,
+            "token_usage": usage,
+            "total_tokens": total_usage(usage),
         }
 
+    @staticmethod
+    def _budget_action(budget: Optional[dict], action: str) -> dict:
+        """Note an economy applied to stay within the ticket's token budget"""
+        return {"actions": (budget or {}).get("actions", []) + [action]}
+
     def knowledge_node(self, state: AgentState) -> AgentState:
-        logger.info("📚 Knowledge Agent")
-        results = self.knowledge_agent.retrieve_context(state["keywords"])
-        context = "\n\n".join(
-            [
-                f"[Doc {i + 1}, relevance: {r['score']:.2f}]\n{r['content']}"
-                for i, r in enumerate(results)
-            ]
+        hot_logger.info("📚 Knowledge Agent")
+        # Over-fetch when a re-rank stage will pick the best few
+        top_k = (
+            config.RERANK_CANDIDATES if self.rerank_agent else config.RETRIEVAL_TOP_K
+        )
+        query_vector = None
+        if config.RETRIEVAL_QUERY == "ticket":
+            query_vector = state["ticket_embedding"]
+        results = self.knowledge_agent.retrieve_context(
+            state["keywords"],
+            top_k=top_k,
+            category=state["category"],
+            query_vector=query_vector,
+        )
+        return {"retrieved_docs": results}
+
+    def rerank_node(self, state: AgentState) -> AgentState:
+        hot_logger.info("🔀 Rerank Agent")
+        candidates = state["retrieved_docs"]
+        results, info = self.rerank_agent.rerank(state["ticket_text"], candidates)
+
+        # Prompt-token reduction from passing only the kept documents on
+        info["context_tokens_before"] = RerankAgent.context_tokens(candidates)
+        info["context_tokens_after"] = RerankAgent.context_tokens(results)
+
+        return {"retrieved_docs": results, "rerank": info}
+
+    def route_answer(self, state: AgentState) -> str:
+        if self.direct_answer_agent.match(state["retrieved_docs"]):
+            return "direct_answer"
+        return "resolution"
+
+    def direct_answer_node(self, state: AgentState) -> AgentState:
+        hot_logger.info("⚡ Direct Answer")
+        doc = state["retrieved_docs"][0]
+        result = self.direct_answer_agent.answer(doc, state)
+        return {
+            "response": result["response"],
+            "confidence": result["confidence"],
+            "direct_answer": result["direct_answer"],
+        }
+
+    def _budgeted_context(self, state: AgentState):
+        """Context trimmed to the ticket's remaining token budget"""
+        used = state.get("total_tokens") or 0
+        base = self.resolution_agent.prompt_tokens(
+            state["ticket_text"], "", state["category"], state["priority"]
         )
-        return {**state, "retrieved_docs": results, "context": context}
+        available = self.token_budget.remaining(used) - self.token_budget.reserve - base
+
+        docs = self.resolution_agent.prompt_documents(state["retrieved_docs"] or [])
+        kept = fit_documents(docs, available)
+        if len(kept) == len(docs) and not (kept and kept[0].get("truncated")):
+            return docs, None
+        hot_logger.info("Token budget: kept {} of {} documents", len(kept), len(docs))
+        return kept, f"context_trimmed:{len(docs)}->{len(kept)}"
 
     def resolution_node(self, state: AgentState) -> AgentState:
-        logger.info("💡 Resolution Agent")
+        hot_logger.info("💡 Resolution Agent")
+        docs = self.resolution_agent.prompt_documents(state["retrieved_docs"] or [])
+        budget = state.get("token_budget")
+        tight = self.token_budget.tight(state.get("total_tokens") or 0)
+        if self.token_budget.enabled:
+            docs, trimmed = self._budgeted_context(state)
+            if trimmed:
+                budget = self._budget_action(budget, trimmed)
+            if tight:
+                budget = self._budget_action(budget, "budget_model")
+
+        start = time.perf_counter()
         result = self.resolution_agent.generate_response(
-            state["ticket_content"],
-            state["context"],
+            state["ticket_text"],
+            self.resolution_agent.format_context(docs),
             state["category"],
             state["priority"],
+            budget=tight,
+        )
+
+        # A curated answer just under the threshold: compare it for tuning
+        near_miss = (
+            self.direct_answer_agent.candidate(state["retrieved_docs"])
+            if self.direct_answer_agent
+            else None
         )
+        if near_miss is not None:
+            llm_ms = (time.perf_counter() - start) * 1000
+            self.direct_answer_agent.compare(
+                near_miss, state, result, llm_ms, "near_miss"
+            )
         return {
-            **state,
             "response": result["response"],
             "confidence": result["confidence"],
+            "token_budget": budget,
+            **self._accounted(result),
         }
 
     def escalation_node(self, state: AgentState) -> AgentState:
-        logger.info("⚠️  Escalation Agent")
+        hot_logger.info("⚠️  Escalation Agent")
+        budget = state.get("token_budget")
+        tight = self.token_budget.tight(state.get("total_tokens") or 0)
         result = self.escalation_agent.should_escalate(
-            state["ticket_content"], state["category"], state["confidence"]
+            state["ticket_text"],
+            state["category"],
+            state["confidence"],
+            priority=state["priority"],
+            use_llm=not tight,
         )
+        if tight and not result.get("rule"):
+            budget = self._budget_action(budget, "escalation_llm_skipped")
         return {
-            **state,
             "escalate": result["escalate"],
             "escalation_reason": result["reason"],
+            "token_budget": budget,
+            **self._accounted(result),
         }
 
     def analytics_node(self, state: AgentState) -> AgentState:
-        logger.info("📊 Analytics Agent")
-        metrics = self.analytics_agent.track_ticket(state)
-        return {**state, **metrics}
+        hot_logger.info("📊 Analytics Agent")
+        # Tracking only; the metrics it extracts are all in the state already
+        self.analytics_agent.track_ticket(state)
+        incident = state.get("incident")
+        if incident and not incident["reused"]:
+            # A full-pipeline answer is offered for the operator to review
+            self.incident_agent.record(incident["incident_id"], state)
+        return {}
 
     def process_ticket(self, ticket_id: str, ticket_content: str) -> dict:
+        with ticket_context(ticket_id):
+            return self._process_ticket(ticket_id, ticket_content)
+
+    def _process_ticket(self, ticket_id: str, ticket_content: str) -> dict:
         start_time = time.time()
 
-        logger.info(f"\n{'=' * 70}")
-        logger.info(f"🎫 Processing Ticket: {ticket_id}")
-        logger.info(f"{'=' * 70}\n")
+        hot_logger.info("🎫 Processing ticket")
 
         initial_state = {
             "ticket_id": ticket_id,
             "ticket_content": ticket_content,
+            # Replaced by the preprocess node when it is enabled
+            "ticket_text": ticket_content,
+            "preprocess": None,
+            "ticket_embedding": None,
             "category": None,
             "priority": None,
             "keywords": None,
             "retrieved_docs": None,
-            "context": None,
+            "rerank": None,
             "response": None,
             "confidence": None,
+            "direct_answer": None,
+            "incident": None,
             "escalate": None,
             "escalation_reason": None,
-            "total_tokens": None,
+            "model_calls": [],
+            "token_usage": {},
+            "token_budget": None,
+            "total_tokens": 0,
             "response_time": None,
             "current_agent": None,
             "messages": [],
         }
 
-        final_state = self.graph.invoke(initial_state)
+        run_config = None
+        graph_input = initial_state
+
+        if self.checkpoints:
+            run_config = self.checkpoints.thread_config(ticket_id)
+            snapshot = self.graph.get_state(run_config)
+
+            if snapshot.values:
+                if snapshot.values.get("ticket_content") != ticket_content:
+                    raise TicketConflictError(
+                        f"Ticket {ticket_id} already exists with different content"
+                    )
+
+                if snapshot.next:
+                    # Input None makes LangGraph continue from the last checkpoint
+                    logger.info("♻️  Resuming at {}", ", ".join(snapshot.next))
+                    graph_input = None
+                else:
+                    logger.info("♻️  Already processed, returning stored result")
+                    final_state = dict(snapshot.values)
+                    final_state["response_time"] = time.time() - start_time
+                    final_state.pop("ticket_embedding", None)
+                    return final_state
+
+            self.checkpoints.touch(ticket_id)
+
+        final_state = self.graph.invoke(graph_input, run_config)
         final_state["response_time"] = time.time() - start_time
 
+        # The vector is internal to the pipeline, keep it out of results
+        final_state.pop("ticket_embedding", None)
+
         status = "🚨 ESCALATED" if final_state["escalate"] else "✅ AUTO-RESOLVED"
-        logger.success(f"\n{status} in {final_state['response_time']:.2f}s\n")
+        logger.success("{} in {:.2f}s", status, final_state["response_time"])
 
         return final_state
 
+    def process_followup(self, ticket_id: str, message: str) -> dict:
+        """
+        Answer a customer's follow-up on an already processed ticket
+
+        The stored triage result and retrieved documents are reused unless
+        the message drifts from the ticket's topic by more than
+        THREAD_TOPIC_DRIFT, in which case triage and retrieval run again on
+        the message. Resolution sees a bounded summary of the conversation
+        plus the new message; escalation rules see the new message. The
+        updated thread is written back to the ticket's checkpoint.
+
+        Returns:
+            The turn's result, with `turn` (drift, reuse, tokens and
+            latency of this turn vs the ticket's first full run) and
+            `new_messages` (the two transcript entries added)
+        """
+        lock = self._thread_locks[zlib.crc32(ticket_id.encode()) % 64]
+        with ticket_context(ticket_id), lock:
+            return self._process_followup(ticket_id, message)
+
+    def _process_followup(self, ticket_id: str, message: str) -> dict:
+        start_time = time.time()
+        hot_logger.info("💬 Follow-up message")
+
+        if not self.checkpoints:
+            raise TicketNotFoundError("Follow-ups need CHECKPOINT_ENABLED")
+        run_config = self.checkpoints.thread_config(ticket_id)
+        snapshot = self.graph.get_state(run_config)
+        if not snapshot.values or snapshot.next:
+            raise TicketNotFoundError(
+                f"Ticket {ticket_id} not found, expired or still processing"
+            )
+        stored = snapshot.values
+
+        text, preprocess = message, None
+        if config.PREPROCESS_ENABLED:
+            text, preprocess = clean_ticket(message)
+
+        # The transcript holds cleaned text; the originals go to the database
+        history = stored.get("messages") or [
+            {
+                "role": "customer",
+                "content": stored.get("ticket_text") or stored["ticket_content"],
+            },
+            {"role": "agent", "content": stored["response"]},
+        ]
+        vector = self.knowledge_agent.vector_db.embed(text)
+        drift = topic_drift(vector, stored.get("ticket_embedding"))
+        reuse = drift <= config.THREAD_TOPIC_DRIFT
+
+        state = {
+            **stored,
+            "ticket_text": text,
+            "preprocess": preprocess,
+            "ticket_embedding": vector,
+            "rerank": None,
+            "direct_answer": None,
+            "incident": None,
+            "model_calls": [],
+            "token_usage": {},
+            "total_tokens": 0,
+            "token_budget": None,
+        }
+        if not reuse:
+            hot_logger.info(
+                "Topic drift {:.2f}, re-running triage and retrieval", drift
+            )
+            stages = [("triage", self.triage_node), ("knowledge", self.knowledge_node)]
+            if self.rerank_agent:
+                stages.append(("rerank", self.rerank_node))
+            for stage, node in stages:
+                state = apply_update(state, self._staged(stage, node)(state))
+
+        summary = summarize_history(
+            history, config.THREAD_SUMMARY_TOKENS, config.THREAD_SUMMARY_MESSAGE_TOKENS
+        )
+        conversation = FOLLOWUP_TICKET_TEMPLATE.format(summary=summary, message=text)
+        update = self._staged("resolution", self.resolution_node)(
+            {**state, "ticket_text": conversation}
+        )
+        state = apply_update(state, update)
+        state = apply_update(
+            state, self._staged("escalation", self.escalation_node)(state)
+        )
+
+        new_messages = [
+            {"role": "customer", "content": message},
+            {"role": "agent", "content": state["response"]},
+        ]
+        messages = history + [{**new_messages[0], "content": text}, new_messages[1]]
+        if len(messages) > config.THREAD_MAX_MESSAGES:
+            messages = messages[:1] + messages[-(config.THREAD_MAX_MESSAGES - 1) :]
+
+        # Token counts are this turn's; the reducers add them to the ticket's
+        values = {
+            "category": state["category"],
+            "priority": state["priority"],
+            "keywords": state["keywords"],
+            "retrieved_docs": state["retrieved_docs"],
+            # A new topic becomes the reference for later drift checks
+            "ticket_embedding": stored.get("ticket_embedding") if reuse else vector,
+            "response": state["response"],
+            "confidence": state["confidence"],
+            "escalate": state["escalate"],
+            "escalation_reason": state["escalation_reason"],
+            "messages": messages,
+            "token_usage": state["token_usage"],
+            "total_tokens": state["total_tokens"],
+        }
+        self.graph.update_state(run_config, values, as_node="analytics")
+        self.checkpoints.touch(ticket_id)
+
+        resolution_input = sum(
+            call["input_tokens"]
+            for call in state["model_calls"]
+            if call["agent"] == "resolution"
+        )
+        response_time = time.time() - start_time
+        turn = {
+            "number": sum(m["role"] == "customer" for m in history) + 1,
+            "topic_drift": round(drift, 3),
+            "reused_triage": reuse,
+            "resolution_input_tokens": resolution_input,
+            "total_tokens": state["total_tokens"],
+            "response_time": response_time,
+            # The ticket's first turn ran the full pipeline
+            "full_run_tokens": total_usage(
+                add_usage({}, stored.get("model_calls") or [])
+            ),
+        }
+        hot_logger.success(
+            "Follow-up turn {} in {:.2f}s (reused triage: {})",
+            turn["number"],
+            response_time,
+            reuse,
+        )
+
+        usage = add_usage(stored.get("token_usage"), state["model_calls"])
+        result = {
+            **stored,
+            **values,
+            "token_usage": usage,
+            "total_tokens": total_usage(usage),
+            "model_calls": state["model_calls"],
+            "response_time": response_time,
+            "turn": turn,
+            "new_messages": new_messages,
+        }
+        result.pop("ticket_embedding", None)
+        return result
+
+    def process_degraded(
+        self, ticket_id: str, ticket_content: str, urgent: bool = False
+    ) -> dict:
+        """
+        Answer without any LLM call, used when the API sheds load
+
+        Returns the best-matching document when it scores at least
+        DEGRADED_MIN_SCORE and no escalation rule fires; otherwise an
+        acknowledgement and an immediate escalation. Nothing is checkpointed,
+        so resubmitting the ticket later runs the full pipeline.
+        """
+        with ticket_context(ticket_id):
+            start_time = time.time()
+            text = ticket_content
+            if config.PREPROCESS_ENABLED:
+                text, _ = clean_ticket(ticket_content)
+            vector = self.knowledge_agent.vector_db.embed(text)
+            docs = self.knowledge_agent.retrieve_context(
+                [], top_k=1, query_vector=vector
+            )
+            score = docs[0]["score"] if docs else 0.0
+
+            # Keyword and category rules only: the retrieval score is not a
+            # resolution confidence, and DEGRADED_MIN_SCORE gates it below
+            rule = self.escalation_agent.rules.decide(text)
+            if rule and rule["escalate"]:
+                escalate, reason = True, rule["reason"]
+            elif score < config.DEGRADED_MIN_SCORE:
+                escalate, reason = True, "Overloaded, no close documentation match"
+            else:
+                escalate, reason = False, "Overloaded, answered from documentation"
+
+            if escalate:
+                response = DEGRADED_ESCALATION_MESSAGE
+            else:
+                response = DEGRADED_ANSWER_TEMPLATE.format(content=docs[0]["content"])
+
+            result = {
+                "ticket_id": ticket_id,
+                "ticket_content": ticket_content,
+                "category": "general",
+                "priority": "urgent" if urgent else "medium",
+                "retrieved_docs": docs,
+                "response": response,
+                "confidence": score,
+                "escalate": escalate,
+                "escalation_reason": reason,
+                "model_calls": [],
+                "token_usage": {},
+                "total_tokens": 0,
+                "degraded": True,
+                "response_time": time.time() - start_time,
+            }
+            self.analytics_agent.track_ticket(result)
+
+            hot_logger.success("🪫 Degraded answer, escalate={}", escalate)
+            return result
+
 
 # Test complete workflow
 if __name__ == "__main__":
@@ -0,0 +1,92 @@
+from langgraph.checkpoint.sqlite import SqliteSaver
+from utils.config import config
+from utils.logger import logger
+from typing import Optional
+import os
+import sqlite3
+import threading
+import time
+
+
+class TicketCheckpointStore:
+    """
+    SQLite-backed LangGraph checkpointer keyed by ticket_id
+
+    Alongside LangGraph's own tables it keeps a small `ticket_threads`
+    table with the last time each ticket ran, which makes TTL cleanup a
+    single indexed query instead of deserializing every checkpoint.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: Optional[float] = None):
+        self.path = path or config.CHECKPOINT_DB_PATH
+        self.ttl_seconds = ttl_seconds or config.CHECKPOINT_TTL_SECONDS
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL keeps checkpoint writes from blocking concurrent readers
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS ticket_threads ("
+            "thread_id TEXT PRIMARY KEY, updated_at REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ticket_threads_updated "
+            "ON ticket_threads(updated_at)"
+        )
+        self.conn.commit()
+
+        self.saver = SqliteSaver(self.conn)
+        self._lock = threading.Lock()
+        self._last_cleanup = 0.0
+
+        logger.info(f"Checkpoint store initialized at {self.path}")
+
+    @staticmethod
+    def thread_config(ticket_id: str) -> dict:
+        return {"configurable": {"thread_id": ticket_id}}
+
+    def touch(self, ticket_id: str):
+        """Record activity for a ticket and run TTL cleanup when due"""
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO ticket_threads (thread_id, updated_at) VALUES (?, ?) "
+                "ON CONFLICT(thread_id) DO UPDATE SET updated_at = excluded.updated_at",
+                (ticket_id, now),
+            )
+            self.conn.commit()
+
+        if now - self._last_cleanup >= config.CHECKPOINT_CLEANUP_INTERVAL_SECONDS:
+            self.cleanup_expired()
+
+    def cleanup_expired(self) -> int:
+        """Delete checkpoints of tickets idle for longer than the TTL"""
+        self._last_cleanup = time.time()
+        cutoff = self._last_cleanup - self.ttl_seconds
+
+        with self._lock:
+            expired = [
+                row[0]
+                for row in self.conn.execute(
+                    "SELECT thread_id FROM ticket_threads WHERE updated_at < ?",
+                    (cutoff,),
+                )
+            ]
+
+        for thread_id in expired:
+            self.saver.delete_thread(thread_id)
+
+        if expired:
+            with self._lock:
+                self.conn.executemany(
+                    "DELETE FROM ticket_threads WHERE thread_id = ?",
+                    [(thread_id,) for thread_id in expired],
+                )
+                self.conn.commit()
+            logger.info(f"Cleaned up checkpoints for {len(expired)} expired tickets")
+
+        return len(expired)
@@ -1,35 +1,179 @@
-from typing import TypedDict, List, Optional
+from typing import Annotated, Dict, TypedDict, List, Optional, get_type_hints
 from pydantic import BaseModel
+from utils.tokens import merge_usage
+import operator
 
 
 class AgentState(TypedDict):
-    """Shared state passed between agents"""
+    """
+    Shared state passed between agents
+
+    Nodes return only the keys they change. Annotated keys are combined
+    with what is already there by their reducer (LangGraph applies them;
+    `apply_update` does the same for nodes run outside the graph), so a
+    node reports just its own model calls and tokens.
+    """
 
     # Input
     ticket_id: str
     ticket_content: str
+    # ticket_content without quoted replies, signatures, footers and HTML;
+    # what the agents read (the original is what gets stored)
+    ticket_text: Optional[str]
+    # Preprocessing report: token counts, what was removed, time taken
+    preprocess: Optional[dict]
+
+    # Embedding of ticket_text, computed once per ticket. Internal only:
+    # never returned by the API or logged.
+    ticket_embedding: Optional[List[float]]
+
+    # Incident the ticket was grouped into: {"incident_id", "status",
+    # "similarity", "reused"}; reused means its resolution was applied
+    # and triage through escalation were skipped
+    incident: Optional[dict]
 
     # Triage output
     category: Optional[str]
     priority: Optional[str]
     keywords: Optional[List[str]]
 
-    # Knowledge output
+    # Knowledge output: the documents, held once. The resolution prompt's
+    # context is built from them when needed, never stored.
     retrieved_docs: Optional[List[dict]]
-    context: Optional[str]
+    rerank: Optional[dict]
 
     # Resolution output
     response: Optional[str]
     confidence: Optional[float]
+    # Set when a curated FAQ answer was used instead of the resolution LLM
+    direct_answer: Optional[dict]
 
     # Escalation output
     escalate: Optional[bool]
     escalation_reason: Optional[str]
 
+    # One record per LLM call: agent, model, latency_ms, outcome, tokens
+    model_calls: Annotated[List[dict], operator.add]
+
+    # Token accounting: {stage: {"input", "output", "calls"}} and their sum
+    token_usage: Annotated[Dict[str, dict], merge_usage]
+    total_tokens: Annotated[int, operator.add]
+    # Economies applied when nearing TOKEN_BUDGET_PER_TICKET: {"actions": [...]}
+    token_budget: Optional[dict]
+
     # Analytics
-    total_tokens: Optional[int]
     response_time: Optional[float]
 
     # Status
     current_agent: Optional[str]
-    messages: Optional[List[str]]
+    # Conversation transcript, set once the ticket gets follow-ups:
+    # [{"role": "customer" | "agent", "content": str}, ...]
+    messages: Optional[List[dict]]
+
+
+REDUCERS = {
+    key: hint.__metadata__[0]
+    for key, hint in get_type_hints(AgentState, include_extras=True).items()
+    if hasattr(hint, "__metadata__")
+}
+
+
+def apply_update(state: dict, update: dict) -> dict:
+    """`state` after a node returned `update`, as the graph would merge it"""
+    merged = dict(state)
+    for key, value in update.items():
+        reducer = REDUCERS.get(key)
+        if reducer is not None and merged.get(key) is not None:
+            value = reducer(merged[key], value)
+        merged[key] = value
+    return merged
+
+
+class TicketResult:
+    """
+    What the API and database layers keep of a processed ticket
+
+    The final graph state also carries the ticket text variants, retrieved
+    documents, keywords and per-stage reports; none of that is needed once
+    the ticket is answered, so it is dropped here instead of being held
+    until the response is sent and the row is written.
+    """
+
+    __slots__ = (
+        "ticket_id",
+        "ticket_content",
+        "category",
+        "priority",
+        "response",
+        "confidence",
+        "escalate",
+        "escalation_reason",
+        "response_time",
+        "model_calls",
+        "token_usage",
+        "total_tokens",
+        "degraded",
+        "turn",
+        "incident_id",
+    )
+
+    def __init__(
+        self,
+        ticket_id: str,
+        ticket_content: str,
+        category: Optional[str],
+        priority: Optional[str],
+        response: Optional[str],
+        confidence: Optional[float],
+        escalate: bool,
+        escalation_reason: Optional[str],
+        response_time: Optional[float],
+        model_calls: List[dict],
+        token_usage: Dict[str, dict],
+        total_tokens: int,
+        degraded: bool = False,
+        turn: Optional[dict] = None,
+        incident_id: Optional[str] = None,
+    ):
+        self.ticket_id = ticket_id
+        self.ticket_content = ticket_content
+        self.category = category
+        self.priority = priority
+        self.response = response
+        self.confidence = confidence
+        self.escalate = escalate
+        self.escalation_reason = escalation_reason
+        self.response_time = response_time
+        self.model_calls = model_calls
+        self.token_usage = token_usage
+        self.total_tokens = total_tokens
+        self.degraded = degraded
+        self.turn = turn
+        self.incident_id = incident_id
+
+    @classmethod
+    def from_state(cls, state: dict) -> "TicketResult":
+        """From a final state of process_ticket, process_followup or process_degraded"""
+        incident = state.get("incident") or {}
+        return cls(
+            ticket_id=state["ticket_id"],
+            ticket_content=state["ticket_content"],
+            category=state.get("category"),
+            priority=state.get("priority"),
+            response=state.get("response"),
+            confidence=state.get("confidence"),
+            escalate=bool(state.get("escalate")),
+            escalation_reason=state.get("escalation_reason"),
+            response_time=state.get("response_time"),
+            model_calls=state.get("model_calls") or [],
+            token_usage=state.get("token_usage") or {},
+            total_tokens=state.get("total_tokens") or 0,
+            degraded=state.get("degraded", False),
+            turn=state.get("turn"),
+            # Only once the ticket's cluster has been detected as an incident
+            incident_id=(
+                incident.get("incident_id")
+                if incident.get("status", "forming") != "forming"
+                else None
+            ),
+        )
@@ -0,0 +1,62 @@
+from agents.analytics_agent import AnalyticsAgent, merge_totals
+from api.analytics_feed import AnalyticsFeed
+import asyncio
+import json
+
+
+def track(analytics: AnalyticsAgent, i: int, category: str = "technical"):
+    analytics.track_ticket(
+        {
+            "ticket_id": f"TICKET-{i}",
+            "category": category,
+            "priority": "low",
+            "response_time": 1.5,
+            "confidence": 0.9,
+            "escalate": i % 2 == 0,
+            "total_tokens": 100,
+        }
+    )
+
+
+def test_snapshot_plus_deltas_match_totals():
+    async def run():
+        analytics = AnalyticsAgent()
+        track(analytics, 0)
+        feed = AnalyticsFeed(analytics, interval_ms=60000)
+        subscriber = feed.add_subscriber()
+
+        track(analytics, 1)
+        track(analytics, 2, category="billing")
+        assert feed.flush() == 1
+        assert feed.flush() == 0  # Nothing new, nothing sent
+
+        snapshot = json.loads(subscriber.queue.get_nowait())
+        delta = json.loads(subscriber.queue.get_nowait())
+        assert snapshot["type"] == "snapshot" and snapshot["totals"]["tickets"] == 1
+        assert delta["type"] == "delta" and delta["seq"] == snapshot["seq"] + 1
+        assert delta["delta"]["tickets"] == 2
+        assert merge_totals(snapshot["totals"], delta["delta"]) == analytics.totals
+        feed._task.cancel()
+
+    asyncio.run(run())
+
+
+def test_slow_subscriber_is_dropped():
+    async def run():
+        analytics = AnalyticsAgent()
+        feed = AnalyticsFeed(analytics, interval_ms=60000, max_backlog=2)
+        slow, fast = feed.add_subscriber(), feed.add_subscriber()
+        fast.queue.get_nowait()
+
+        for i in range(3):
+            track(analytics, i)
+            feed.flush()
+            if not fast.dropped:
+                fast.queue.get_nowait()
+
+        assert slow.dropped and not fast.dropped
+        assert slow.queue.get_nowait() is None
+        assert feed.stats()["subscribers"] == 1
+        feed._task.cancel()
+
+    asyncio.run(run())
@@ -0,0 +1,39 @@
+from benchmarks.replay_cassettes import build_replay_workflow
+from benchmarks.stubs import StubLLM, build_stub_workflow
+from utils.cassette import (
+    CassetteRecorder,
+    enable_recording,
+    iter_cassettes,
+    replaying,
+    summarize,
+)
+from utils.config import config
+
+
+def test_record_then_replay_offline(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CHECKPOINT_ENABLED", False)
+    content = "How do I reset my password? I'm jane@example.com, call +1 415 555 0100"
+
+    workflow = build_stub_workflow(StubLLM(), checkpoints=None)
+    enable_recording(workflow)
+    with CassetteRecorder(str(tmp_path)).scope("TICKET-1", content):
+        recorded = workflow.process_ticket("TICKET-1", content)
+
+    (cassette,) = list(iter_cassettes(str(tmp_path)))
+    assert "jane@example.com" not in cassette.content
+    assert "<email>" in cassette.content and "<phone>" in cassette.content
+    kinds = {event["kind"] for event in cassette.events}
+    assert {"llm", "search", "embed", "stage"} <= kinds
+
+    # No stub LLM and no Qdrant: everything is answered from the cassette
+    replay = build_replay_workflow(latency_scale=0)
+    with replaying(cassette) as session:
+        replayed = replay.process_ticket(cassette.ticket_id, cassette.content)
+
+    assert session.misses == 0
+    assert replayed["response"] == recorded["response"]
+    assert replayed["category"] == recorded["category"]
+    assert (
+        summarize([session.recording])["llm_calls"]
+        == summarize([cassette])["llm_calls"]
+    )
@@ -0,0 +1,81 @@
+from qdrant_client import QdrantClient
+from agents.digest_agent import DigestAgent
+from agents.resolution_agent import ResolutionAgent
+from benchmarks.stubs import StubLLM
+from database.knowledge_digest import KnowledgeDigest
+from database.qdrant_manager import QdrantManager
+from utils.config import config
+from utils.embeddings import HashingEncoder
+
+LONG = (
+    "This guide explains how to export your data. Open Settings and choose "
+    "Data. Click Export and pick CSV. Our team is always happy to help you "
+    "get the most out of the product. Exports up to 50 MB finish in 2 "
+    "minutes. See https://docs.example.com/export for details."
+)
+
+
+def make_job(docs, min_tokens=0):
+    manager = QdrantManager(client=QdrantClient(":memory:"), encoder=HashingEncoder())
+    manager.add_documents(docs)
+    llm = StubLLM()
+    return (
+        manager,
+        llm,
+        KnowledgeDigest(manager, DigestAgent(llm=llm), min_tokens=min_tokens),
+    )
+
+
+def test_digests_are_stored_and_only_redone_when_stale():
+    manager, llm, job = make_job(
+        [{"content": LONG}, {"content": LONG.replace("CSV", "JSON")}]
+    )
+
+    first = job.run()
+    assert first["digested"] == 2 and llm.calls["digest"] == 2
+    assert first["digest_tokens"] < first["content_tokens"]
+
+    second = job.run()
+    assert second["digested"] == 0 and second["current"] == 2
+    assert llm.calls["digest"] == 2
+
+    job.VERSION = KnowledgeDigest.VERSION + 1
+    assert job.run()["digested"] == 2
+
+
+def test_re_adding_unchanged_documents_keeps_their_digests():
+    manager, llm, job = make_job([{"content": LONG}])
+    job.run()
+
+    manager.add_documents([{"content": LONG}, {"content": "SSO supports Google."}])
+
+    report = job.run()
+    assert report["current"] == 1 and llm.calls["digest"] == 2
+    hit = manager.search("export data", top_k=1)[0]
+    assert "https://docs.example.com/export" in hit["digest"]
+
+
+def test_short_chunks_are_not_digested():
+    _, llm, job = make_job([{"content": "SSO supports Google."}], min_tokens=20)
+    report = job.run()
+    assert report["short"] == 1 and report["digested"] == 0
+    assert llm.calls["digest"] == 0
+
+
+def test_search_returns_digest_and_prompt_keeps_top_hit_in_full():
+    manager, _, job = make_job([{"content": LONG}])
+    job.run()
+    hit = manager.search("export data", top_k=1)[0]
+    assert "https://docs.example.com/export" in hit["digest"]
+
+    docs = [{**hit, "id": "a"}, {**hit, "id": "b"}]
+    prompt_docs = ResolutionAgent.prompt_documents(docs)
+    assert prompt_docs[0]["content"] == LONG
+    assert prompt_docs[1]["content"] == hit["digest"]
+    assert "digest]" in ResolutionAgent.format_context(prompt_docs)
+
+
+def test_digests_can_be_turned_off(monkeypatch):
+    monkeypatch.setattr(config, "RETRIEVAL_USE_DIGESTS", False)
+    docs = [{"content": LONG, "digest": "Steps", "score": 0.5}] * 2
+    assert ResolutionAgent.prompt_documents(docs) == docs
@@ -0,0 +1,42 @@
+from benchmarks.bench_http_transport import start_server
+from utils.http_transport import HttpTransport
+
+
+def test_requests_reuse_the_prewarmed_connection():
+    server, url = start_server()
+    transport = HttpTransport(base_urls={"qdrant": url}, http2=False)
+    try:
+        assert transport.prewarm() == {"qdrant": True}
+        client = transport.client("qdrant")
+        for _ in range(5):
+            assert client.get(f"{url}/collections").status_code == 200
+
+        pool = transport.stats()["pools"]["qdrant"]
+        assert pool["requests"] == 6
+        assert pool["connections_opened"] == 1
+        assert pool["open"] == 1 and pool["active"] == 0
+        assert transport.client("qdrant") is client
+    finally:
+        transport.close()
+        server.shutdown()
+
+
+def test_per_backend_timeouts():
+    transport = HttpTransport(
+        base_urls={},
+        timeouts={"groq": {"connect": 2, "read": 45}, "default": {"read": 7}},
+    )
+    groq, other = transport.timeout("groq"), transport.timeout("supabase")
+    assert (groq.connect, groq.read) == (2, 45)
+    assert (other.connect, other.read) == (5.0, 7)
+    assert transport.client("groq").timeout.read == 45
+
+
+def test_unreachable_backend_does_not_fail_prewarm():
+    transport = HttpTransport(
+        base_urls={"supabase": "http://127.0.0.1:9"},
+        timeouts={"supabase": {"connect": 0.5, "read": 0.5}},
+        http2=False,
+    )
+    assert transport.prewarm() == {"supabase": False}
+    transport.close()
@@ -0,0 +1,92 @@
+from api.idempotency import IdempotencyConflictError, TicketDeduplicator
+import asyncio
+import pytest
+
+
+def counting_execute(calls: list, delay: float = 0.01):
+    async def execute():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return {"ticket_id": f"TICKET-{len(calls)}"}
+
+    return execute
+
+
+def test_concurrent_duplicates_share_one_execution():
+    async def run():
+        dedup = TicketDeduplicator(ttl_seconds=60, content_window_seconds=30)
+        calls = []
+        execute = counting_execute(calls)
+        results = await asyncio.gather(
+            dedup.run("Can't log in", execute),
+            dedup.run("  can't   LOG in ", execute),
+            dedup.run("Can't log in", execute),
+        )
+        later = await dedup.run("can't log in", execute)
+        return dedup, calls, results, later
+
+    dedup, calls, results, later = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert [shared for _, shared in results] == [False, True, True]
+    assert {r["ticket_id"] for r, _ in results} == {"TICKET-1"}
+    assert later == ({"ticket_id": "TICKET-1"}, True)
+    stats = dedup.stats()
+    assert (stats["executed"], stats["coalesced"], stats["replayed"]) == (1, 2, 1)
+
+
+def test_idempotency_key_conflict_and_failures_not_stored():
+    async def run():
+        dedup = TicketDeduplicator(ttl_seconds=60, content_window_seconds=0)
+        calls = []
+        await dedup.run("first", counting_execute(calls), idempotency_key="k1")
+        with pytest.raises(IdempotencyConflictError):
+            await dedup.run("second", counting_execute(calls), idempotency_key="k1")
+
+        # Without a key and with fingerprinting off, every submission runs
+        await dedup.run("same", counting_execute(calls))
+        await dedup.run("same", counting_execute(calls))
+
+        async def fail():
+            calls.append(1)
+            raise ConnectionError("down")
+
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await dedup.run("flaky", fail, idempotency_key="k2")
+        return calls
+
+    assert len(asyncio.run(run())) == 5
+
+
+def test_stored_results_expire_and_are_bounded():
+    async def run():
+        dedup = TicketDeduplicator(
+            ttl_seconds=60, content_window_seconds=0.05, max_entries=2
+        )
+        calls = []
+        for content in ("a", "b", "c"):
+            await dedup.run(content, counting_execute(calls, 0))
+        assert dedup.stats()["stored_content"] == 2
+
+        await asyncio.sleep(0.06)
+        _, shared = await dedup.run("c", counting_execute(calls, 0))
+        return shared, calls
+
+    shared, calls = asyncio.run(run())
+    assert not shared and len(calls) == 4
+
+
+def test_content_is_not_coalesced_by_default():
+    async def run():
+        dedup = TicketDeduplicator(ttl_seconds=60)
+        calls = []
+        execute = counting_execute(calls)
+        results = await asyncio.gather(
+            dedup.run("I can't log in", execute), dedup.run("I can't log in", execute)
+        )
+        return calls, results
+
+    calls, results = asyncio.run(run())
+    assert len(calls) == 2
+    assert [shared for _, shared in results] == [False, False]
@@ -0,0 +1,43 @@
+from qdrant_client import QdrantClient
+from database.qdrant_manager import QdrantManager
+from database.ingestion_pipeline import IngestionPipeline, chunk_text
+from utils.embeddings import HashingEncoder
+
+
+def test_chunks_are_bounded_and_overlap():
+    text = " ".join(f"w{i}" for i in range(25))
+    chunks = list(chunk_text(text, max_tokens=10, overlap=3))
+
+    assert all(len(c.split()) <= 10 for c in chunks)
+    assert chunks[0].split()[-3:] == chunks[1].split()[:3]
+    assert chunks[-1].endswith("w24")
+
+
+def test_directory_ingestion(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "billing").mkdir(parents=True)
+    (docs / "billing" / "refunds.md").write_text("# Refunds\n\nRefunds take 5 days.")
+    (docs / "faq.html").write_text(
+        "<html><head><title>FAQ</title><style>p{}</style></head>"
+        "<body><p>Reset your password from the login page.</p></body></html>"
+    )
+
+    manager = QdrantManager(client=QdrantClient(":memory:"), encoder=HashingEncoder())
+    pipeline = IngestionPipeline(
+        manager,
+        workers=0,
+        encoder_factory=HashingEncoder,
+        manifest_path=str(tmp_path / "manifest.json"),
+    )
+
+    report = pipeline.run(str(docs))
+    assert report["documents"] == 2
+    assert report["embedded"] == 2
+
+    points, _ = manager.client.scroll(manager.collection_name, limit=10)
+    metadata = {p.payload["metadata"]["source"]: p.payload for p in points}
+    assert metadata["billing/refunds.md"]["metadata"]["category"] == "billing"
+    assert metadata["faq.html"]["metadata"]["title"] == "FAQ"
+    assert "p{}" not in metadata["faq.html"]["content"]
+
+    assert pipeline.run(str(docs))["skipped"] == 2
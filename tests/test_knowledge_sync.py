@@ -0,0 +1,63 @@
+from qdrant_client import QdrantClient
+from database.qdrant_manager import QdrantManager
+from database.knowledge_sync import KnowledgeSync
+from utils.embeddings import HashingEncoder
+
+
+def make_sync(tmp_path):
+    manager = QdrantManager(client=QdrantClient(":memory:"), encoder=HashingEncoder())
+    return manager, KnowledgeSync(
+        manager, manifest_path=str(tmp_path / "manifest.json"), batch_size=2
+    )
+
+
+def count_points(manager):
+    return manager.client.count(manager.collection_name).count
+
+
+def test_resync_is_incremental(tmp_path):
+    manager, sync = make_sync(tmp_path)
+    docs = [
+        {"id": f"doc-{i}", "content": f"Article number {i} about passwords"}
+        for i in range(5)
+    ]
+
+    first = sync.sync(docs)
+    assert first["embedded"] == 5
+    assert count_points(manager) == 5
+
+    second = sync.sync(docs)
+    assert second["embedded"] == 0
+    assert second["skipped"] == 5
+    assert count_points(manager) == 5
+
+
+def test_changed_and_removed_documents(tmp_path):
+    manager, sync = make_sync(tmp_path)
+    sync.sync(
+        [
+            {"id": "a", "content": "Reset your password from the login page"},
+            {"id": "b", "content": "Refunds take five business days"},
+            {"id": "c", "content": "SSO supports Google and GitHub"},
+        ]
+    )
+
+    report = sync.sync(
+        [
+            {"id": "a", "content": "Reset your password from the settings page"},
+            {"id": "b", "content": "Refunds take five business days"},
+        ]
+    )
+
+    assert report == {**report, "embedded": 1, "skipped": 1, "deleted": 2}
+    assert count_points(manager) == 2
+
+
+def test_manifest_survives_restart(tmp_path):
+    docs = [{"id": "a", "content": "Invoices are emailed monthly"}]
+    _, sync = make_sync(tmp_path)
+    sync.sync(docs)
+
+    # A fresh process reads the manifest written by the previous run
+    _, restarted = make_sync(tmp_path)
+    assert restarted.sync(docs, prune=False)["skipped"] == 1
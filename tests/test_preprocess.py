@@ -0,0 +1,98 @@
+from benchmarks.stubs import StubLLM, build_stub_workflow
+from graph.checkpointing import TicketCheckpointStore
+from utils.preprocess import clean_ticket
+from utils.tokens import estimate_tokens
+
+EMAIL = """Hi support,
+
+I was charged twice for my March invoice and need a refund for the duplicate.
+
+Thanks,
+Dana Whitfield
+Operations Lead | Acme Corp
++1 555 0100
+
+This email and any attachments are confidential and intended solely for the
+addressee. If you received this message in error, please delete it.
+
+On Mon, Mar 3, 2025 at 9:12 AM Billing <billing@example.com> wrote:
+> Your invoice for March is attached.
+> Let us know if you have any questions.
+"""
+
+HTML_EMAIL = (
+    "<html><head><style>p {color: red}</style></head><body>"
+    "<p>The mobile app crashes&nbsp;when I open settings.</p>"
+    "<p>Sent from my iPhone</p><blockquote>earlier thread</blockquote>"
+    "</body></html>"
+)
+
+
+def test_email_noise_is_removed():
+    text, info = clean_ticket(EMAIL)
+
+    assert text == (
+        "Hi support,\n\n"
+        "I was charged twice for my March invoice and need a refund for the duplicate."
+    )
+    assert info["removed"] == ["quoted", "signature"]
+    assert info["tokens"] < info["original_tokens"]
+
+
+def test_html_is_stripped():
+    text, info = clean_ticket(HTML_EMAIL)
+
+    assert text == "The mobile app crashes when I open settings."
+    assert "html" in info["removed"] and "signature" in info["removed"]
+
+
+def test_plain_ticket_is_unchanged():
+    ticket = "How do I reset my password?  The reset email never arrives."
+    text, info = clean_ticket(ticket)
+
+    assert text == "How do I reset my password? The reset email never arrives."
+    assert info["removed"] == [] and not info["truncated"]
+
+
+def test_thanks_before_the_problem_is_not_a_signature():
+    text, info = clean_ticket(
+        "Hi,\nThanks!\nI cannot log in since yesterday, error 500 on /login."
+    )
+
+    assert text.endswith("I cannot log in since yesterday, error 500 on /login.")
+    assert info["removed"] == []
+
+
+def test_angle_brackets_in_plain_text_are_kept():
+    ticket = (
+        'Traceback (most recent call last):\n  File "<stdin>", line 1, in <module>\n'
+        "ValueError: bad <token> in config"
+    )
+    text, info = clean_ticket(ticket)
+
+    assert 'File "<stdin>", line 1, in <module>' in text
+    assert "bad <token> in config" in text
+    assert "html" not in info["removed"]
+
+
+def test_long_ticket_keeps_informative_sentences():
+    filler = "We really appreciate the product and the team overall. " * 60
+    ticket = f"Login fails with error 500 since Tuesday. {filler}Can you help?"
+
+    text, info = clean_ticket(ticket, max_tokens=40)
+
+    assert info["truncated"]
+    assert estimate_tokens(text) <= 40
+    assert text.startswith("Login fails with error 500 since Tuesday.")
+    assert text.endswith("Can you help?")
+
+
+def test_agents_see_cleaned_text_and_storage_keeps_original(tmp_path):
+    store = TicketCheckpointStore(path=str(tmp_path / "checkpoints.sqlite"))
+    workflow = build_stub_workflow(StubLLM(), checkpoints=store)
+
+    result = workflow.process_ticket("TICKET-1", EMAIL)
+
+    assert result["ticket_content"] == EMAIL
+    assert result["ticket_text"].endswith("refund for the duplicate.")
+    assert result["preprocess"]["tokens"] < result["preprocess"]["original_tokens"]
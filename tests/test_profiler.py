@@ -0,0 +1,39 @@
+from benchmarks.stubs import StubLLM, build_stub_workflow
+from utils.config import config
+from utils.profiler import Profiler
+
+
+def test_profiled_ticket_records_nodes_and_stacks(monkeypatch):
+    monkeypatch.setattr(config, "CHECKPOINT_ENABLED", False)
+    workflow = build_stub_workflow(StubLLM(latency=0.02), checkpoints=None)
+    profiler = Profiler(sample_rate=0, max_concurrent=1, interval_ms=1, keep=5)
+
+    with profiler.scope("TICKET-1", requested=True) as profile:
+        workflow.process_ticket("TICKET-1", "How do I reset my password?")
+
+    assert profiler.get(profile.id) is profile
+    assert {"embedding", "triage", "resolution", "escalation"} <= set(profile.stages)
+    # The stub sleeps: wall time, not CPU time
+    resolution = profile.stages["resolution"]
+    assert resolution["runs"] == 1
+    assert resolution["wall_ms"] >= 20 > resolution["cpu_ms"]
+
+    collapsed = profile.to_collapsed()
+    assert collapsed.startswith("stage:")
+    assert " (profiler.py:" not in collapsed
+    speedscope = profile.to_speedscope()["profiles"][0]
+    assert len(speedscope["samples"]) == len(speedscope["weights"]) > 0
+
+
+def test_unrequested_and_over_capacity_tickets_are_not_profiled():
+    profiler = Profiler(sample_rate=0, max_concurrent=1, interval_ms=1, keep=5)
+
+    with profiler.scope("TICKET-1") as profile:
+        assert profile is None
+
+    with profiler.scope("TICKET-2", requested=True) as first:
+        with profiler.scope("TICKET-3", requested=True) as second:
+            assert first is not None and second is None
+
+    assert profiler.stats()["skipped_at_capacity"] == 1
+    assert [p["ticket_id"] for p in profiler.list()] == ["TICKET-2"]
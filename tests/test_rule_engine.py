@@ -0,0 +1,83 @@
+import os
+from benchmarks.stubs import StubLLM, build_stub_workflow
+from utils.rule_engine import RuleEngine
+
+RULES = """
+rules:
+  - name: asks_for_human
+    when:
+      phrases: [speak to a human, human agent]
+    escalate: true
+    reason: Customer asked for a human
+  - name: confident
+    when:
+      category: [technical]
+      confidence_at_least: 0.8
+    escalate: false
+    reason: "Confident ({confidence:.2f})"
+"""
+
+
+def make_engine(tmp_path, text=RULES):
+    path = tmp_path / "rules.yaml"
+    path.write_text(text)
+    return path, RuleEngine(str(path), reload_interval=0)
+
+
+def test_first_matching_rule_decides(tmp_path):
+    _, engine = make_engine(tmp_path)
+
+    decision = engine.decide(
+        "Please let me SPEAK  to a human now", category="technical", confidence=0.95
+    )
+    assert decision["rule"] == "asks_for_human"
+    assert decision["escalate"] is True
+
+    decision = engine.decide("Export fails", category="technical", confidence=0.9)
+    assert decision == {
+        "escalate": False,
+        "reason": "Confident (0.90)",
+        "rule": "confident",
+    }
+
+    # Phrases match whole words only, and nothing decides low confidence here
+    assert (
+        engine.decide("superhuman agents", category="billing", confidence=0.9) is None
+    )
+    assert engine.decide("Export fails", category="technical", confidence=0.5) is None
+
+    stats = engine.stats()
+    assert stats["rules"] == {"asks_for_human": 1, "confident": 1}
+    assert stats["local_share"] == 0.5
+
+
+def test_overlapping_phrases_and_hot_reload(tmp_path):
+    path, engine = make_engine(tmp_path)
+    assert engine.ruleset.find_phrases("speak to a human agent") == {
+        "speak to a human",
+        "human agent",
+    }
+
+    path.write_text(RULES.replace("human agent", "supervisor"))
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+    assert engine.decide("get me a supervisor")["rule"] == "asks_for_human"
+
+    # A broken file keeps the previous rules
+    path.write_text("rules: [{name: broken}]")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 2 * 10**9))
+    assert engine.decide("get me a supervisor")["rule"] == "asks_for_human"
+
+
+def test_degraded_answer_is_not_escalated_for_low_retrieval_score():
+    workflow = build_stub_workflow(StubLLM(), checkpoints=None)
+    # Useful retrieval scores sit below the 0.7 low-confidence rule
+    workflow.knowledge_agent.retrieve_context = lambda *args, **kwargs: [
+        {"id": "1", "content": "Use Forgot Password.", "score": 0.6}
+    ]
+
+    result = workflow.process_degraded("TICKET-1", "How do I reset my password?")
+    assert not result["escalate"]
+    assert "Forgot Password" in result["response"]
+
+    result = workflow.process_degraded("TICKET-2", "Let me speak to a human")
+    assert result["escalate"]
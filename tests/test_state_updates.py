@@ -0,0 +1,55 @@
+from benchmarks.stubs import StubLLM, build_stub_workflow
+from graph.checkpointing import TicketCheckpointStore
+from graph.state import TicketResult, apply_update
+
+
+def test_nodes_return_only_their_changes(tmp_path):
+    store = TicketCheckpointStore(path=str(tmp_path / "checkpoints.sqlite"))
+    workflow = build_stub_workflow(StubLLM(), checkpoints=store)
+    state = {"ticket_id": "TICKET-1", "ticket_text": "I was charged twice"}
+    state["model_calls"], state["token_usage"], state["total_tokens"] = [], {}, 0
+
+    update = workflow.triage_node(state)
+
+    assert set(update) == {
+        "category",
+        "priority",
+        "keywords",
+        "model_calls",
+        "token_usage",
+        "total_tokens",
+    }
+    assert workflow.analytics_node({**state, **update}) == {}
+
+
+def test_reducers_accumulate_model_calls_and_tokens():
+    call = {"agent": "triage", "input_tokens": 10, "output_tokens": 5}
+    state = {"model_calls": [call], "token_usage": {}, "total_tokens": 15}
+    state["token_usage"] = {"triage": {"input": 10, "output": 5, "calls": 1}}
+    update = {
+        "model_calls": [{**call, "agent": "resolution"}],
+        "token_usage": {"resolution": {"input": 10, "output": 5, "calls": 1}},
+        "total_tokens": 15,
+        "response": "Hi",
+    }
+
+    merged = apply_update(state, update)
+
+    assert len(merged["model_calls"]) == 2 and merged["total_tokens"] == 30
+    assert set(merged["token_usage"]) == {"triage", "resolution"}
+    assert state["total_tokens"] == 15 and len(state["model_calls"]) == 1
+
+
+def test_pipeline_totals_and_compact_result(tmp_path):
+    store = TicketCheckpointStore(path=str(tmp_path / "checkpoints.sqlite"))
+    workflow = build_stub_workflow(StubLLM(), checkpoints=store)
+
+    state = workflow.process_ticket("TICKET-1", "How do I reset my password?")
+
+    assert "context" not in state
+    assert state["total_tokens"] == sum(
+        c["input_tokens"] + c["output_tokens"] for c in state["model_calls"]
+    )
+    result = TicketResult.from_state(state)
+    assert result.total_tokens == state["total_tokens"]
+    assert result.response == state["response"] and not hasattr(result, "__dict__")
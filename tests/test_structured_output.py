@@ -0,0 +1,91 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from agents.resolution_agent import ResolutionOutput
+from agents.triage_agent import TriageOutput
+from utils.model_router import ModelRouter
+from utils.structured_output import StructuredOutput, load_json, output_stats
+import json
+import pytest
+
+TRIAGE = {"category": "technical", "priority": "high", "keywords": ["login"]}
+
+
+@pytest.mark.parametrize(
+    "content,outcome",
+    [
+        (json.dumps(TRIAGE), "clean"),
+        (
+            f"Here you go:\n```json\n{json.dumps(TRIAGE)}\n```\nLet me know!",
+            "extracted",
+        ),
+        (
+            "{'category': 'technical', 'priority': 'high', 'keywords': ['login'],}",
+            "repaired",
+        ),
+        (
+            '{category: "technical", "priority": "high", "keywords": ["login"]',
+            "repaired",
+        ),
+    ],
+)
+def test_replies_are_extracted_and_repaired(content, outcome):
+    value, got = load_json(content)
+    assert value == TRIAGE and got == outcome
+
+
+def test_schema_normalizes_and_rejects():
+    parse = StructuredOutput("test_schema", ResolutionOutput)
+
+    assert parse('{"response": "Hi", "confidence": "85%"}')["confidence"] == 0.85
+    with pytest.raises(ValueError):
+        parse('{"response": "Hi"}')
+    with pytest.raises(ValueError):
+        parse("I'm not sure how to help with that.")
+
+    stats = output_stats()["test_schema"]
+    assert stats["clean"] == 1 and stats["failed"] == 2
+    assert stats["failure_rate"] == pytest.approx(2 / 3, abs=1e-3)
+
+
+def test_cut_off_reply_keeps_complete_fields():
+    parse = StructuredOutput("test_cut", TriageOutput)
+
+    result = parse('{"category": "Billing", "priority": "urgent", "keywords": ["ref')
+
+    assert result == {"category": "billing", "priority": "urgent", "keywords": []}
+
+
+def test_streamed_fields_are_available_early():
+    parse = StructuredOutput("test_stream", TriageOutput)
+    chunks = ['{"categ', 'ory": "billing", "prio', 'rity": "high", "keyw', 'ords": []}']
+
+    fields = []
+    for field, value in parse.stream_fields(chunks):
+        fields.append(field)
+        if field == "priority":
+            break
+
+    assert fields == ["category", "priority"]
+
+
+class ScriptedLLM:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def invoke(self, messages, **kwargs):
+        self.prompts.append(messages)
+        return AIMessage(content=self.replies.pop(0))
+
+
+def test_router_reasks_once_as_last_resort():
+    llm = ScriptedLLM(["Sorry, something went wrong", json.dumps(TRIAGE)])
+    parse = StructuredOutput("test_reask", TriageOutput)
+    messages = [SystemMessage(content="triage"), HumanMessage(content="ticket")]
+
+    routed = ModelRouter(llm=llm).invoke("test_reask", messages, parse=parse)
+
+    assert routed.result == TRIAGE
+    assert routed.calls[-1]["reask"] and routed.calls[-1]["outcome"] == "ok"
+    assert llm.prompts[-1][-2].content == "Sorry, something went wrong"
+    stats = output_stats()["test_reask"]
+    assert stats["reasked"] == 1 and stats["recovered"] == 1
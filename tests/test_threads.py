@@ -0,0 +1,59 @@
+from benchmarks.stubs import StubLLM, build_stub_workflow
+from graph.agent_graph import TicketNotFoundError
+from graph.checkpointing import TicketCheckpointStore
+from utils.conversation import summarize_history
+from utils.tokens import estimate_tokens
+import pytest
+
+TICKET = "How do I reset my password? The reset email never arrives."
+
+
+def make_workflow(tmp_path):
+    llm = StubLLM()
+    store = TicketCheckpointStore(path=str(tmp_path / "checkpoints.sqlite"))
+    return llm, build_stub_workflow(llm, checkpoints=store)
+
+
+def test_followup_reuses_triage_until_topic_drifts(tmp_path):
+    llm, workflow = make_workflow(tmp_path)
+    workflow.process_ticket("TICKET-1", TICKET)
+    assert llm.calls["triage"] == 1
+
+    result = workflow.process_followup(
+        "TICKET-1", "Still not working, the password reset email never arrives"
+    )
+    assert result["turn"]["reused_triage"]
+    assert result["turn"]["number"] == 2
+    assert llm.calls["triage"] == 1 and llm.calls["resolution"] == 2
+    assert "ticket_embedding" not in result
+
+    result = workflow.process_followup(
+        "TICKET-1", "Unrelated: where can I export billing invoices as CSV files?"
+    )
+    assert not result["turn"]["reused_triage"]
+    assert llm.calls["triage"] == 2
+
+    stored = workflow.graph.get_state(workflow.checkpoints.thread_config("TICKET-1"))
+    assert [m["role"] for m in stored.values["messages"]] == ["customer", "agent"] * 3
+    assert stored.values["ticket_content"] == TICKET
+    assert stored.values["total_tokens"] > result["turn"]["total_tokens"]
+
+
+def test_followup_needs_a_processed_ticket(tmp_path):
+    _, workflow = make_workflow(tmp_path)
+    with pytest.raises(TicketNotFoundError):
+        workflow.process_followup("TICKET-404", "Any update?")
+
+
+def test_history_summary_stays_bounded():
+    messages = [
+        {"role": "customer" if i % 2 == 0 else "agent", "content": f"msg {i} " * 200}
+        for i in range(40)
+    ]
+
+    summary = summarize_history(messages, max_tokens=300)
+
+    assert estimate_tokens(summary) <= 320
+    assert summary.startswith("Original issue: msg 0")
+    assert "earlier messages omitted" in summary
+    assert summary.splitlines()[-1].startswith("Agent: msg 39")
@@ -0,0 +1,70 @@
+from benchmarks.stubs import StubLLM, build_stub_workflow
+from utils.config import config
+from utils.tokens import TokenBudget, fit_documents
+
+TICKET = "How do I reset my password? The email never arrives."
+
+
+def test_tokens_accumulate_per_stage(monkeypatch):
+    monkeypatch.setattr(config, "CHECKPOINT_ENABLED", False)
+    workflow = build_stub_workflow(StubLLM(), checkpoints=None)
+
+    result = workflow.process_ticket("TICKET-1", TICKET)
+
+    usage = result["token_usage"]
+    assert {"triage", "resolution"} <= set(usage)
+    calls = result["model_calls"]
+    assert result["total_tokens"] == sum(
+        c["input_tokens"] + c["output_tokens"] for c in calls
+    )
+    assert result["token_budget"] is None
+
+    breakdown = workflow.analytics_agent.get_token_breakdown()
+    assert breakdown["priority"]["low"]["tokens"] == result["total_tokens"]
+    (top,) = workflow.analytics_agent.get_top_token_consumers()
+    assert top["ticket_id"] == "TICKET-1"
+
+
+class UnreadableEscalationLLM(StubLLM):
+    """Resolutions no rule decides, and escalation answers nothing can parse"""
+
+    def respond(self, stage, prompt):
+        if stage == "resolution":
+            return {"response": "Try again later.", "confidence": 0.75}
+        if stage == "escalation":
+            return {"verdict": "unclear"}
+        return super().respond(stage, prompt)
+
+
+def test_failed_escalation_calls_are_counted(monkeypatch):
+    monkeypatch.setattr(config, "CHECKPOINT_ENABLED", False)
+    workflow = build_stub_workflow(UnreadableEscalationLLM(), checkpoints=None)
+
+    result = workflow.process_ticket("TICKET-1", TICKET)
+
+    assert result["escalate"]
+    assert result["escalation_reason"].startswith("Error in escalation logic")
+    usage = result["token_usage"]["escalation"]
+    assert usage["calls"] >= 2 and usage["input"] > 0 and usage["output"] > 0
+
+
+def test_tight_budget_trims_context_and_switches_model(monkeypatch):
+    monkeypatch.setattr(config, "CHECKPOINT_ENABLED", False)
+    budget = TokenBudget(limit=1, soft_ratio=0.0, reserve=0)
+    workflow = build_stub_workflow(StubLLM(), checkpoints=None, token_budget=budget)
+
+    result = workflow.process_ticket("TICKET-1", TICKET)
+
+    actions = result["token_budget"]["actions"]
+    assert actions[0].startswith("context_trimmed:")
+    assert "budget_model" in actions
+    resolution = [c for c in result["model_calls"] if c["agent"] == "resolution"]
+    assert [c["model"] for c in resolution] == [config.GROQ_SMALL_MODEL]
+
+
+def test_fit_documents_drops_lowest_ranked_first():
+    docs = [{"content": "a" * 40}, {"content": "b" * 40}, {"content": "c" * 40}]
+
+    assert fit_documents(docs, 25) == docs[:2]
+    (truncated,) = fit_documents(docs, 5)
+    assert truncated["content"] == "a" * 20 and truncated["truncated"]
@@ -0,0 +1,132 @@
+from agents.triage_agent import TriageAgent
+from agents.triage_batcher import TriageBatcher
+from benchmarks.stubs import StubLLM
+from utils.model_router import ModelRouter
+import threading
+import time
+
+TICKETS = {
+    f"TICKET-{i}": (
+        "I was charged twice for my invoice" if i % 2 else "URGENT: the app crashes"
+    )
+    for i in range(12)
+}
+
+
+class DroppingLLM(StubLLM):
+    """Leaves one ticket out of batch answers and mislabels another"""
+
+    def respond(self, stage: str, prompt: str):
+        result = super().respond(stage, prompt)
+        if stage == "triage_batch":
+            result["results"] = [r for r in result["results"] if r["id"] != "TICKET-0"]
+            for r in result["results"]:
+                if r["id"] == "TICKET-1":
+                    r["category"] = "outage"
+        return result
+
+
+def make_batcher(llm, **kwargs) -> TriageBatcher:
+    return TriageBatcher(TriageAgent(router=ModelRouter(llm=llm)), **kwargs)
+
+
+def triage_concurrently(batcher: TriageBatcher) -> dict:
+    # Pretend a burst is under way so the first ticket opens a batch
+    batcher._gap = 0.001
+    results, start = {}, threading.Barrier(len(TICKETS))
+
+    def run(ticket_id):
+        start.wait()
+        results[ticket_id] = batcher.analyze(ticket_id, TICKETS[ticket_id])
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in TICKETS]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_burst_is_triaged_in_shared_calls():
+    llm = StubLLM(latency=0.02)
+    batcher = make_batcher(llm, max_batch=6, max_wait_ms=200)
+
+    results = triage_concurrently(batcher)
+
+    assert llm.calls["triage_batch"] < len(TICKETS)
+    assert llm.calls["triage"] == 0
+    for ticket_id, result in results.items():
+        billing = int(ticket_id.split("-")[1]) % 2
+        assert result["category"] == ("billing" if billing else "technical")
+        assert result["model_calls"][0]["batch_size"] > 1
+    stats = batcher.stats()
+    assert stats["batched_tickets"] == len(TICKETS)
+    assert stats["calls_saved"] == len(TICKETS) - llm.calls["triage_batch"]
+    assert stats["tokens_saved"] > 0
+
+
+def test_missing_and_invalid_items_are_retried_alone():
+    llm = DroppingLLM()
+    batcher = make_batcher(llm, max_batch=len(TICKETS), max_wait_ms=500)
+
+    results = triage_concurrently(batcher)
+
+    assert results["TICKET-0"]["category"] == "technical"
+    assert results["TICKET-1"]["category"] == "billing"
+    assert llm.calls["triage"] >= 2
+    assert batcher.stats()["retried"] >= 2
+
+
+def test_quiet_load_is_not_delayed():
+    llm = StubLLM()
+    batcher = make_batcher(llm, max_wait_ms=50)
+
+    for ticket_id in list(TICKETS)[:3]:
+        batcher.analyze(ticket_id, TICKETS[ticket_id])
+        time.sleep(0.06)
+
+    assert llm.calls["triage"] == 3 and llm.calls["triage_batch"] == 0
+    stats = batcher.stats()
+    assert stats["solo"] == 3 and stats["queue_ms_max"] == 0
+
+
+def test_error_after_the_batch_call_releases_every_caller():
+    batcher = make_batcher(StubLLM(), max_batch=len(TICKETS), max_wait_ms=500)
+
+    def broken(raw):
+        raise RuntimeError("validation bug")
+
+    batcher._item = broken
+    batcher._gap = 0.001
+    errors, start = [], threading.Barrier(len(TICKETS))
+
+    def run(ticket_id):
+        start.wait()
+        try:
+            batcher.analyze(ticket_id, TICKETS[ticket_id])
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(t,)) for t in TICKETS]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert len(errors) == len(TICKETS)
+
+
+def test_stuck_batch_call_falls_back_to_solo_triage():
+    llm = StubLLM(latency={"triage_batch": 1.0})
+    batcher = make_batcher(
+        llm, max_batch=len(TICKETS), max_wait_ms=500, wait_timeout=0.1
+    )
+
+    start = time.monotonic()
+    results = triage_concurrently(batcher)
+
+    assert len(results) == len(TICKETS)
+    assert llm.calls["triage"] == len(TICKETS) - 1
+    assert batcher.stats()["timed_out"] == len(TICKETS) - 1
+    assert time.monotonic() - start < 5
@@ -0,0 +1,397 @@
+"""
+Record/replay cassettes for the ticket pipeline
+
+Recording wraps the model router, vector DB and Supabase client so every
+LLM call, Qdrant search and DB call made for a ticket (with its timing) is
+written to one gzipped JSON cassette. Replaying swaps in stand-ins that
+answer from a cassette with the recorded (optionally scaled) latency, so
+`MultiAgentWorkflow.process_ticket` runs fully offline.
+
+Both modes also note per-stage timings, and `summarize` turns a set of
+cassettes into the latency / call / token report that
+benchmarks/replay_cassettes.py diffs between revisions.
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from langchain_core.messages import AIMessage
+from utils.logger import logger
+from utils.model_router import ModelRouter
+from utils.tokens import estimate_tokens
+from typing import Callable, Dict, Iterable, List, Optional
+import gzip
+import json
+import os
+import re
+import statistics
+import time
+
+import numpy as np
+
+CASSETTE_VERSION = 1
+
+_session: ContextVar = ContextVar("cassette_session", default=None)
+
+_REDACTIONS = [
+    (re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+"), "<email>"),
+    (re.compile(r"\b(?:\d[ -]?){13,19}\b"), "<card>"),
+    (re.compile(r"\+?\d[\d ().-]{7,}\d"), "<phone>"),
+]
+
+
+def redact_pii(text: str) -> str:
+    """Default redactor: email addresses, card-like numbers, phone numbers"""
+    for pattern, placeholder in _REDACTIONS:
+        text = pattern.sub(placeholder, text)
+    return text
+
+
+class Cassette:
+    """Events captured for one ticket, in call order"""
+
+    def __init__(self, ticket_id: str, content: str, events: List[dict] = None):
+        self.ticket_id = ticket_id
+        self.content = content
+        self.events = events or []
+
+    def add(self, kind: str, **fields):
+        self.events.append({"kind": kind, **fields})
+
+    def redacted(self, redactors: List[Callable[[str], str]]) -> "Cassette":
+        def clean(value):
+            if isinstance(value, str):
+                for redactor in redactors:
+                    value = redactor(value)
+                return value
+            if isinstance(value, list):
+                return [clean(v) for v in value]
+            if isinstance(value, dict):
+                return {k: clean(v) for k, v in value.items()}
+            return value
+
+        # Search results are knowledge base text, not customer text
+        events = [e if e["kind"] == "search" else clean(e) for e in self.events]
+        return Cassette(self.ticket_id, clean(self.content), events)
+
+    def save(self, directory: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        name = re.sub(r"[^\w.-]", "_", self.ticket_id)
+        path = os.path.join(directory, f"{name}.json.gz")
+        payload = {
+            "version": CASSETTE_VERSION,
+            "ticket_id": self.ticket_id,
+            "content": self.content,
+            "events": self.events,
+        }
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"), default=float)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+        return cls(payload["ticket_id"], payload["content"], payload["events"])
+
+
+def iter_cassettes(directory: str) -> Iterable[Cassette]:
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json.gz"):
+            yield Cassette.load(os.path.join(directory, name))
+
+
+class _Session:
+    """What is being recorded into and, when replaying, read from"""
+
+    def __init__(self, recording: Cassette, source: Optional[Cassette] = None):
+        self.recording = recording
+        self.queues = defaultdict(list)
+        self.misses = 0
+        for event in source.events if source else []:
+            self.queues[event["kind"]].append(event)
+
+    def take(self, kind: str, *relaxed: str, **match) -> Optional[dict]:
+        """
+        Next recorded event of a kind matching all fields in `match`
+
+        If none matches, the fields named in `relaxed` are dropped from the
+        match one by one (counted as a miss), so a revision that e.g. routes
+        to a different model still replays the same agent's response.
+        """
+        queue = self.queues[kind]
+        match = dict(match)
+        while True:
+            for i, event in enumerate(queue):
+                if all(event.get(k) == v for k, v in match.items()):
+                    return queue.pop(i)
+            if not relaxed:
+                return None
+            self.misses += 1
+            match.pop(relaxed[0], None)
+            relaxed = relaxed[1:]
+
+
+def record_event(kind: str, **fields):
+    """Append an event to the active cassette; no-op outside a scope"""
+    session = _session.get()
+    if session is not None:
+        session.recording.add(kind, **fields)
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+class CassetteRecorder:
+    """
+    Writes one cassette per ticket processed inside `scope`
+
+    Args:
+        directory: Where cassettes are written
+        redactors: Applied to customer text before writing
+            (default: `redact_pii`; pass [] to keep text verbatim)
+    """
+
+    def __init__(self, directory: str, redactors: Optional[list] = None):
+        self.directory = directory
+        self.redactors = [redact_pii] if redactors is None else redactors
+
+    @contextmanager
+    def scope(self, ticket_id: str, content: str):
+        session = _Session(Cassette(ticket_id, content))
+        token = _session.set(session)
+        try:
+            yield session.recording
+        finally:
+            _session.reset(token)
+            try:
+                session.recording.redacted(self.redactors).save(self.directory)
+            except Exception as e:
+                logger.warning(f"Failed to write cassette for {ticket_id}: {e}")
+
+
+@contextmanager
+def replaying(cassette: Cassette):
+    """Serve recorded calls from `cassette`; yields the observed replay"""
+    session = _Session(Cassette(cassette.ticket_id, cassette.content), cassette)
+    token = _session.set(session)
+    try:
+        yield session
+    finally:
+        _session.reset(token)
+
+
+class RecordingRouter(ModelRouter):
+    """Delegates to an existing router and records every model call"""
+
+    def __init__(self, inner: ModelRouter):
+        super().__init__(llm_factory=inner._factory)
+        self.inner = inner
+
+    def _call(self, agent, model, temperature, messages):
+        start = time.perf_counter()
+        response = self.inner._call(agent, model, temperature, messages)
+        usage = getattr(response, "usage_metadata", None) or {}
+        record_event(
+            "llm",
+            agent=agent,
+            model=model,
+            latency_ms=_elapsed_ms(start),
+            response=response.content,
+            input_tokens=usage.get("input_tokens"),
+            output_tokens=usage.get("output_tokens"),
+        )
+        return response
+
+
+class ReplayRouter(ModelRouter):
+    """
+    Answers model calls from the active cassette
+
+    Input tokens are estimated from the prompt actually sent, so prompt
+    changes show up in the report; output tokens are the recorded ones.
+    """
+
+    def __init__(self, latency_scale: float = 1.0):
+        super().__init__(llm_factory=lambda model, temperature: None)
+        self.latency_scale = latency_scale
+
+    def _call(self, agent, model, temperature, messages):
+        start = time.perf_counter()
+        session = _session.get()
+        event = (
+            session.take("llm", "model", agent=agent, model=model) if session else None
+        )
+        if event is None:
+            raise LookupError(f"No recorded {agent} call left in cassette")
+
+        if self.latency_scale:
+            time.sleep(event["latency_ms"] / 1000 * self.latency_scale)
+
+        input_tokens = estimate_tokens("\n".join(m.content for m in messages))
+        output_tokens = event.get("output_tokens") or estimate_tokens(event["response"])
+        record_event(
+            "llm",
+            agent=agent,
+            model=model,
+            latency_ms=_elapsed_ms(start),
+            response=event["response"],
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+        )
+        return AIMessage(
+            content=event["response"],
+            response_metadata={"model_name": model},
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+
+
+class RecordingVectorDB:
+    """Proxy for QdrantManager recording embed and search calls"""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def embed(self, text):
+        start = time.perf_counter()
+        vector = self.inner.embed(text)
+        record_event("embed", latency_ms=_elapsed_ms(start))
+        return vector
+
+    def search(self, query=None, top_k=3, categories=None, query_vector=None):
+        start = time.perf_counter()
+        results = self.inner.search(
+            query=query, top_k=top_k, categories=categories, query_vector=query_vector
+        )
+        record_event(
+            "search",
+            top_k=top_k,
+            categories=categories,
+            latency_ms=_elapsed_ms(start),
+            results=results,
+        )
+        return results
+
+
+class ReplayVectorDB:
+    """QdrantManager stand-in answering from the active cassette"""
+
+    def __init__(self, latency_scale: float = 1.0, dim: int = 384):
+        self.latency_scale = latency_scale
+        self.dim = dim
+
+    def _replay(self, kind: str, **match) -> dict:
+        start = time.perf_counter()
+        session = _session.get()
+        event = session.take(kind, *match, **match) if session else None
+        if event is None:
+            raise LookupError(f"No recorded {kind} call left in cassette")
+        if self.latency_scale:
+            time.sleep(event["latency_ms"] / 1000 * self.latency_scale)
+        fields = {k: v for k, v in event.items() if k != "kind"}
+        record_event(kind, **{**fields, "latency_ms": _elapsed_ms(start)})
+        return event
+
+    def embed(self, text):
+        # Only ever passed back to search, which is replayed too
+        self._replay("embed")
+        return np.zeros(self.dim, dtype=np.float32)
+
+    def search(self, query=None, top_k=3, categories=None, query_vector=None):
+        return self._replay("search", top_k=top_k, categories=categories)["results"]
+
+
+class RecordingDB:
+    """Proxy for SupabaseManager recording call latency"""
+
+    OPERATIONS = {"save_ticket", "save_messages", "get_ticket", "get_all_tickets"}
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def __getattr__(self, name):
+        attr = getattr(self.inner, name)
+        if name not in self.OPERATIONS:
+            return attr
+
+        def call(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                record_event("db", op=name, latency_ms=_elapsed_ms(start))
+
+        return call
+
+
+def enable_recording(workflow, db=None):
+    """
+    Wrap a workflow's model routers and vector DB (and a DB client) in place
+
+    Returns:
+        The recording DB proxy, or None when no db was given
+    """
+    for agent in (
+        workflow.triage_agent,
+        workflow.resolution_agent,
+        workflow.escalation_agent,
+    ):
+        agent.router = RecordingRouter(agent.router)
+    workflow.knowledge_agent.vector_db = RecordingVectorDB(
+        workflow.knowledge_agent.vector_db
+    )
+    logger.info("🎞️  Cassette recording enabled")
+    return RecordingDB(db) if db is not None else None
+
+
+def _stats(values: List[float]) -> Dict:
+    values = sorted(values)
+    return {
+        "mean_ms": round(statistics.mean(values), 2),
+        "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))], 2),
+        "count": len(values),
+    }
+
+
+def summarize(cassettes: Iterable[Cassette]) -> Dict:
+    """Per-stage latency, LLM calls and tokens across a set of cassettes"""
+    stages = defaultdict(list)
+    calls = defaultdict(int)
+    tokens = {"input": 0, "output": 0}
+    tickets = 0
+
+    for cassette in cassettes:
+        tickets += 1
+        total = 0.0
+        for event in cassette.events:
+            if event["kind"] == "stage":
+                stages[event["stage"]].append(event["ms"])
+                total += event["ms"]
+            elif event["kind"] == "llm":
+                calls[f"{event['agent']}:{event['model']}"] += 1
+                tokens["input"] += event.get("input_tokens") or 0
+                tokens["output"] += event.get("output_tokens") or 0
+            elif event["kind"] in ("search", "embed", "db"):
+                stages[f"io:{event.get('op', event['kind'])}"].append(
+                    event["latency_ms"]
+                )
+        if total:
+            stages["total"].append(total)
+
+    return {
+        "tickets": tickets,
+        "stages": {name: _stats(values) for name, values in sorted(stages.items())},
+        "llm_calls": dict(sorted(calls.items())),
+        "llm_calls_per_ticket": (
+            round(sum(calls.values()) / tickets, 3) if tickets else 0.0
+        ),
+        "tokens": tokens,
+    }
@@ -1,3 +1,4 @@
+import json
 import os
 from dotenv import load_dotenv
 
@@ -8,19 +9,239 @@ class Config:
     # Groq
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     GROQ_MODEL = "llama-3.3-70b-versatile"  # Fastest, most capable free model
+    GROQ_SMALL_MODEL = os.getenv("GROQ_SMALL_MODEL", "llama-3.1-8b-instant")
+
+    # Models tried in order per agent; the next one is used when output
+    # doesn't parse or is rejected (e.g. low confidence)
+    MODEL_ROUTES = json.loads(
+        os.getenv(
+            "MODEL_ROUTES",
+            json.dumps(
+                {
+                    "triage": [GROQ_SMALL_MODEL, GROQ_MODEL],
+                    "escalation": [GROQ_SMALL_MODEL, GROQ_MODEL],
+                    "resolution": [GROQ_MODEL],
+                    "resolution.low": [GROQ_SMALL_MODEL, GROQ_MODEL],
+                    # Used once a ticket nears its token budget
+                    "resolution.budget": [GROQ_SMALL_MODEL],
+                    # Offline document digests (database/knowledge_digest.py)
+                    "digest": [GROQ_SMALL_MODEL, GROQ_MODEL],
+                }
+            ),
+        )
+    )
+    # Resolutions below this confidence from an earlier model are retried
+    MODEL_MIN_CONFIDENCE = float(os.getenv("MODEL_MIN_CONFIDENCE", "0.7"))
+
+    # Micro-batched triage: concurrent tickets share one LLM call under load
+    TRIAGE_BATCH_ENABLED = os.getenv("TRIAGE_BATCH_ENABLED", "false").lower() == "true"
+    TRIAGE_BATCH_MAX_SIZE = int(os.getenv("TRIAGE_BATCH_MAX_SIZE", "16"))
+    TRIAGE_BATCH_MAX_WAIT_MS = float(os.getenv("TRIAGE_BATCH_MAX_WAIT_MS", "50"))
+    # Seconds a ticket waits on another caller's batch call before going alone
+    TRIAGE_BATCH_WAIT_TIMEOUT = float(os.getenv("TRIAGE_BATCH_WAIT_TIMEOUT", "60"))
+
+    # LLM output: provider JSON mode, and one re-ask when no model's reply parses
+    LLM_JSON_MODE = os.getenv("LLM_JSON_MODE", "true").lower() == "true"
+    STRUCTURED_OUTPUT_REASK = (
+        os.getenv("STRUCTURED_OUTPUT_REASK", "true").lower() == "true"
+    )
+
+    # Conversation threads (POST /tickets/{id}/messages)
+    # Follow-ups further than this (1 - cosine) from the ticket's topic
+    # re-run triage and retrieval; closer ones reuse the stored results
+    THREAD_TOPIC_DRIFT = float(os.getenv("THREAD_TOPIC_DRIFT", "0.5"))
+    THREAD_SUMMARY_TOKENS = int(os.getenv("THREAD_SUMMARY_TOKENS", "300"))
+    THREAD_SUMMARY_MESSAGE_TOKENS = int(
+        os.getenv("THREAD_SUMMARY_MESSAGE_TOKENS", "80")
+    )
+    # Transcript kept in the checkpoint: the first message and the latest ones
+    THREAD_MAX_MESSAGES = int(os.getenv("THREAD_MAX_MESSAGES", "50"))
+
+    # Per-ticket LLM token budget (0 = unlimited); see utils/tokens.TokenBudget
+    TOKEN_BUDGET_PER_TICKET = int(os.getenv("TOKEN_BUDGET_PER_TICKET", "0"))
+    TOKEN_BUDGET_SOFT_RATIO = float(os.getenv("TOKEN_BUDGET_SOFT_RATIO", "0.7"))
+    TOKEN_BUDGET_RESERVE = int(os.getenv("TOKEN_BUDGET_RESERVE", "400"))
 
     # Qdrant
     QDRANT_URL = os.getenv("QDRANT_URL")
     QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
     QDRANT_COLLECTION = "support_docs"
+    QDRANT_UPSERT_BATCH_SIZE = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "64"))
+    QDRANT_HNSW_M = int(os.getenv("QDRANT_HNSW_M", "16"))
+    QDRANT_HNSW_EF_CONSTRUCT = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "100"))
+    QDRANT_HNSW_EF = int(os.getenv("QDRANT_HNSW_EF", "0")) or None
+    QDRANT_QUANTIZATION = os.getenv("QDRANT_QUANTIZATION", "false").lower() == "true"
+    QDRANT_OVERSAMPLING = float(os.getenv("QDRANT_OVERSAMPLING", "2.0"))
+
+    # Embeddings
+    EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+
+    # Ticket text preprocessing (quoted replies, signatures, footers, HTML)
+    PREPROCESS_ENABLED = os.getenv("PREPROCESS_ENABLED", "true").lower() == "true"
+    # Longer cleaned text keeps only its most informative sentences (0 = no cap)
+    PREPROCESS_MAX_TOKENS = int(os.getenv("PREPROCESS_MAX_TOKENS", "400"))
+
+    # Retrieval: triage category -> document metadata.category values
+    RETRIEVAL_CATEGORY_FILTERS = json.loads(
+        os.getenv(
+            "RETRIEVAL_CATEGORY_FILTERS",
+            '{"billing": ["billing", "payments"], '
+            '"technical": ["technical", "authentication", "account"], '
+            '"feature_request": ["feature_request", "product"]}',
+        )
+    )
+    RETRIEVAL_MIN_FILTERED_HITS = int(os.getenv("RETRIEVAL_MIN_FILTERED_HITS", "2"))
+    RETRIEVAL_MIN_FILTERED_SCORE = float(
+        os.getenv("RETRIEVAL_MIN_FILTERED_SCORE", "0.3")
+    )
+    RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "3"))
+    # "ticket" searches with the ticket embedding, "keywords" with triage keywords
+    RETRIEVAL_QUERY = os.getenv("RETRIEVAL_QUERY", "ticket")
+
+    # Document digests: the resolution prompt gets the full text of the top
+    # RETRIEVAL_FULL_TEXT_TOP hits and the stored digest of the others
+    RETRIEVAL_USE_DIGESTS = os.getenv("RETRIEVAL_USE_DIGESTS", "true").lower() == "true"
+    RETRIEVAL_FULL_TEXT_TOP = int(os.getenv("RETRIEVAL_FULL_TEXT_TOP", "1"))
+    # Chunks shorter than this are used as they are, not digested
+    DIGEST_MIN_TOKENS = int(os.getenv("DIGEST_MIN_TOKENS", "120"))
+
+    # Re-ranking (cross-encoder between retrieval and resolution)
+    RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+    RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "10"))
+    RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "3"))
+    RERANK_TIME_BUDGET_MS = float(os.getenv("RERANK_TIME_BUDGET_MS", "150"))
+    RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "5000"))
+
+    # Direct answers: curated FAQ templates served without the resolution LLM
+    DIRECT_ANSWER_ENABLED = os.getenv("DIRECT_ANSWER_ENABLED", "true").lower() == "true"
+    DIRECT_ANSWER_MIN_SCORE = float(os.getenv("DIRECT_ANSWER_MIN_SCORE", "0.9"))
+    # Fraction of direct answers also sent to the LLM for comparison
+    DIRECT_ANSWER_SHADOW_RATE = float(os.getenv("DIRECT_ANSWER_SHADOW_RATE", "0"))
+    DIRECT_ANSWER_SHADOW_KEEP = int(os.getenv("DIRECT_ANSWER_SHADOW_KEEP", "1000"))
+
+    # Incident detection: similar tickets arriving in a burst are grouped,
+    # and once confirmed new ones reuse the incident's resolution
+    INCIDENT_ENABLED = os.getenv("INCIDENT_ENABLED", "true").lower() == "true"
+    INCIDENT_SIMILARITY = float(os.getenv("INCIDENT_SIMILARITY", "0.85"))
+    INCIDENT_WINDOW_SECONDS = float(os.getenv("INCIDENT_WINDOW_SECONDS", "900"))
+    INCIDENT_MIN_TICKETS = int(os.getenv("INCIDENT_MIN_TICKETS", "10"))
+    INCIDENT_MAX_CLUSTERS = int(os.getenv("INCIDENT_MAX_CLUSTERS", "256"))
+    INCIDENT_AUTO_CONFIRM = (
+        os.getenv("INCIDENT_AUTO_CONFIRM", "false").lower() == "true"
+    )
+
+    # Knowledge ingestion
+    KNOWLEDGE_MANIFEST_PATH = os.getenv(
+        "KNOWLEDGE_MANIFEST_PATH", "data/knowledge_manifest.json"
+    )
+    INGEST_CHUNK_TOKENS = int(os.getenv("INGEST_CHUNK_TOKENS", "180"))
+    INGEST_CHUNK_OVERLAP = int(os.getenv("INGEST_CHUNK_OVERLAP", "30"))
+    INGEST_EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "256"))
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 1)))
 
     # Supabase
     SUPABASE_URL = os.getenv("SUPABASE_URL")
     SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
+    # Graph checkpointing and node retries
+    CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "true").lower() == "true"
+    CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "data/checkpoints.sqlite")
+    CHECKPOINT_TTL_SECONDS = float(os.getenv("CHECKPOINT_TTL_SECONDS", "86400"))
+    CHECKPOINT_CLEANUP_INTERVAL_SECONDS = float(
+        os.getenv("CHECKPOINT_CLEANUP_INTERVAL_SECONDS", "600")
+    )
+    NODE_RETRY_ATTEMPTS = int(os.getenv("NODE_RETRY_ATTEMPTS", "3"))
+    NODE_RETRY_INITIAL_INTERVAL = float(os.getenv("NODE_RETRY_INITIAL_INTERVAL", "0.5"))
+
+    # Escalation rules (YAML or JSON), reloaded when the file changes
+    ESCALATION_RULES_PATH = os.getenv(
+        "ESCALATION_RULES_PATH",
+        os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            "agents",
+            "escalation_rules.yaml",
+        ),
+    )
+    ESCALATION_RULES_RELOAD_SECONDS = float(
+        os.getenv("ESCALATION_RULES_RELOAD_SECONDS", "2")
+    )
+
+    # Admission control for POST /tickets
+    ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "8"))
+    ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+    # Tickets queued longer than this get the degraded answer instead
+    ADMISSION_MAX_QUEUE_WAIT_MS = float(
+        os.getenv("ADMISSION_MAX_QUEUE_WAIT_MS", "2000")
+    )
+    # Reported as degraded for this long after the last shed ticket
+    ADMISSION_DEGRADED_HOLD_SECONDS = float(
+        os.getenv("ADMISSION_DEGRADED_HOLD_SECONDS", "10")
+    )
+    # Urgent-looking tickets skip ahead in the queue and are never refused a slot
+    ADMISSION_URGENT_PATTERN = os.getenv(
+        "ADMISSION_URGENT_PATTERN",
+        r"\b(urgent|asap|emergency|outage|down|hacked|security|breach)\b",
+    )
+    # Degraded mode answers with the top document only above this score
+    DEGRADED_MIN_SCORE = float(os.getenv("DEGRADED_MIN_SCORE", "0.5"))
+
+    # Record/replay cassettes of every LLM, Qdrant and DB call per ticket
+    CASSETTE_RECORD = os.getenv("CASSETTE_RECORD", "false").lower() == "true"
+    CASSETTE_DIR = os.getenv("CASSETTE_DIR", "data/cassettes")
+
+    # Duplicate POST /tickets: results replayed per Idempotency-Key for the
+    # TTL, and per normalized content for the window (0 = keys only). Content
+    # isn't scoped to a customer, so only enable the window for a single
+    # trusted client: otherwise two customers sending the same words share
+    # one ticket
+    IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    IDEMPOTENCY_CONTENT_WINDOW_SECONDS = float(
+        os.getenv("IDEMPOTENCY_CONTENT_WINDOW_SECONDS", "0")
+    )
+    IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+
+    # Live analytics over WebSocket (/api/analytics/stream)
+    ANALYTICS_FEED_INTERVAL_MS = float(os.getenv("ANALYTICS_FEED_INTERVAL_MS", "500"))
+    # Messages queued per dashboard before it is disconnected as too slow
+    ANALYTICS_FEED_MAX_BACKLOG = int(os.getenv("ANALYTICS_FEED_MAX_BACKLOG", "64"))
+
+    # On-demand per-ticket profiling (X-Profile header or sampled). The
+    # header needs X-Admin-Key too, unless PROFILE_HEADER_OPEN (local dev)
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_HEADER_OPEN = os.getenv("PROFILE_HEADER_OPEN", "false").lower() == "true"
+    PROFILE_MAX_CONCURRENT = int(os.getenv("PROFILE_MAX_CONCURRENT", "2"))
+    PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+
+    # Shared HTTP transport for Groq, Qdrant and Supabase (utils/http_transport)
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "32"))
+    HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "16"))
+    # Idle pooled connections are kept this long (httpx closes them after 5s)
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "120"))
+    HTTP2 = os.getenv("HTTP2", "true").lower() == "true"
+    # Seconds per backend; "default" covers any backend not listed
+    HTTP_TIMEOUTS = json.loads(
+        os.getenv(
+            "HTTP_TIMEOUTS",
+            '{"groq": {"connect": 5, "read": 60}, '
+            '"qdrant": {"connect": 3, "read": 10}, '
+            '"supabase": {"connect": 3, "read": 10}, '
+            '"default": {"connect": 5, "read": 30}}',
+        )
+    )
+    # Open a connection to each backend at startup
+    HTTP_PREWARM = os.getenv("HTTP_PREWARM", "true").lower() == "true"
+
     # Application
     ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_JSON = os.getenv("LOG_JSON", "false").lower() == "true"
+    LOG_ENQUEUE = os.getenv("LOG_ENQUEUE", "true").lower() == "true"
+    # Fraction of per-ticket INFO messages kept; warnings and errors always are
+    LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+    # Required for /api/admin; the admin routes are refused while unset
+    ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
 
 
 config = Config()
@@ -0,0 +1,64 @@
+from utils.tokens import estimate_tokens
+from typing import List, Sequence
+
+import numpy as np
+
+ROLES = {"customer": "Customer", "agent": "Agent"}
+
+
+def topic_drift(a: Sequence[float], b: Sequence[float]) -> float:
+    """1 - cosine similarity: 0 for the same topic, ~1 for unrelated text"""
+    if a is None or b is None:
+        return 1.0
+    a, b = np.asarray(a, dtype=np.float32), np.asarray(b, dtype=np.float32)
+    norm = float(np.linalg.norm(a) * np.linalg.norm(b))
+    if norm == 0.0:
+        return 1.0
+    return 1.0 - float(np.dot(a, b)) / norm
+
+
+def _clip(text: str, max_tokens: int) -> str:
+    text = " ".join(text.split())
+    chars = max_tokens * 4
+    return text if len(text) <= chars else text[: chars - 3].rstrip() + "..."
+
+
+def summarize_history(
+    messages: List[dict], max_tokens: int, message_tokens: int = 80
+) -> str:
+    """
+    Compact, bounded view of a conversation for the resolution prompt
+
+    Keeps the original issue and as many of the most recent messages as
+    fit in `max_tokens`, each clipped to `message_tokens`; the middle of
+    long threads is reduced to a count. No LLM call, so the prompt size of
+    a follow-up stays flat however long the thread gets.
+
+    Args:
+        messages: [{"role": "customer" | "agent", "content": str}, ...]
+        max_tokens: Rough upper bound on the summary size
+        message_tokens: Cap per message (the original issue gets up to a
+            third of `max_tokens`)
+    """
+    if not messages:
+        return ""
+
+    first = f"Original issue: {_clip(messages[0]['content'], max_tokens // 3)}"
+    budget = max_tokens - estimate_tokens(first)
+
+    recent = []
+    for message in reversed(messages[1:]):
+        role = ROLES.get(message["role"], message["role"])
+        line = f"{role}: {_clip(message['content'], message_tokens)}"
+        cost = estimate_tokens(line)
+        if cost > budget:
+            break
+        recent.append(line)
+        budget -= cost
+
+    omitted = len(messages) - 1 - len(recent)
+    lines = [first]
+    if omitted:
+        lines.append(f"({omitted} earlier messages omitted)")
+    lines.extend(reversed(recent))
+    return "\n".join(lines)
@@ -0,0 +1,122 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Union
+
+import numpy as np
+
+from utils.config import config
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_DIM = 384  # Dimension of all-MiniLM-L6-v2
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def load_encoder(model_name: str = EMBEDDING_MODEL):
+    """
+    Load the sentence-transformers encoder
+
+    Imported lazily so CLI tools and tests that inject their own encoder
+    don't pay for loading torch.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name)
+
+
+class HashingEncoder:
+    """
+    Offline stand-in for SentenceTransformer (feature hashing over words)
+
+    Deterministic and dependency-free, so benchmarks and tests can exercise
+    Qdrant without downloading a model. Exposes the same `encode` signature.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self._buckets = {}  # token -> (index, sign)
+
+    def _bucket(self, token: str):
+        bucket = self._buckets.get(token)
+        if bucket is None:
+            digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            bucket = ((value >> 1) % self.dim, 1.0 if value & 1 else -1.0)
+            self._buckets[token] = bucket
+        return bucket
+
+    def _encode_one(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token in _TOKEN_RE.findall(text.lower()):
+            index, sign = self._bucket(token)
+            vector[index] += sign
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(
+        self, sentences: Union[str, List[str]], batch_size: int = 32, **kwargs
+    ) -> np.ndarray:
+        if isinstance(sentences, str):
+            return self._encode_one(sentences)
+        if not sentences:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([self._encode_one(s) for s in sentences])
+
+
+class EmbeddingCache:
+    """
+    Process-wide LRU of text -> embedding
+
+    Keyed on the exact text, which assumes one embedding model per process.
+    Vectors are stored as read-only float32 arrays to keep entries small.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, text: str, encoder) -> np.ndarray:
+        with self._lock:
+            vector = self._entries.get(text)
+            if vector is not None:
+                self._entries.move_to_end(text)
+                self.hits += 1
+                return vector
+            self.misses += 1
+
+        # Encode outside the lock so concurrent misses don't serialize
+        vector = np.asarray(encoder.encode(text), dtype=np.float32)
+        vector.setflags(write=False)
+
+        with self._lock:
+            self._entries[text] = vector
+            self._entries.move_to_end(text)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+        return vector
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+embedding_cache = EmbeddingCache(config.EMBEDDING_CACHE_SIZE)
@@ -0,0 +1,244 @@
+from utils.config import config
+from utils.logger import logger
+from typing import Dict, Optional
+import asyncio
+import threading
+import weakref
+
+import httpx
+
+# Where each backend is reached; prewarming opens a connection to these
+GROQ_BASE_URL = "https://api.groq.com"
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _PoolMeter:
+    """Request and connection counters for one backend's connection pool"""
+
+    def __init__(self, transport):
+        self._transport = transport
+        # Connections seen so far; a new one means a TCP/TLS handshake
+        self._seen = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+
+    def _connections(self) -> list:
+        # httpcore's pool behind httpx.HTTPTransport / AsyncHTTPTransport
+        pool = getattr(self._transport, "_pool", None)
+        return list(getattr(pool, "connections", None) or [])
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+            for connection in self._connections():
+                if connection not in self._seen:
+                    self._seen.add(connection)
+                    self.connections_opened += 1
+
+    def stats(self, max_connections: int) -> Dict:
+        connections = [c for c in self._connections() if not c.is_closed()]
+        idle = sum(1 for c in connections if c.is_idle())
+        active = len(connections) - idle
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "open": len(connections),
+            "active": active,
+            "idle": idle,
+            "utilization": round(active / max_connections, 3),
+        }
+
+
+class _MeteredTransport(httpx.BaseTransport):
+    def __init__(self, transport: httpx.HTTPTransport):
+        self._transport = transport
+        self.meter = _PoolMeter(transport)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = self._transport.handle_request(request)
+        self.meter.count()
+        return response
+
+    def close(self):
+        self._transport.close()
+
+
+class _AsyncMeteredTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncHTTPTransport):
+        self._transport = transport
+        self.meter = _PoolMeter(transport)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(request)
+        self.meter.count()
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class HttpTransport:
+    """
+    Pooled HTTP clients shared by the Groq, Qdrant and Supabase backends
+
+    One sync and one async httpx client per backend, created on first use
+    and reused by everything that talks to that backend (the three agents
+    share the Groq one). Pool size, keep-alive expiry and HTTP/2 come from
+    HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE, HTTP_KEEPALIVE_EXPIRY and
+    HTTP2 (used only when the h2 package is installed); connect and read
+    timeouts are per backend (HTTP_TIMEOUTS). `prewarm` opens a
+    connection to each configured backend at startup so the first tickets
+    don't pay for the TLS handshake.
+
+    Args:
+        base_urls: backend -> URL to prewarm (defaults to the configured ones)
+    """
+
+    def __init__(
+        self,
+        base_urls: Optional[Dict[str, Optional[str]]] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        timeouts: Optional[Dict[str, dict]] = None,
+    ):
+        self.base_urls = base_urls or {
+            "groq": GROQ_BASE_URL,
+            "qdrant": config.QDRANT_URL,
+            "supabase": config.SUPABASE_URL,
+        }
+        self.max_connections = max_connections or config.HTTP_MAX_CONNECTIONS
+        self.limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=max_keepalive or config.HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=(
+                config.HTTP_KEEPALIVE_EXPIRY
+                if keepalive_expiry is None
+                else keepalive_expiry
+            ),
+        )
+        self.http2 = config.HTTP2 if http2 is None else http2
+        if self.http2 and not _http2_available():
+            logger.warning("HTTP/2 requested but h2 is not installed; using HTTP/1.1")
+            self.http2 = False
+        self.timeouts = timeouts or config.HTTP_TIMEOUTS
+
+        self._clients: Dict[str, httpx.Client] = {}
+        self._async_clients: Dict[str, httpx.AsyncClient] = {}
+        # Pool name ("qdrant", "groq.async", ...) -> metered transport
+        self._transports: Dict[str, httpx.BaseTransport] = {}
+        self._lock = threading.Lock()
+
+    def timeout(self, backend: str) -> httpx.Timeout:
+        """Connect/read timeouts for the backend (other phases use read)"""
+        settings = self.timeouts.get(backend) or self.timeouts.get("default", {})
+        read = settings.get("read", 30.0)
+        return httpx.Timeout(read, connect=settings.get("connect", 5.0))
+
+    def client(self, backend: str) -> httpx.Client:
+        """The backend's shared sync client"""
+        with self._lock:
+            if backend not in self._clients:
+                transport = _MeteredTransport(
+                    httpx.HTTPTransport(limits=self.limits, http2=self.http2)
+                )
+                self._transports[backend] = transport
+                self._clients[backend] = httpx.Client(
+                    transport=transport, timeout=self.timeout(backend)
+                )
+            return self._clients[backend]
+
+    def async_client(self, backend: str) -> httpx.AsyncClient:
+        """The backend's shared async client"""
+        with self._lock:
+            if backend not in self._async_clients:
+                transport = _AsyncMeteredTransport(
+                    httpx.AsyncHTTPTransport(limits=self.limits, http2=self.http2)
+                )
+                self._transports[f"{backend}.async"] = transport
+                self._async_clients[backend] = httpx.AsyncClient(
+                    transport=transport, timeout=self.timeout(backend)
+                )
+            return self._async_clients[backend]
+
+    def transport(self, backend: str) -> httpx.BaseTransport:
+        """
+        The pooled transport behind the backend's sync client, for SDKs
+        that build their own httpx.Client but accept a `transport`
+        """
+        self.client(backend)
+        return self._transports[backend]
+
+    def _targets(self) -> Dict[str, str]:
+        return {backend: url for backend, url in self.base_urls.items() if url}
+
+    def prewarm(self) -> Dict[str, bool]:
+        """Open a pooled connection to each configured backend"""
+        warmed = {}
+        for backend, url in self._targets().items():
+            try:
+                # Any response means the connection (and TLS session) is up
+                self.client(backend).head(url)
+                warmed[backend] = True
+            except httpx.HTTPError as e:
+                logger.warning(f"Prewarming {backend} failed: {e}")
+                warmed[backend] = False
+        logger.info(f"HTTP connections prewarmed: {warmed}")
+        return warmed
+
+    async def aprewarm(self) -> Dict[str, bool]:
+        """Open a pooled async connection to each configured backend"""
+
+        async def warm(backend: str, url: str) -> bool:
+            try:
+                await self.async_client(backend).head(url)
+                return True
+            except httpx.HTTPError as e:
+                logger.warning(f"Prewarming async {backend} failed: {e}")
+                return False
+
+        targets = self._targets()
+        results = await asyncio.gather(*(warm(b, u) for b, u in targets.items()))
+        return dict(zip(targets, results))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            transports = dict(self._transports)
+        return {
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "pools": {
+                name: transport.meter.stats(self.max_connections)
+                for name, transport in transports.items()
+            },
+        }
+
+    def close(self):
+        with self._lock:
+            clients, self._clients = self._clients, {}
+            for backend in clients:
+                self._transports.pop(backend, None)
+        for client in clients.values():
+            client.close()
+
+    async def aclose(self):
+        with self._lock:
+            clients, self._async_clients = self._async_clients, {}
+            for backend in clients:
+                self._transports.pop(f"{backend}.async", None)
+        for client in clients.values():
+            await client.aclose()
+
+
+# Shared by every backend in the process
+http_transport = HttpTransport()
@@ -1,14 +1,196 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from loguru import logger
+import json
+import queue
+import random
 import sys
+import threading
 from utils.config import config
 
-# Configure logger
-logger.remove()  # Remove default handler
-logger.add(
-    sys.stdout,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>",
-    level=config.LOG_LEVEL,
+# Per-ticket sampling decision, so a kept ticket keeps all of its lines
+_ticket_sampled: ContextVar = ContextVar("ticket_sampled", default=None)
+
+TEXT_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | "
+    "<magenta>{extra[ticket_id]}</magenta>:<magenta>{extra[stage]}</magenta> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>"
 )
 
+
+def _json_format(record) -> str:
+    """One compact JSON object per line with the bound ticket context"""
+    payload = {
+        "ts": record["time"].isoformat(),
+        "level": record["level"].name,
+        "logger": record["name"],
+        "function": record["function"],
+        "message": record["message"],
+        **{k: v for k, v in record["extra"].items() if not k.startswith("_")},
+    }
+    if record["exception"] is not None:
+        payload["exception"] = repr(record["exception"].value)
+
+    record["extra"]["_json"] = json.dumps(payload, default=str, ensure_ascii=False)
+    return "{extra[_json]}\n"
+
+
+class BackgroundWriter:
+    """
+    Loguru sink that hands formatted lines to a writer thread
+
+    loguru's own `enqueue=True` pickles every record through a
+    multiprocessing queue, which costs the caller more than writing
+    directly. This sink only does a queue put. When the queue is full,
+    lines below WARNING are dropped and counted; warnings and errors wait.
+    """
+
+    def __init__(self, stream, max_queue: int = 10000):
+        self.stream = stream
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, message):
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            if message.record["level"].no >= 30:
+                self._queue.put(message)
+            else:
+                self.dropped += 1
+
+    def _run(self):
+        while True:
+            lines = [self._queue.get()]
+            # Drain whatever else is queued so a burst becomes one write
+            while len(lines) < 512:
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = lines[-1] is None
+            text = "".join(line for line in lines if line is not None)
+            if text:
+                self.stream.write(text)
+                self.stream.flush()
+            for _ in lines:
+                self._queue.task_done()
+            if stop:
+                return
+
+    def drain(self):
+        """Block until every queued line has been written"""
+        self._queue.join()
+
+    def stop(self):
+        # Called by loguru when the handler is removed
+        self._queue.put(None)
+        self._thread.join()
+
+
+class HotPathLogger:
+    """
+    Sampled INFO/SUCCESS/DEBUG logging for per-ticket messages
+
+    Inside `ticket_context` the whole ticket is either kept or dropped;
+    elsewhere each message is sampled on its own. The level and sampling
+    checks happen before loguru is called, so a dropped message is never
+    formatted. Pass
+    arguments loguru-style (`hot_logger.info("x={}", x)`) rather than as
+    f-strings so formatting is deferred too. Warnings and errors should go
+    through `logger` directly; they are never sampled.
+    """
+
+    LEVELS = ("DEBUG", "INFO", "SUCCESS")
+
+    def __init__(self):
+        self.sample_rate = 1.0
+        self._enabled = {name: True for name in self.LEVELS}
+
+    def configure(self, level: str, sample_rate: float):
+        self.sample_rate = sample_rate
+        min_level = logger.level(level).no
+        self._enabled = {
+            name: logger.level(name).no >= min_level for name in self.LEVELS
+        }
+
+    def _emit(self, level: str, message: str, args, kwargs):
+        if not self._enabled[level]:
+            return
+        sampled = _ticket_sampled.get()
+        if sampled is None:
+            sampled = self.sample_rate >= 1.0 or random.random() < self.sample_rate
+        if sampled:
+            logger.opt(depth=2).log(level, message, *args, **kwargs)
+
+    def debug(self, message: str, *args, **kwargs):
+        self._emit("DEBUG", message, args, kwargs)
+
+    def info(self, message: str, *args, **kwargs):
+        self._emit("INFO", message, args, kwargs)
+
+    def success(self, message: str, *args, **kwargs):
+        self._emit("SUCCESS", message, args, kwargs)
+
+
+hot_logger = HotPathLogger()
+
+
+@contextmanager
+def ticket_context(ticket_id: str):
+    """Bind ticket_id to every record and make one sampling decision per ticket"""
+    sampled = hot_logger.sample_rate >= 1.0 or random.random() < hot_logger.sample_rate
+    token = _ticket_sampled.set(sampled)
+    try:
+        with logger.contextualize(ticket_id=ticket_id):
+            yield
+    finally:
+        _ticket_sampled.reset(token)
+
+
+def configure_logging(
+    sink=None,
+    level: str = None,
+    json_output: bool = None,
+    enqueue: bool = None,
+    sample_rate: float = None,
+):
+    """
+    (Re)configure the global logger; defaults come from config
+
+    Returns:
+        The BackgroundWriter when enqueued (call `drain()` to flush), else None
+    """
+    level = level or config.LOG_LEVEL
+    json_output = config.LOG_JSON if json_output is None else json_output
+    enqueue = config.LOG_ENQUEUE if enqueue is None else enqueue
+    sample_rate = config.LOG_SAMPLE_RATE if sample_rate is None else sample_rate
+
+    stream = sink or sys.stdout
+    colorize = not json_output and stream.isatty()
+
+    # A background thread writes records so the ticket path never blocks on I/O
+    writer = BackgroundWriter(stream) if enqueue else None
+
+    logger.remove()  # Remove default handler
+    logger.configure(extra={"ticket_id": "-", "stage": "-"})
+    logger.add(
+        writer or stream,
+        format=_json_format if json_output else TEXT_FORMAT,
+        level=level,
+        colorize=colorize,
+    )
+    hot_logger.configure(level, sample_rate)
+    return writer
+
+
+# Configure logger
+configure_logging()
+
 # Export logger
-__all__ = ["logger"]
+__all__ = ["logger", "hot_logger", "ticket_context", "configure_logging"]
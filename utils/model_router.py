@@ -0,0 +1,205 @@
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_groq import ChatGroq
+from utils.config import config
+from utils.http_transport import http_transport
+from utils.logger import hot_logger
+from utils.structured_output import StructuredOutput
+from utils.tokens import estimate_tokens
+from typing import Callable, Dict, List, Optional
+import threading
+import time
+
+
+class RoutedResult:
+    """
+    Outcome of a routed LLM call
+
+    Attributes:
+        response: The last model response
+        result: Parsed output, or None when no model's output parsed
+        calls: One record per model call (agent, model, latency_ms, outcome,
+            input_tokens, output_tokens)
+    """
+
+    __slots__ = ("response", "result", "calls")
+
+    def __init__(self, response, result: Optional[dict], calls: List[dict]):
+        self.response = response
+        self.result = result
+        self.calls = calls
+
+
+class ModelRouter:
+    """
+    Picks the Groq model for each agent call and escalates on bad output
+
+    Each agent has an ordered list of models in `config.MODEL_ROUTES`
+    (resolution routes are keyed by priority, e.g. "resolution.low").
+    The first model is tried, and the next one is used when the output
+    doesn't parse or the agent's `accept` check rejects it (for example
+    low confidence). Whatever the last model returns is used as is,
+    except that output a StructuredOutput parser still can't read is
+    re-asked once on the last model (STRUCTURED_OUTPUT_REASK).
+
+    Args:
+        llm: Use this chat model for every route (tests and benchmarks)
+        llm_factory: Callable (model, temperature) -> chat model
+    """
+
+    def __init__(self, llm=None, llm_factory: Optional[Callable] = None):
+        self._llm = llm
+        self._factory = llm_factory or self._groq
+        self._clients: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _groq(model: str, temperature: float):
+        # Every routed prompt asks for a JSON object
+        model_kwargs = (
+            {"response_format": {"type": "json_object"}} if config.LLM_JSON_MODE else {}
+        )
+        # Every model on every route shares the pooled Groq connections
+        return ChatGroq(
+            api_key=config.GROQ_API_KEY,
+            model=model,
+            temperature=temperature,
+            model_kwargs=model_kwargs,
+            request_timeout=http_transport.timeout("groq"),
+            http_client=http_transport.client("groq"),
+            http_async_client=http_transport.async_client("groq"),
+        )
+
+    def client(self, model: str, temperature: float):
+        """Chat model for (model, temperature), created once and reused"""
+        if self._llm is not None:
+            return self._llm
+        key = (model, temperature)
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = self._factory(model, temperature)
+            return self._clients[key]
+
+    def _call(self, agent: str, model: str, temperature: float, messages: list):
+        """The single place a chat model is invoked (hook for recording)"""
+        return self.client(model, temperature).invoke(messages)
+
+    @staticmethod
+    def usage(messages: list, response) -> Dict[str, int]:
+        """Token usage from the response metadata, estimated if it has none"""
+        usage = getattr(response, "usage_metadata", None) or {}
+        input_tokens = usage.get("input_tokens")
+        if input_tokens is None:
+            input_tokens = estimate_tokens("\n".join(m.content for m in messages))
+        output_tokens = usage.get("output_tokens")
+        if output_tokens is None:
+            output_tokens = estimate_tokens(response.content)
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens}
+
+    @staticmethod
+    def route(agent: str, priority: Optional[str] = None) -> List[str]:
+        routes = config.MODEL_ROUTES
+        if priority and f"{agent}.{priority}" in routes:
+            return routes[f"{agent}.{priority}"]
+        return routes.get(agent) or [config.GROQ_MODEL]
+
+    def invoke(
+        self,
+        agent: str,
+        messages: list,
+        parse: Callable[[str], dict],
+        temperature: float = 0.0,
+        priority: Optional[str] = None,
+        accept: Optional[Callable[[dict], bool]] = None,
+    ) -> RoutedResult:
+        """
+        Call the agent's models in order until one gives acceptable output
+
+        Args:
+            agent: Route name ("triage", "resolution", "escalation")
+            messages: Chat messages to send
+            parse: Turns response text into a dict; raises ValueError,
+                KeyError or TypeError on malformed output
+            temperature: Sampling temperature for every model on the route
+            priority: Ticket priority, selects a tiered route if configured
+            accept: Optional check on the parsed output; False escalates
+
+        Returns:
+            RoutedResult with the response, parsed result and per-call records
+        """
+        models = self.route(agent, priority)
+        calls = []
+        response = result = None
+
+        for i, model in enumerate(models):
+            start = time.perf_counter()
+            response = self._call(agent, model, temperature, messages)
+            call = {
+                "agent": agent,
+                "model": model,
+                "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+                **self.usage(messages, response),
+            }
+            calls.append(call)
+            last = i == len(models) - 1
+
+            try:
+                result = parse(response.content)
+            except (ValueError, KeyError, TypeError):
+                call["outcome"] = "parse_failed"
+                result = None
+            else:
+                accepted = accept is None or accept(result)
+                call["outcome"] = "ok" if accepted else "rejected"
+                if accepted or last:
+                    break
+
+            if not last:
+                hot_logger.info(
+                    "{} output from {} {}, escalating to {}",
+                    agent,
+                    model,
+                    call["outcome"],
+                    models[i + 1],
+                )
+
+        if result is None and self._reask(parse, response):
+            response, result = self._reask_last(
+                agent, models[-1], temperature, messages, parse, response, calls
+            )
+
+        return RoutedResult(response, result, calls)
+
+    @staticmethod
+    def _reask(parse: Callable, response) -> bool:
+        return (
+            config.STRUCTURED_OUTPUT_REASK
+            and isinstance(parse, StructuredOutput)
+            and response is not None
+        )
+
+    def _reask_last(self, agent, model, temperature, messages, parse, bad, calls):
+        """Show the last model its unreadable reply and ask for the JSON only"""
+        hot_logger.info("{} output unreadable, re-asking {}", agent, model)
+        parse.record("reasked")
+        messages = messages + [
+            AIMessage(content=bad.content),
+            HumanMessage(content=parse.reask_prompt()),
+        ]
+        start = time.perf_counter()
+        response = self._call(agent, model, temperature, messages)
+        call = {
+            "agent": agent,
+            "model": model,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            **self.usage(messages, response),
+            "reask": True,
+        }
+        calls.append(call)
+        try:
+            result = parse(response.content)
+        except (ValueError, KeyError, TypeError):
+            call["outcome"] = "parse_failed"
+            return response, None
+        call["outcome"] = "ok"
+        parse.record("recovered")
+        return response, result
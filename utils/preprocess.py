@@ -0,0 +1,209 @@
+"""
+Ticket text normalization ahead of the LLM agents
+
+Email tickets carry quoted reply chains, signatures, legal footers and
+HTML that the agents don't need. `clean_ticket` removes them with a
+handful of precompiled regexes (no parsing library), collapses
+whitespace, and caps the length by keeping the most informative
+sentences. The original text is left untouched for storage.
+"""
+
+from utils.config import config
+from utils.tokens import estimate_tokens
+from typing import Dict, List, Optional, Tuple
+import html
+import re
+import time
+
+_HTML_TAG_RE = re.compile(r"<(?:[a-zA-Z][\w:-]*|/[a-zA-Z][\w:-]*)(?:\s[^<>]*)?/?>")
+# What makes a ticket HTML: a common tag or any closing tag. Tracebacks
+# and error messages have `<stdin>` or `<module>`, which are not
+_HTML_DOC_RE = re.compile(
+    r"<(?:html|head|body|div|p|br|span|table|tr|td|ul|ol|li|a|b|i|strong|em|font"
+    r"|img|hr|h\d|blockquote)\b[^<>]*/?>|</[a-zA-Z][\w:-]*\s*>",
+    re.I,
+)
+_HTML_DROP_RE = re.compile(
+    r"<(script|style|head|blockquote)\b[^>]*>.*?</\1\s*>", re.I | re.S
+)
+_HTML_BREAK_RE = re.compile(r"<(?:br|/p|/div|/li|/tr|/h\d)\b[^>]*>", re.I)
+_HTML_COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+
+# Everything from the first of these lines on is earlier correspondence
+_QUOTE_MARKER_RE = re.compile(
+    r"^(?:"
+    r"on\b.{0,200}\bwrote:\s*$"
+    r"|-{2,}\s*original message\s*-{2,}"
+    r"|-{2,}\s*forwarded message\s*-{2,}"
+    r"|begin forwarded message:"
+    r"|_{10,}\s*$"
+    r"|from:\s.+\n(?:.+\n){0,3}?(?:sent|date):\s"
+    r")",
+    re.I | re.M,
+)
+_QUOTED_LINE_RE = re.compile(r"^\s*>.*$\n?", re.M)
+
+_SIG_DELIMITER_RE = re.compile(r"^-- ?$", re.M)
+_SIGN_OFF_RE = re.compile(
+    r"^(?:thanks|thank you|many thanks|thx|regards|best|best regards|kind regards"
+    r"|warm regards|cheers|sincerely|yours truly|all the best)[,.!]?\s*$",
+    re.I | re.M,
+)
+# Lines of a name or contact block: short, no sentences, no problem words
+_SIGNATURE_MAX_LINES = 8
+_SIGNATURE_LINE_CHARS = 60
+_SENTENCE_END_RE = re.compile(r"[.!?](?:\s|$)")
+_PROBLEM_RE = re.compile(
+    r"\b(?:error|fail\w*|can'?t|cannot|unable|not working|doesn'?t|won'?t"
+    r"|broken|crash\w*|charged?|refund|urgent|asap|login|log in|password)\b",
+    re.I,
+)
+_SENT_FROM_RE = re.compile(r"^\s*sent from my \w+.*$", re.I | re.M)
+
+_DISCLAIMER_RE = re.compile(
+    r"(?:is|are|strictly|contains?|may contain) confidential"
+    r"|confidential (?:and|or|and/or) privileged"
+    r"|intended (?:solely )?for the (?:use of the )?(?:named )?"
+    r"(?:addressee|recipient)"
+    r"|intended recipient|received this (?:e-?mail|message) in error"
+    r"|this (?:e-?mail|message) and any attachments"
+    r"|to unsubscribe|please consider the environment",
+    re.I,
+)
+
+_SENTENCE_RE = re.compile(r"[^.!?\n]+(?:[.!?]+|\n|$)")
+_INFORMATIVE_RE = re.compile(
+    r"\?|\b(?:error|fail\w*|can'?t|cannot|unable|not working|doesn'?t|won'?t"
+    r"|broken|crash\w*|charged?|refund|invoice|urgent|asap|login|log in"
+    r"|password|account|since|after|when)\b|\d",
+    re.I,
+)
+
+
+def _strip_html(text: str) -> str:
+    text = _HTML_COMMENT_RE.sub("", text)
+    text = _HTML_DROP_RE.sub("", text)
+    text = _HTML_BREAK_RE.sub("\n", text)
+    text = _HTML_TAG_RE.sub("", text)
+    return html.unescape(text)
+
+
+def _cut(text: str, match: Optional[re.Match]) -> Tuple[str, bool]:
+    """Text before `match`, unless that would leave nothing"""
+    if match is None or not text[: match.start()].strip():
+        return text, False
+    return text[: match.start()], True
+
+
+def _is_signature(text: str) -> bool:
+    """Whether what follows a sign-off is a name/contact block (and footers)"""
+    lines = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        if not _DISCLAIMER_RE.search(paragraph):
+            lines += [line.strip() for line in paragraph.splitlines() if line.strip()]
+    return len(lines) <= _SIGNATURE_MAX_LINES and not any(
+        len(line) > _SIGNATURE_LINE_CHARS
+        or _SENTENCE_END_RE.search(line)
+        or _PROBLEM_RE.search(line)
+        for line in lines
+    )
+
+
+def _drop_sign_off(text: str) -> Tuple[str, bool]:
+    # Only a sign-off followed by nothing but a signature starts one;
+    # "Thanks!" before the actual complaint does not
+    matches = list(_SIGN_OFF_RE.finditer(text))
+    if not matches or not _is_signature(text[matches[-1].end() :]):
+        return text, False
+    return _cut(text, matches[-1])
+
+
+def _drop_disclaimers(text: str) -> Tuple[str, bool]:
+    # The first paragraph is the customer's, whatever it says
+    first, *rest = re.split(r"\n\s*\n", text)
+    kept = [p for p in rest if not _DISCLAIMER_RE.search(p)]
+    return "\n\n".join([first, *kept]), len(kept) < len(rest)
+
+
+def _collapse_whitespace(text: str) -> str:
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    text = "\n".join(lines)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def _keep_informative(text: str, max_tokens: int) -> str:
+    """The highest-scoring sentences that fit, in their original order"""
+    sentences = [s.strip() for s in _SENTENCE_RE.findall(text) if s.strip()]
+    scored = []
+    for i, sentence in enumerate(sentences):
+        score = len(_INFORMATIVE_RE.findall(sentence))
+        # The opening usually states the problem
+        score += 2 if i < 2 else 0
+        scored.append((score, -i, sentence))
+
+    chosen, used = set(), 0
+    for score, neg_i, sentence in sorted(scored, reverse=True):
+        tokens = estimate_tokens(sentence) + 1
+        if used + tokens > max_tokens:
+            continue
+        chosen.add(-neg_i)
+        used += tokens
+    if not chosen:
+        return text[: max_tokens * 4]
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+
+def clean_ticket(text: str, max_tokens: Optional[int] = None) -> Tuple[str, Dict]:
+    """
+    Normalize ticket text for the agents
+
+    Args:
+        text: Raw ticket text (plain or HTML email)
+        max_tokens: Length cap (default PREPROCESS_MAX_TOKENS; 0 = none)
+
+    Returns:
+        (cleaned text, info with original/cleaned token counts, what was
+        removed, whether it was capped, and the time taken)
+    """
+    start = time.perf_counter()
+    max_tokens = config.PREPROCESS_MAX_TOKENS if max_tokens is None else max_tokens
+    removed: List[str] = []
+    cleaned = text.replace("\r\n", "\n")
+
+    if _HTML_DOC_RE.search(cleaned):
+        cleaned = _strip_html(cleaned)
+        removed.append("html")
+
+    cleaned, cut = _cut(cleaned, _QUOTE_MARKER_RE.search(cleaned))
+    without_quotes = _QUOTED_LINE_RE.sub("", cleaned)
+    if cut or (without_quotes != cleaned and without_quotes.strip()):
+        cleaned = without_quotes
+        removed.append("quoted")
+
+    cleaned, cut = _cut(cleaned, _SIG_DELIMITER_RE.search(cleaned))
+    cleaned, signed = _drop_sign_off(cleaned)
+    without_sent_from = _SENT_FROM_RE.sub("", cleaned)
+    if cut or signed or without_sent_from != cleaned:
+        cleaned = without_sent_from
+        removed.append("signature")
+
+    cleaned, dropped = _drop_disclaimers(cleaned)
+    if dropped:
+        removed.append("disclaimer")
+
+    cleaned = _collapse_whitespace(cleaned)
+    if not cleaned:
+        # Nothing recognizable survived; fall back to the raw text
+        cleaned = _collapse_whitespace(text)
+
+    truncated = bool(max_tokens) and estimate_tokens(cleaned) > max_tokens
+    if truncated:
+        cleaned = _keep_informative(cleaned, max_tokens)
+
+    return cleaned, {
+        "original_tokens": estimate_tokens(text),
+        "tokens": estimate_tokens(cleaned),
+        "removed": removed,
+        "truncated": truncated,
+        "ms": round((time.perf_counter() - start) * 1000, 3),
+    }
@@ -0,0 +1,276 @@
+"""
+On-demand sampling profiler for single tickets
+
+A profiled ticket gets a background thread that snapshots the Python stack
+of whichever thread is running one of its graph nodes every few
+milliseconds (`sys._current_frames`, so no tracing hooks and no extra
+dependency). Each graph node also records its wall and CPU time. Finished
+profiles are kept in memory under an id and exported as collapsed stacks
+(flamegraph.pl / speedscope import) or speedscope JSON.
+
+Nothing is sampled or timed for tickets outside `Profiler.scope`; the
+only cost left on the normal path is one ContextVar lookup per node.
+"""
+
+from collections import Counter, OrderedDict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from utils.config import config
+from utils.logger import logger
+from typing import Dict, List, Optional
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+_profile: ContextVar = ContextVar("ticket_profile", default=None)
+
+_NOT_PROFILING = nullcontext()
+
+# Frames from these files are the profiler itself, not the ticket
+_OWN_FILES = {os.path.abspath(__file__), threading.__file__}
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+def _collapse(frame, root: str) -> str:
+    """Root-first `a;b;c` stack for a frame, below a synthetic root"""
+    names = []
+    while frame is not None:
+        if frame.f_code.co_filename not in _OWN_FILES:
+            names.append(_frame_name(frame))
+        frame = frame.f_back
+    names.append(root)
+    return ";".join(reversed(names))
+
+
+class Profile:
+    """Samples and per-node timings collected for one ticket"""
+
+    def __init__(self, ticket_id: str, trigger: str, interval_ms: float):
+        self.id = f"PROF-{str(uuid.uuid4())[:8].upper()}"
+        self.ticket_id = ticket_id
+        self.trigger = trigger
+        self.interval_ms = interval_ms
+        self.started_at = time.time()
+        self.wall_ms = None
+        self.stages: Dict[str, dict] = {}
+        self.samples: Counter = Counter()
+        self._threads: Dict[int, str] = {}  # thread id -> running stage
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(
+            target=self._run, name=f"profiler-{self.id}", daemon=True
+        )
+
+    def _run(self):
+        interval = self.interval_ms / 1000
+        while not self._stop.wait(interval):
+            with self._lock:
+                threads = dict(self._threads)
+            if not threads:
+                continue
+            frames = sys._current_frames()
+            for thread_id, stage in threads.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.samples[_collapse(frame, f"stage:{stage}")] += 1
+
+    def start(self):
+        self._sampler.start()
+
+    def finish(self):
+        self._stop.set()
+        self._sampler.join()
+        self.wall_ms = round((time.time() - self.started_at) * 1000, 3)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Sample the calling thread and time it while it runs a node"""
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._threads[thread_id] = name
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._threads.pop(thread_id, None)
+            # A node retried by the graph accumulates into the same entry
+            timing = self.stages.setdefault(
+                name, {"wall_ms": 0.0, "cpu_ms": 0.0, "runs": 0}
+            )
+            timing["wall_ms"] += round((time.perf_counter() - wall) * 1000, 3)
+            timing["cpu_ms"] += round((time.thread_time() - cpu) * 1000, 3)
+            timing["runs"] += 1
+
+    def summary(self) -> dict:
+        return {
+            "profile_id": self.id,
+            "ticket_id": self.ticket_id,
+            "trigger": self.trigger,
+            "started_at": self.started_at,
+            "wall_ms": self.wall_ms,
+            "cpu_ms": round(sum(s["cpu_ms"] for s in self.stages.values()), 3),
+            "interval_ms": self.interval_ms,
+            "sample_count": sum(self.samples.values()),
+        }
+
+    def to_dict(self, top: int = 20) -> dict:
+        return {
+            **self.summary(),
+            "stages": self.stages,
+            "top_stacks": [
+                {"stack": stack, "samples": count}
+                for stack, count in self.samples.most_common(top)
+            ],
+        }
+
+    def to_collapsed(self) -> str:
+        """One `frame;frame;frame count` line per distinct stack"""
+        return "".join(
+            f"{stack} {count}\n" for stack, count in sorted(self.samples.items())
+        )
+
+    def to_speedscope(self) -> dict:
+        frames: List[dict] = []
+        index: Dict[str, int] = {}
+        samples, weights = [], []
+        for stack, count in self.samples.items():
+            ids = []
+            for name in stack.split(";"):
+                if name not in index:
+                    index[name] = len(frames)
+                    frames.append({"name": name})
+                ids.append(index[name])
+            samples.append(ids)
+            weights.append(count * self.interval_ms)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.ticket_id} ({self.id})",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": self.ticket_id,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": self.wall_ms or 0,
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+def profile_stage(name: str):
+    """Context manager for a graph node; does nothing unless profiling"""
+    profile = _profile.get()
+    return profile.stage(name) if profile is not None else _NOT_PROFILING
+
+
+class Profiler:
+    """
+    Decides which tickets to profile and keeps the finished profiles
+
+    A ticket is profiled when explicitly requested or, failing that, with
+    probability `sample_rate`. At most `max_concurrent` tickets are
+    profiled at once; requests beyond that run unprofiled. The newest
+    `keep` profiles are retained.
+    """
+
+    def __init__(
+        self,
+        sample_rate: Optional[float] = None,
+        max_concurrent: Optional[int] = None,
+        interval_ms: Optional[float] = None,
+        keep: Optional[int] = None,
+    ):
+        self.sample_rate = (
+            config.PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+        )
+        self.max_concurrent = max_concurrent or config.PROFILE_MAX_CONCURRENT
+        self.interval_ms = interval_ms or config.PROFILE_INTERVAL_MS
+        self.keep = keep or config.PROFILE_KEEP
+
+        self.active = 0
+        self._profiles: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"profiled": 0, "skipped_at_capacity": 0}
+
+    def _trigger(self, requested: bool) -> Optional[str]:
+        if requested:
+            return "requested"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    @contextmanager
+    def scope(self, ticket_id: str, requested: bool = False):
+        """
+        Profile the graph nodes run inside this block
+
+        Yields:
+            The Profile, or None when the ticket isn't profiled
+        """
+        trigger = self._trigger(requested)
+        if trigger is None:
+            yield None
+            return
+
+        with self._lock:
+            if self.active >= self.max_concurrent:
+                self.counters["skipped_at_capacity"] += 1
+                trigger = None
+            else:
+                self.active += 1
+        if trigger is None:
+            yield None
+            return
+
+        profile = Profile(ticket_id, trigger, self.interval_ms)
+        profile.start()
+        token = _profile.set(profile)
+        try:
+            yield profile
+        finally:
+            _profile.reset(token)
+            profile.finish()
+            with self._lock:
+                self.active -= 1
+                self.counters["profiled"] += 1
+                self._profiles[profile.id] = profile
+                while len(self._profiles) > self.keep:
+                    self._profiles.popitem(last=False)
+            logger.info(
+                "🔬 Profiled {} as {} ({} samples)",
+                ticket_id,
+                profile.id,
+                sum(profile.samples.values()),
+            )
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[dict]:
+        with self._lock:
+            profiles = list(self._profiles.values())
+        return [p.summary() for p in reversed(profiles)]
+
+    def stats(self) -> Dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "active": self.active,
+            "max_concurrent": self.max_concurrent,
+            "stored": len(self._profiles),
+            **self.counters,
+        }
@@ -18,6 +18,28 @@ Output format (JSON):
 }
 """
 
+# Several tickets triaged in one call (agents/triage_batcher.py)
+TRIAGE_BATCH_SYSTEM_PROMPT = """You are a customer support triage specialist.
+
+Your job: Analyze each support ticket and extract:
+1. Category (technical, billing, general, feature_request)
+2. Priority (low, medium, high, urgent)
+3. Keywords (3-5 relevant words)
+
+Rules:
+- Be concise and accurate
+- Use only the categories and priorities listed
+- Extract keywords that help search documentation
+- Analyze every ticket on its own, one result per ticket id
+
+Output format (JSON):
+{
+    "results": [
+        {"id": "ticket_id", "category": "category_name", "priority": "priority_level", "keywords": ["keyword1", "keyword2", "keyword3"]}
+    ]
+}
+"""
+
 KNOWLEDGE_SYSTEM_PROMPT = """You are a knowledge retrieval specialist.
 
 Your job: Search documentation and find relevant information.
@@ -69,3 +91,38 @@ Track:
 - Agent performance
 
 Output metrics in structured format."""
+
+# Ticket text the resolution agent sees for a follow-up message
+FOLLOWUP_TICKET_TEMPLATE = """CONVERSATION SO FAR:
+{summary}
+
+LATEST CUSTOMER MESSAGE:
+{message}"""
+
+# Customer-facing replies used when the pipeline is overloaded (no LLM)
+DEGRADED_ANSWER_TEMPLATE = """Thanks for reaching out! This article should help:
+
+{content}
+
+If it doesn't solve the problem, reply to this ticket and a support agent will follow up."""
+
+DEGRADED_ESCALATION_MESSAGE = """Thanks for reaching out! We've received your ticket and a support agent will follow up shortly."""
+
+# Offline, one call per document chunk (database/knowledge_digest.py)
+DIGEST_SYSTEM_PROMPT = """You are a technical writer condensing support documentation.
+
+Your job: Write a compact digest of one documentation article that a support agent can answer from.
+
+Rules:
+- Keep every step the customer has to take, in order, in few words
+- Keep concrete facts: numbers, time frames, limits, settings paths, addresses
+- Keep every link and email address exactly as written
+- Leave out greetings, marketing and repetition
+
+Output format (JSON):
+{
+    "key_steps": ["step 1", "step 2"],
+    "facts": ["fact 1", "fact 2"],
+    "links": ["https://..."]
+}
+"""
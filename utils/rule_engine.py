@@ -0,0 +1,181 @@
+from collections import Counter
+from utils.logger import logger
+from typing import Dict, List, Optional
+import json
+import os
+import re
+import threading
+import time
+import yaml
+
+CONDITIONS = {
+    "phrases",
+    "category",
+    "priority",
+    "confidence_below",
+    "confidence_at_least",
+}
+
+
+def _normalize(phrase: str) -> str:
+    return " ".join(phrase.lower().split())
+
+
+class Rule:
+    __slots__ = ("name", "phrases", "category", "priority", "low", "high", "decision")
+
+    def __init__(self, spec: dict):
+        when = spec.get("when") or {}
+        unknown = set(when) - CONDITIONS
+        if unknown:
+            raise ValueError(f"Rule {spec.get('name')}: unknown conditions {unknown}")
+
+        self.name = spec["name"]
+        self.phrases = frozenset(_normalize(p) for p in when.get("phrases", []))
+        self.category = frozenset(when.get("category", []))
+        self.priority = frozenset(when.get("priority", []))
+        self.low = when.get("confidence_below")
+        self.high = when.get("confidence_at_least")
+        self.decision = {"escalate": bool(spec["escalate"]), "reason": spec["reason"]}
+
+    def matches(self, found: set, facts: dict) -> bool:
+        if self.phrases and self.phrases.isdisjoint(found):
+            return False
+        if self.category and facts["category"] not in self.category:
+            return False
+        if self.priority and facts["priority"] not in self.priority:
+            return False
+        confidence = facts["confidence"]
+        if self.low is not None and not (
+            confidence is not None and confidence < self.low
+        ):
+            return False
+        if self.high is not None and not (
+            confidence is not None and confidence >= self.high
+        ):
+            return False
+        return True
+
+
+class RuleSet:
+    """Parsed rules plus one regex that finds every phrase in a single pass"""
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        phrases = sorted({p for rule in rules for p in rule.phrases}, key=len)
+        self.pattern = None
+        if phrases:
+            alternation = "|".join(
+                r"\s+".join(map(re.escape, p.split())) for p in reversed(phrases)
+            )
+            # Tried only at word starts; the lookahead is zero-width so
+            # overlapping phrases ("speak to a human agent") are all reported
+            self.pattern = re.compile(rf"\b(?=({alternation})\b)", re.IGNORECASE)
+
+    def find_phrases(self, text: str) -> set:
+        if self.pattern is None:
+            return set()
+        return {_normalize(m.group(1)) for m in self.pattern.finditer(text)}
+
+    @classmethod
+    def from_file(cls, path: str) -> "RuleSet":
+        with open(path) as f:
+            if path.endswith(".json"):
+                spec = json.load(f)
+            else:
+                spec = yaml.safe_load(f)
+        return cls([Rule(rule) for rule in (spec or {}).get("rules", [])])
+
+
+class RuleEngine:
+    """
+    Declarative decision rules loaded from YAML or JSON, reloaded on change
+
+    Rules are checked in file order and the first one whose conditions all
+    hold decides. The file's mtime is checked at most every
+    `reload_interval` seconds; a file that fails to parse is logged and the
+    previous rules stay active.
+
+    Args:
+        path: Rules file (.yaml, .yml or .json)
+        reload_interval: Seconds between mtime checks
+    """
+
+    def __init__(self, path: str, reload_interval: float = 2.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0.0
+        self.ruleset = RuleSet([])
+
+        self.hits: Counter = Counter()
+        self.undecided = 0
+        self.match_seconds = 0.0
+        self._reload()
+
+    def _reload(self):
+        self._checked_at = time.monotonic()
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            logger.warning(f"Rules file not found: {self.path}")
+            return
+        if mtime == self._mtime:
+            return
+
+        self._mtime = mtime
+        try:
+            self.ruleset = RuleSet.from_file(self.path)
+            logger.info(f"Loaded {len(self.ruleset.rules)} rules from {self.path}")
+        except Exception as e:
+            logger.error(f"Invalid rules file {self.path}, keeping previous: {e}")
+
+    def decide(
+        self,
+        text: str,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        confidence: Optional[float] = None,
+    ) -> Optional[Dict]:
+        """
+        Apply the rules to one ticket
+
+        Returns:
+            dict with escalate, reason and rule name, or None when no rule decides
+        """
+        start = time.perf_counter()
+        if time.monotonic() - self._checked_at >= self.reload_interval:
+            with self._lock:
+                if time.monotonic() - self._checked_at >= self.reload_interval:
+                    self._reload()
+
+        ruleset = self.ruleset
+        facts = {"category": category, "priority": priority, "confidence": confidence}
+        found = ruleset.find_phrases(text)
+        decided = next((r for r in ruleset.rules if r.matches(found, facts)), None)
+
+        with self._lock:
+            self.match_seconds += time.perf_counter() - start
+            if decided is None:
+                self.undecided += 1
+                return None
+            self.hits[decided.name] += 1
+
+        reason = decided.decision["reason"].format(
+            confidence=confidence or 0.0, category=category, priority=priority
+        )
+        return {**decided.decision, "reason": reason, "rule": decided.name}
+
+    def stats(self) -> Dict:
+        decided = sum(self.hits.values())
+        total = decided + self.undecided
+        return {
+            "rules": dict(self.hits),
+            "decided_locally": decided,
+            "undecided": self.undecided,
+            "local_share": round(decided / total, 4) if total else 0.0,
+            "avg_match_us": (
+                round(self.match_seconds / total * 1e6, 2) if total else 0.0
+            ),
+        }
@@ -0,0 +1,260 @@
+"""
+Structured (JSON) output from the LLM agents
+
+Models asked for JSON still wrap it in markdown fences, add a sentence
+before or after it, use single quotes or Python literals, leave trailing
+commas, or stop mid-object. `StructuredOutput` turns such a reply into a
+validated dict for one agent's Pydantic schema, trying in order:
+
+1. the reply as is
+2. the first JSON object/array in it (fences and prose dropped)
+3. a local repair of that: quotes, literals, trailing commas, raw
+   newlines in strings, and a reply cut off mid-way closed after its
+   last complete field
+
+and counts which step worked per agent. Re-asking the model is left to
+the router as a last resort (see ModelRouter.invoke). `partial` reads
+the fields completed so far from a reply that is still streaming.
+"""
+
+from collections import Counter
+from pydantic import BaseModel, ValidationError
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Type
+import json
+import re
+import threading
+
+_FENCE_RE = re.compile(r"```[a-zA-Z]*\s*\n?(.*?)(?:```|$)", re.S)
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+
+OUTCOMES = ("clean", "extracted", "repaired", "failed", "reasked", "recovered")
+
+_stats: Dict[str, Counter] = {}
+_stats_lock = threading.Lock()
+
+
+def extract_json(text: str) -> str:
+    """The first JSON object or array in `text`, possibly unterminated"""
+    fenced = _FENCE_RE.search(text)
+    if fenced and re.search(r"[\[{]", fenced.group(1)):
+        text = fenced.group(1)
+    match = re.search(r"[\[{]", text)
+    return text[match.start() :].strip() if match else text.strip()
+
+
+def _scan(text: str) -> Tuple[List[str], List[Tuple[int, str]], bool]:
+    """
+    Normalize JSON-ish text in one pass
+
+    Returns:
+        (pieces, cut points, complete): joined, the pieces are the
+        normalized text. A cut point is (number of pieces, closers) after
+        a value completed directly inside the top-level container;
+        complete is False when the text ended before that container closed
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    expect_key: List[bool] = []  # Per open container: next string is a key
+    cuts: List[Tuple[int, str]] = []
+    pending_comma = False
+    i, n = 0, len(text)
+
+    def value_done():
+        if len(stack) == 1:
+            cuts.append((len(out), _CLOSERS[stack[0]]))
+
+    def emit_comma():
+        nonlocal pending_comma
+        if pending_comma:
+            out.append(",")
+            pending_comma = False
+
+    while i < n:
+        c = text[i]
+        if c in "\"'":
+            # A string: re-quoted with double quotes, raw control characters escaped
+            j, chars = i + 1, []
+            while j < n and text[j] != c:
+                if text[j] == "\\" and j + 1 < n:
+                    escaped = text[j + 1]
+                    chars.append(escaped if escaped == "'" else "\\" + escaped)
+                    j += 2
+                    continue
+                ch = text[j]
+                chars.append(
+                    {"\n": "\\n", "\r": "\\r", "\t": "\\t", '"': '\\"'}.get(ch, ch)
+                )
+                j += 1
+            if j >= n:
+                return out, cuts, False  # Cut off inside a string
+            emit_comma()
+            out.append('"' + "".join(chars) + '"')
+            i = j + 1
+            if stack and stack[-1] == "{" and expect_key[-1]:
+                continue
+            value_done()
+            continue
+        if c in "{[":
+            emit_comma()
+            stack.append(c)
+            expect_key.append(c == "{")
+            out.append(c)
+        elif c in "}]":
+            pending_comma = False  # Trailing comma
+            if not stack:
+                break
+            out.append(_CLOSERS[stack.pop()])
+            expect_key.pop()
+            if not stack:
+                return out, cuts, True
+            value_done()
+        elif c == ",":
+            pending_comma = True
+            if stack and stack[-1] == "{":
+                expect_key[-1] = True
+        elif c == ":":
+            out.append(":")
+            if stack:
+                expect_key[-1] = False
+        elif c.isalnum() or c in "-+._":
+            j = i
+            while j < n and (text[j].isalnum() or text[j] in "-+._"):
+                j += 1
+            word = text[i:j]
+            emit_comma()
+            if stack and stack[-1] == "{" and expect_key[-1]:
+                out.append(json.dumps(word))  # Unquoted key
+            else:
+                out.append(_LITERALS.get(word, word))
+                if j < n:  # A token at the very end may be cut short
+                    value_done()
+            i = j
+            continue
+        elif not c.isspace():
+            out.append(c)
+        i += 1
+    return out, cuts, not stack
+
+
+def _closed(text: str) -> Optional[str]:
+    """Normalized text, cut back to its last complete field if unterminated"""
+    pieces, cuts, complete = _scan(extract_json(text))
+    if complete:
+        return "".join(pieces)
+    if not cuts:
+        return None
+    count, closers = cuts[-1]
+    return "".join(pieces[:count]) + closers
+
+
+def repair_json(text: str) -> str:
+    """Best-effort valid JSON from a model's almost-JSON reply"""
+    repaired = _closed(text)
+    if repaired is None:
+        raise ValueError("No complete JSON value to repair")
+    return repaired
+
+
+def load_json(content: str):
+    """
+    Parse a model reply as leniently as needed
+
+    Returns:
+        (value, outcome) with outcome "clean", "extracted" or "repaired"
+
+    Raises:
+        ValueError: Nothing parseable found
+    """
+    try:
+        return json.loads(content), "clean"
+    except ValueError:
+        pass
+    candidate = extract_json(content)
+    try:
+        return json.loads(candidate), "extracted"
+    except ValueError:
+        pass
+    return json.loads(repair_json(candidate)), "repaired"
+
+
+class StructuredOutput:
+    """
+    Parser for one agent's JSON replies, validated against its schema
+
+    Callable as a ModelRouter `parse` function: returns the validated
+    fields as a dict, or raises ValueError, which makes the router try
+    the next model and, after the last, re-ask once.
+    """
+
+    def __init__(self, agent: str, schema: Type[BaseModel]):
+        self.agent = agent
+        self.schema = schema
+        with _stats_lock:
+            self.counters = _stats.setdefault(agent, Counter())
+
+    def record(self, outcome: str):
+        with _stats_lock:
+            self.counters[outcome] += 1
+
+    def __call__(self, content: str) -> dict:
+        try:
+            value, outcome = load_json(content)
+            result = self.schema.model_validate(value).model_dump()
+        except ValidationError as e:
+            self.record("failed")
+            raise ValueError(f"{self.agent} output doesn't match schema: {e}") from e
+        except ValueError:
+            self.record("failed")
+            raise
+        self.record(outcome)
+        return result
+
+    def reask_prompt(self) -> str:
+        fields = ", ".join(self.schema.model_fields)
+        return (
+            "Your reply could not be parsed. Reply again with only a JSON "
+            f"object with the fields {fields}, and nothing else."
+        )
+
+    def partial(self, text: str) -> dict:
+        """Top-level fields already complete in a reply still being streamed"""
+        closed = _closed(text)
+        try:
+            value = json.loads(closed) if closed is not None else None
+        except ValueError:
+            return {}
+        return value if isinstance(value, dict) else {}
+
+    def stream_fields(self, chunks: Iterable[str]) -> Iterator[Tuple[str, object]]:
+        """Yield (field, value) pairs as each completes in streamed chunks"""
+        text, seen = "", set()
+        for chunk in chunks:
+            text += chunk
+            for field, value in self.partial(text).items():
+                if field not in seen:
+                    seen.add(field)
+                    yield field, value
+
+
+def output_stats() -> Dict[str, dict]:
+    """Parse outcomes per agent, with failure and repair rates"""
+    with _stats_lock:
+        snapshot = {agent: dict(counts) for agent, counts in _stats.items()}
+    stats = {}
+    for agent, counts in snapshot.items():
+        parsed = sum(counts.get(k, 0) for k in ("clean", "extracted", "repaired"))
+        attempts = parsed + counts.get("failed", 0)
+        stats[agent] = {
+            **{outcome: counts.get(outcome, 0) for outcome in OUTCOMES},
+            "fallbacks": counts.get("fallback", 0),
+            "failure_rate": (
+                round(counts.get("failed", 0) / attempts, 4) if attempts else 0.0
+            ),
+            "repair_rate": (
+                round((parsed - counts.get("clean", 0)) / attempts, 4)
+                if attempts
+                else 0.0
+            ),
+        }
+    return stats
@@ -0,0 +1,106 @@
+from utils.config import config
+from typing import Dict, List, Optional
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough LLM token count for English text (~4 characters per token)
+
+    Good enough for budgeting and before/after comparisons; exact counts
+    come from the provider's usage metadata.
+    """
+    if not text:
+        return 0
+    return max(1, (len(text) + 3) // 4)
+
+
+def add_usage(usage: Optional[Dict[str, dict]], calls: List[dict]) -> Dict[str, dict]:
+    """
+    Per-stage token totals with some model calls added
+
+    Args:
+        usage: Existing totals, {stage: {"input", "output", "calls"}}; not modified
+        calls: Model call records carrying agent, input_tokens, output_tokens
+    """
+    usage = {stage: dict(totals) for stage, totals in (usage or {}).items()}
+    for call in calls:
+        totals = usage.setdefault(call["agent"], {"input": 0, "output": 0, "calls": 0})
+        totals["input"] += call.get("input_tokens") or 0
+        totals["output"] += call.get("output_tokens") or 0
+        totals["calls"] += 1
+    return usage
+
+
+def merge_usage(
+    usage: Optional[Dict[str, dict]], more: Optional[Dict[str, dict]]
+) -> Dict[str, dict]:
+    """Per-stage totals of both; neither argument is modified"""
+    merged = {stage: dict(totals) for stage, totals in (usage or {}).items()}
+    for stage, totals in (more or {}).items():
+        into = merged.setdefault(stage, {"input": 0, "output": 0, "calls": 0})
+        for key in ("input", "output", "calls"):
+            into[key] += totals.get(key, 0)
+    return merged
+
+
+def total_usage(usage: Optional[Dict[str, dict]]) -> int:
+    return sum(t["input"] + t["output"] for t in (usage or {}).values())
+
+
+def fit_documents(docs: List[dict], max_tokens: int) -> List[dict]:
+    """
+    Best-ranked documents whose content fits in `max_tokens`
+
+    Lower-ranked documents are dropped first. If even the top one is too
+    long it is truncated, so at least some context always remains.
+    """
+    kept, used = [], 0
+    for doc in docs:
+        tokens = estimate_tokens(doc["content"])
+        if used + tokens > max_tokens:
+            break
+        kept.append(doc)
+        used += tokens
+    if not kept and docs:
+        chars = max(max_tokens, 0) * 4
+        kept = [{**docs[0], "content": docs[0]["content"][:chars], "truncated": True}]
+    return kept
+
+
+class TokenBudget:
+    """
+    Per-ticket LLM token limit
+
+    Once `soft_ratio` of the limit is used the pipeline economizes: the
+    resolution runs on the "resolution.budget" model route and the
+    escalation check is left to the local rules. Retrieved context is
+    always trimmed so the resolution prompt plus `reserve` tokens (its
+    answer and the escalation check) fit in what remains.
+
+    Args:
+        limit: Tokens per ticket; 0 disables the budget
+        soft_ratio: Fraction of the limit after which to economize
+        reserve: Tokens kept back for output when sizing the prompt
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = None,
+        soft_ratio: Optional[float] = None,
+        reserve: Optional[int] = None,
+    ):
+        self.limit = config.TOKEN_BUDGET_PER_TICKET if limit is None else limit
+        self.soft_ratio = (
+            config.TOKEN_BUDGET_SOFT_RATIO if soft_ratio is None else soft_ratio
+        )
+        self.reserve = config.TOKEN_BUDGET_RESERVE if reserve is None else reserve
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0
+
+    def remaining(self, used: int) -> int:
+        return self.limit - used
+
+    def tight(self, used: int) -> bool:
+        return self.enabled and used >= self.limit * self.soft_ratio